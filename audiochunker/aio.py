@@ -0,0 +1,270 @@
+import asyncio
+import functools
+import os
+import subprocess
+from concurrent.futures import Executor
+from typing import List, Union
+
+from .chunker import AudioChunker
+from .detectors import FFMPEGSilenceDetector, SilenceDetector, _get_silence_detector
+from .exceptions import FFMPEGException, FFPROBEException
+from .ffmpeg import AudioInfo, FFMPEGTools
+from .metrics import measure_stage
+from .pcm import PCMAudio, _parse_wav_header, _probe_audio_header, _read_pcm_wav
+from .runner import get_process_runner
+
+
+class AsyncFFMPEGTools:
+    """
+    asyncio variants of the FFMPEGTools subprocess calls, built on asyncio.create_subprocess_exec.
+
+    Every call accepts a semaphore capping the number of concurrent ffmpeg/ffprobe
+    processes; AsyncFFMPEGTools.semaphore is used when none is given. The processes
+    also take a slot of the process runner and get its timeout, thread caps and niceness.
+    """
+    semaphore: asyncio.Semaphore = None
+
+    @classmethod
+    async def run(cls, command: List[str], semaphore: asyncio.Semaphore=None, input: bytes=None, stage: str=None) -> tuple:
+        """
+        Run a command without blocking the event loop.
+
+        subprocess.TimeoutExpired is raised when the process runner timeout expires, the process group is then killed.
+
+        Parameters:
+            command (List[str]): Command and arguments.
+            semaphore (asyncio.Semaphore): Semaphore held while the process runs.
+            input (bytes): Data written to the process stdin.
+            stage (str): Stage name reported to the metrics sink, the command name by default.
+                The child resource usage is not available, asyncio reaps the process.
+        Returns:
+            tuple: Tuple with the return code, stdout and stderr.
+        """
+        stage = stage or os.path.basename(command[0])
+        semaphore = semaphore or cls.semaphore
+        if semaphore is None:
+            return await cls.__execute(command, input, stage)
+        async with semaphore:
+            return await cls.__execute(command, input, stage)
+
+    @staticmethod
+    async def __execute(command: List[str], input: bytes, stage: str) -> tuple:
+        runner = get_process_runner()
+        acquired = await runner.acquire_async(stage)
+        try:
+            with measure_stage(stage):
+                process = await asyncio.create_subprocess_exec(*runner.command(command),
+                                                               stdin=subprocess.DEVNULL if input is None else subprocess.PIPE,
+                                                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True,
+                                                               preexec_fn=runner.preexec_fn)
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(input), runner.timeout)
+                except asyncio.TimeoutError:
+                    runner.kill(process)
+                    await process.wait()
+                    raise subprocess.TimeoutExpired(command, runner.timeout)
+                except BaseException:
+                    # Cancelled: do not leave the process running.
+                    if process.returncode is None:
+                        runner.kill(process)
+                        await process.wait()
+                    raise
+        finally:
+            runner.release(stage, acquired)
+        return (process.returncode, stdout, stderr)
+
+    @classmethod
+    async def create_silence_content(cls, audio_path: str, silence_threshold: float=-30, silence_duration: float=0.5,
+                                     semaphore: asyncio.Semaphore=None) -> str:
+        """
+        Create a str with the content produced by ffmpeg silence.
+
+        Parameters:
+            audio_path (str): File path to the audio file.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+            semaphore (asyncio.Semaphore): Semaphore capping the concurrent ffmpeg processes.
+        Returns:
+            str: The content produced by ffmpeg silence.
+        """
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+
+        if silence_threshold is None:
+            raise ValueError('silence_threshold is not set.')
+
+        if silence_duration is None:
+            raise ValueError('silence_duration is not set.')
+
+        times_command = ['ffmpeg', '-i', audio_path, '-af', f'silencedetect=noise={silence_threshold}dB:d={silence_duration}', '-f', 'null', '-']
+        try:
+            returncode, _, ffmpeg_content = await cls.run(times_command, semaphore, stage='ffmpeg_silencedetect')
+        except subprocess.TimeoutExpired as e:
+            raise FFMPEGException(f'Error while trying to create silence file. {e}')
+        if returncode != 0:
+            raise FFMPEGException(f'Error while trying to create silence file. {ffmpeg_content}')
+        return ffmpeg_content.decode('utf-8')
+
+    @classmethod
+    async def decode_audio(cls, audio_path: str, silence_threshold: float=None, silence_duration: float=None,
+                           semaphore: asyncio.Semaphore=None) -> tuple:
+        """
+        Decode an audio file to 16 bits PCM, optionally running silencedetect on the same pass. See FFMPEGTools.decode_audio.
+
+        Returns:
+            tuple: Tuple with the PCMAudio and the content produced by ffmpeg on stderr.
+        """
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+
+        silence_filter = []
+        if silence_threshold is not None and silence_duration is not None:
+            silence_filter = ['-af', f'silencedetect=noise={silence_threshold}dB:d={silence_duration}']
+
+        decode_command = ['ffmpeg', '-i', audio_path, '-vn', *silence_filter, '-acodec', 'pcm_s16le', '-f', 'wav', 'pipe:1']
+        try:
+            returncode, wav_content, ffmpeg_content = await cls.run(decode_command, semaphore, stage='ffmpeg_decode')
+        except subprocess.TimeoutExpired as e:
+            raise FFMPEGException(f'Error while trying to decode audio. {e}')
+        if returncode != 0:
+            raise FFMPEGException(f'Error while trying to decode audio. {ffmpeg_content}')
+
+        header = _parse_wav_header(wav_content)
+        data = wav_content[header['data_offset']:header['data_offset'] + header['data_size']]
+        audio = PCMAudio(data, header['sample_rate'], header['channels'], header['sample_width'])
+        return (audio, ffmpeg_content.decode('utf-8'))
+
+    @classmethod
+    async def get_audio_information(cls, audio_path: str, semaphore: asyncio.Semaphore=None) -> AudioInfo:
+        """
+        Get audio information from the file header, using ffprobe for formats FFMPEGTools.get_audio_information does not read.
+        """
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+
+        file_info = _probe_audio_header(audio_path)
+        if file_info is not None:
+            return AudioInfo(**file_info)
+
+        info_command = [*FFMPEGTools.ffprobe_info_command, audio_path]
+        try:
+            returncode, info, ffprobe_content = await cls.run(info_command, semaphore, stage='ffprobe_info')
+        except subprocess.TimeoutExpired as e:
+            raise FFPROBEException(f'Error while trying to get audio information. {e}')
+        if returncode != 0:
+            raise FFPROBEException(f'Error while trying to get audio information. {ffprobe_content}')
+        return FFMPEGTools.parse_audio_information(info.decode('utf-8'))
+
+
+class AsyncAudioChunker:
+    """
+    asyncio audio chunker.
+
+    Build it with `await AsyncAudioChunker.create(...)`. ffmpeg runs as an asyncio
+    subprocess, while file reads, slicing and exports run in an executor.
+    """
+    def __init__(self, chunker: AudioChunker, executor: Executor=None):
+        self.chunker: AudioChunker = chunker
+        self.executor: Executor = executor
+
+    @property
+    def input_file_path(self) -> str:
+        return self.chunker.input_file_path
+
+    @property
+    def silences(self) -> list:
+        return self.chunker.silences
+
+    @classmethod
+    async def create(cls, input_file_path: str, silence_threshold: float=-30, silence_duration: float=0.5,
+                     detector: Union[str, SilenceDetector]='ffmpeg', single_decode: bool=False,
+                     semaphore: asyncio.Semaphore=None, executor: Executor=None) -> 'AsyncAudioChunker':
+        """
+        Detect the silences of an audio file without blocking the event loop.
+
+        Parameters:
+            input_file_path (str): File path to the input audio file.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+            detector (Union[str, SilenceDetector]): Silence detection backend, see AudioChunker.
+            single_decode (bool): Decode the input once, see AudioChunker.
+            semaphore (asyncio.Semaphore): Semaphore capping the concurrent ffmpeg processes.
+            executor (Executor): Executor for the blocking work, the loop default executor when not set.
+        Returns:
+            AsyncAudioChunker: Audio chunker instance.
+        """
+        if input_file_path is None:
+            raise ValueError('input_file_path is not set.')
+
+        if not os.path.exists(input_file_path):
+            raise FileNotFoundError(f'Audio file {input_file_path} not found.')
+
+        loop = asyncio.get_running_loop()
+        detector = _get_silence_detector(detector)
+        if not isinstance(detector, FFMPEGSilenceDetector) or detector.shards > 1:
+            chunker = await loop.run_in_executor(executor, functools.partial(
+                AudioChunker, input_file_path, silence_threshold, silence_duration, detector=detector, single_decode=single_decode))
+            return cls(chunker, executor)
+
+        audio = None
+        if single_decode:
+            # Same read path as AudioChunker: PCM WAV files are read directly, only other formats are decoded by ffmpeg.
+            audio = await loop.run_in_executor(executor, _read_pcm_wav, input_file_path)
+        if single_decode and audio is None:
+            audio, silence_content = await AsyncFFMPEGTools.decode_audio(input_file_path, silence_threshold, silence_duration, semaphore)
+        else:
+            silence_content = await AsyncFFMPEGTools.create_silence_content(input_file_path, silence_threshold, silence_duration, semaphore)
+
+        chunker = AudioChunker(input_file_path, silence_threshold, silence_duration, detector=detector,
+                               silences=FFMPEGTools.get_silences_from_content(silence_content))
+        if audio is not None:
+            chunker.single_decode = True
+            chunker.audio = audio
+        return cls(chunker, executor)
+
+    async def chunking_segment(self, target_sample_rate: int=None, target_channels: int=None, target_sample_width: int=None,
+                               shared_memory: bool=False):
+        """
+        Chunking the audio file and return a SegmentChunk async iterator, see AudioChunker.chunking_segment.
+        """
+        loop = asyncio.get_running_loop()
+        chunks = self.chunker.chunking_segment(target_sample_rate, target_channels, target_sample_width, shared_memory)
+        done = object()
+        while True:
+            chunk = await loop.run_in_executor(self.executor, next, chunks, done)
+            if chunk is done:
+                break
+            yield chunk
+
+    async def chunking_file(self, chunks_path: str=None, chunk_suffix: str='chunk_', workers: int=1, format: str='wav',
+                            parameters: List[str]=None, target_sample_rate: int=None, target_channels: int=None,
+                            target_sample_width: int=None) -> tuple:
+        """
+        Chunking the audio file in the executor and return tuple with a FileChunk list and silences list.
+
+        Parameters:
+            chunks_path (str): Path to the chunks directory.
+            chunk_suffix (str): Chunk suffix.
+            workers (int): Number of threads writing chunk files concurrently.
+            format (str): Chunk file format, see AudioChunker.chunking_file.
+            parameters (List[str]): Extra ffmpeg output options for non WAV formats.
+            target_sample_rate (int): Sample rate of the chunks.
+            target_channels (int): Number of channels of the chunks.
+            target_sample_width (int): Sample width of the chunks in bytes.
+        Returns:
+            tuple: Tuple with a FileChunk list and silences list.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(
+            self.chunker.chunking_file, chunks_path=chunks_path, chunk_suffix=chunk_suffix, workers=workers,
+            format=format, parameters=parameters, target_sample_rate=target_sample_rate,
+            target_channels=target_channels, target_sample_width=target_sample_width))
@@ -0,0 +1,235 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from .cache import SilenceCache
+from .chunker import AudioChunker
+from .chunks import FileChunk
+from .detectors import SILENCE_DETECTORS
+from .runner import ProcessRunner, set_process_runner
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchResult:
+    """
+    Result of chunking one file of a batch.
+    """
+    def __init__(self, **kwargs):
+        self.input_file_path: str = kwargs.get('input_file_path', None)
+        self.chunks_path: str = kwargs.get('chunks_path', None)
+        self.chunks: List[FileChunk] = kwargs.get('chunks', [])
+        self.silences: list = kwargs.get('silences', [])
+        self.error: str = kwargs.get('error', None)
+        self.elapsed: float = kwargs.get('elapsed', 0.0)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        return {
+            'input_file_path': self.input_file_path,
+            'chunks_path': self.chunks_path,
+            'ok': self.ok,
+            'chunks': len(self.chunks),
+            'silences': len(self.silences),
+            'error': self.error,
+            'elapsed': round(self.elapsed, 6),
+        }
+
+    def __repr__(self):
+        return f'input_file_path:{self.input_file_path} chunks_path:{self.chunks_path} chunks:{len(self.chunks)} error:{self.error}'
+
+
+_batch_ffmpeg_semaphore = None
+
+
+def _init_batch_worker(ffmpeg_semaphore, runner_options: dict=None):
+    global _batch_ffmpeg_semaphore
+    _batch_ffmpeg_semaphore = ffmpeg_semaphore
+    if runner_options is not None:
+        set_process_runner(ProcessRunner(**runner_options))
+
+
+def _chunk_one(input_file_path: str, chunks_path: str, options: dict) -> BatchResult:
+    started = time.perf_counter()
+    try:
+        os.makedirs(chunks_path, exist_ok=True)
+        chunker_options = {k: options[k] for k in ('silence_threshold', 'silence_duration', 'detector', 'single_decode', 'cache')}
+        if _batch_ffmpeg_semaphore is not None:
+            # Silence detection (and decoding) is where the ffmpeg children run.
+            with _batch_ffmpeg_semaphore:
+                chunker = AudioChunker(input_file_path, **chunker_options)
+        else:
+            chunker = AudioChunker(input_file_path, **chunker_options)
+        export_options = {'chunk_suffix': options['chunk_suffix'], 'format': options.get('format', 'wav')}
+        if _batch_ffmpeg_semaphore is not None and export_options['format'] != 'wav':
+            # Non WAV chunks are encoded by ffmpeg too.
+            with _batch_ffmpeg_semaphore:
+                chunks, silences = chunker.chunking_file(chunks_path=chunks_path, **export_options)
+        else:
+            chunks, silences = chunker.chunking_file(chunks_path=chunks_path, **export_options)
+        return BatchResult(input_file_path=input_file_path, chunks_path=chunks_path, chunks=chunks, silences=silences,
+                           elapsed=time.perf_counter() - started)
+    except Exception as e:
+        return BatchResult(input_file_path=input_file_path, chunks_path=chunks_path, error=f'{type(e).__name__}: {e}',
+                           elapsed=time.perf_counter() - started)
+
+
+def _batch_chunks_paths(paths: List[str], out_dir: str) -> List[str]:
+    chunks_paths = []
+    used = set()
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0] or 'audio'
+        candidate, index = name, 1
+        while candidate in used:
+            candidate = f'{name}_{index}'
+            index += 1
+        used.add(candidate)
+        chunks_paths.append(os.path.join(out_dir, candidate))
+    return chunks_paths
+
+
+def chunk_many(paths: List[str], out_dir: str, jobs: int=1, max_ffmpeg: int=None, silence_threshold: float=-30,
+               silence_duration: float=0.5, detector: str='ffmpeg', single_decode: bool=False,
+               chunk_suffix: str='chunk_', cache: SilenceCache=None, format: str='wav', runner: ProcessRunner=None) -> List[BatchResult]:
+    """
+    Chunking many audio files with a process pool.
+
+    Every file is chunked into its own directory inside out_dir, named after the file.
+    A failure is reported in the BatchResult of its file and does not abort the batch.
+
+    Parameters:
+        paths (List[str]): File paths to the audio files.
+        out_dir (str): Path to the output directory.
+        jobs (int): Number of worker processes.
+        max_ffmpeg (int): Maximum number of concurrent ffmpeg children, defaults to jobs.
+        silence_threshold (float): Silence threshold.
+        silence_duration (float): Silence duration.
+        detector (str): Silence detection backend, 'ffmpeg' or 'numpy'.
+        single_decode (bool): Decode each input once, see AudioChunker.
+        chunk_suffix (str): Chunk suffix.
+        cache (SilenceCache): Cache of detected silences shared by the workers.
+        format (str): Chunk file format, e.g. 'wav', 'flac' or 'mp3'.
+        runner (ProcessRunner): Process runner settings (timeout, threads, nice) of the ffmpeg children,
+            each worker process gets its own runner with the same settings.
+    Returns:
+        List[BatchResult]: One result per input file, in the same order as paths.
+    """
+    if paths is None:
+        raise ValueError('paths is not set.')
+
+    if out_dir is None:
+        raise ValueError('out_dir is not set.')
+
+    if jobs is None or jobs < 1:
+        raise ValueError('jobs must be greater than zero')
+
+    if max_ffmpeg is not None and max_ffmpeg < 1:
+        raise ValueError('max_ffmpeg must be greater than zero')
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = list(paths)
+    chunks_paths = _batch_chunks_paths(paths, out_dir)
+    options = {
+        'silence_threshold': silence_threshold,
+        'silence_duration': silence_duration,
+        'detector': detector,
+        'single_decode': single_decode,
+        'chunk_suffix': chunk_suffix,
+        'cache': cache,
+        'format': format,
+    }
+
+    results: List[BatchResult] = []
+    if jobs == 1:
+        previous = set_process_runner(runner) if runner is not None else None
+        try:
+            for path, chunks_path in zip(paths, chunks_paths):
+                results.append(_chunk_one(path, chunks_path, options))
+                logger.info(repr(results[-1]))
+        finally:
+            if previous is not None:
+                set_process_runner(previous)
+        return results
+
+    ffmpeg_semaphore = multiprocessing.BoundedSemaphore(max_ffmpeg) if max_ffmpeg is not None and max_ffmpeg < jobs else None
+    runner_options = None
+    if runner is not None:
+        runner_options = {'max_processes': runner.max_processes, 'timeout': runner.timeout, 'threads': runner.threads, 'nice': runner.nice}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker, initargs=(ffmpeg_semaphore, runner_options)) as pool:
+        futures = [pool.submit(_chunk_one, path, chunks_path, options) for path, chunks_path in zip(paths, chunks_paths)]
+        for path, chunks_path, future in zip(paths, chunks_paths, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process died (BrokenProcessPool), the file is reported as failed.
+                result = BatchResult(input_file_path=path, chunks_path=chunks_path, error=f'{type(e).__name__}: {e}')
+            logger.info(repr(result))
+            results.append(result)
+    return results
+
+
+_AUDIO_EXTENSIONS = ('.wav', '.mp3', '.ogg', '.oga', '.opus', '.flac', '.m4a', '.aac', '.wma', '.webm')
+
+
+def _collect_audio_paths(inputs: List[str], manifest: str=None) -> List[str]:
+    paths = []
+    if manifest is not None:
+        with open(manifest, 'r') as f:
+            paths.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in sorted(os.walk(item)):
+                paths.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(_AUDIO_EXTENSIONS))
+        else:
+            paths.append(item)
+    return paths
+
+
+def main(argv: List[str]=None) -> int:
+    """
+    audiochunker command line entry point.
+
+    Parameters:
+        argv (List[str]): Command line arguments, defaults to sys.argv[1:].
+    Returns:
+        int: Exit code, 0 when every file was chunked, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog='audiochunker', description='Chunk audio files on their silences.')
+    parser.add_argument('inputs', nargs='*', help='Audio files or directories with audio files.')
+    parser.add_argument('-o', '--out-dir', required=True, help='Output directory, one sub directory per input file.')
+    parser.add_argument('-m', '--manifest', help='File with one audio file path per line.')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Number of worker processes.')
+    parser.add_argument('--max-ffmpeg', type=int, default=None, help='Maximum number of concurrent ffmpeg processes.')
+    parser.add_argument('-t', '--silence-threshold', type=float, default=-30, help='Silence threshold in dB.')
+    parser.add_argument('-d', '--silence-duration', type=float, default=0.5, help='Minimum silence duration in seconds.')
+    parser.add_argument('--detector', choices=sorted(SILENCE_DETECTORS), default='ffmpeg', help='Silence detection backend.')
+    parser.add_argument('--single-decode', action='store_true', help='Decode each input once.')
+    parser.add_argument('--chunk-suffix', default='chunk_', help='Chunk file name prefix.')
+    parser.add_argument('--format', default='wav', help='Chunk file format, e.g. wav, flac, mp3 or opus.')
+    parser.add_argument('--cache-dir', default=None, help='Directory of the silence detection cache.')
+    parser.add_argument('--ffmpeg-timeout', type=float, default=None, help='Kill an ffmpeg/ffprobe call after this many seconds.')
+    parser.add_argument('--ffmpeg-threads', type=int, default=None, help='Decoder and filter threads of each ffmpeg process.')
+    parser.add_argument('--nice', type=int, default=None, help='Niceness increment of the ffmpeg processes.')
+    args = parser.parse_args(argv)
+
+    paths = _collect_audio_paths(args.inputs, args.manifest)
+    if not paths:
+        parser.error('no input files')
+
+    results = chunk_many(paths, args.out_dir, jobs=args.jobs, max_ffmpeg=args.max_ffmpeg,
+                         silence_threshold=args.silence_threshold, silence_duration=args.silence_duration,
+                         detector=args.detector, single_decode=args.single_decode, chunk_suffix=args.chunk_suffix,
+                         cache=SilenceCache(args.cache_dir) if args.cache_dir else None, format=args.format,
+                         runner=ProcessRunner(timeout=args.ffmpeg_timeout, threads=args.ffmpeg_threads, nice=args.nice))
+    for result in results:
+        print(json.dumps(result.to_dict()))
+    return 0 if all(result.ok for result in results) else 1
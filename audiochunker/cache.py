@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List
+
+from .detectors import SilenceDetector
+
+
+class SilenceCache:
+    """
+    Persistent SQLite cache of detected silences.
+
+    Entries are keyed by the identity of the audio file and the detector parameters.
+    With key_mode='stat' the identity is the file path, size and modification time;
+    with key_mode='content' it is a hash of the file content, so copies and renamed
+    files share entries. The least recently used entries are evicted when the cache
+    holds more than max_entries entries or more than max_bytes bytes of silences.
+    """
+    file_name = 'silences.sqlite3'
+
+    def __init__(self, directory: str=None, max_entries: int=10000, max_bytes: int=None, key_mode: str='stat'):
+        if key_mode not in ('stat', 'content'):
+            raise ValueError(f'Unknown key_mode {key_mode}.')
+
+        if max_entries is not None and max_entries < 1:
+            raise ValueError('max_entries must be greater than zero')
+
+        self.directory = directory or os.path.join(os.path.expanduser('~'), '.cache', 'audiochunker')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.key_mode = key_mode
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, self.file_name)
+        with self.__connect() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS silences ('
+                               'key TEXT PRIMARY KEY, silences TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS silences_last_access ON silences (last_access)')
+
+    @contextmanager
+    def __connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def make_key(self, audio_path: str, detector: SilenceDetector, silence_threshold: float, silence_duration: float) -> str:
+        """
+        Build the cache key of an audio file and detector parameters.
+
+        Parameters:
+            audio_path (str): File path to the audio file.
+            detector (SilenceDetector): Silence detector.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+        Returns:
+            str: The cache key.
+        """
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+
+        if self.key_mode == 'content':
+            content_hash = hashlib.sha256()
+            with open(audio_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    content_hash.update(block)
+            identity = content_hash.hexdigest()
+        else:
+            stat = os.stat(audio_path)
+            identity = f'{os.path.realpath(audio_path)}:{stat.st_size}:{stat.st_mtime_ns}'
+
+        key = f'{identity}|{detector.cache_key()}|{float(silence_threshold)}|{float(silence_duration)}'
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> list:
+        """
+        Get the silences stored for a key.
+
+        Parameters:
+            key (str): The cache key.
+        Returns:
+            list: The silences, or None when the key is not cached.
+        """
+        with self.__connect() as connection:
+            row = connection.execute('SELECT silences FROM silences WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            connection.execute('UPDATE silences SET last_access = ? WHERE key = ?', (time.time(), key))
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, silences: list):
+        """
+        Store the silences of a key and evict the least recently used entries.
+
+        Parameters:
+            key (str): The cache key.
+            silences (list): The silences.
+        """
+        content = json.dumps(silences)
+        with self.__connect() as connection:
+            connection.execute('INSERT OR REPLACE INTO silences (key, silences, size, last_access) VALUES (?, ?, ?, ?)',
+                               (key, content, len(content), time.time()))
+            if self.max_entries is not None:
+                connection.execute('DELETE FROM silences WHERE key IN (SELECT key FROM silences ORDER BY last_access DESC LIMIT -1 OFFSET ?)',
+                                   (self.max_entries,))
+            if self.max_bytes is not None:
+                total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM silences').fetchone()[0]
+                for old_key, size in connection.execute('SELECT key, size FROM silences ORDER BY last_access').fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    connection.execute('DELETE FROM silences WHERE key = ?', (old_key,))
+                    total -= size
+
+    def clear(self):
+        """
+        Remove every entry of the cache.
+        """
+        with self.__connect() as connection:
+            connection.execute('DELETE FROM silences')
+
+    def stats(self) -> dict:
+        """
+        Hit and miss counters of this instance and the current size of the cache.
+        """
+        with self.__connect() as connection:
+            entries, size = connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM silences').fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+
+
+class SeenStore:
+    """
+    Base class of the stores of chunk keys already seen, used to mark duplicate chunks.
+
+    Keys are the content hash and the fingerprint of a chunk, the stored value is a label
+    identifying the first chunk seen with the key.
+    """
+    def check(self, keys: List[str], label: str) -> str:
+        """
+        Look up the keys in order and record the keys not seen yet.
+
+        Parameters:
+            keys (List[str]): Keys of the chunk, the most specific first.
+            label (str): Label of the chunk.
+        Returns:
+            str: The label of the chunk first seen with one of the keys, None when the chunk is new.
+                The keys not seen yet are recorded with that label (or with label for a new chunk).
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemorySeenStore(SeenStore):
+    """
+    In-memory seen store, the least recently seen keys are evicted past max_entries.
+    """
+    def __init__(self, max_entries: int=100000):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError('max_entries must be greater than zero')
+
+        self.max_entries = max_entries
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def check(self, keys: List[str], label: str) -> str:
+        with self.__lock:
+            first_label = None
+            for key in keys:
+                if key in self.__entries:
+                    self.__entries.move_to_end(key)
+                    if first_label is None:
+                        first_label = self.__entries[key]
+            for key in keys:
+                self.__entries.setdefault(key, label if first_label is None else first_label)
+            while self.max_entries is not None and len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+            return first_label
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+class SQLiteSeenStore(SeenStore):
+    """
+    Persistent SQLite seen store shared by processes and runs.
+
+    The least recently seen keys are evicted past max_entries, checked every evict_interval new keys.
+    """
+    file_name = 'seen.sqlite3'
+    evict_interval = 1000
+
+    def __init__(self, directory: str=None, max_entries: int=1000000):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError('max_entries must be greater than zero')
+
+        self.directory = directory or os.path.join(os.path.expanduser('~'), '.cache', 'audiochunker')
+        self.max_entries = max_entries
+        self.__inserted = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, self.file_name)
+        with self.__connect() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, label TEXT NOT NULL, last_seen REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS seen_last_seen ON seen (last_seen)')
+
+    @contextmanager
+    def __connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def check(self, keys: List[str], label: str) -> str:
+        now = time.time()
+        with self.__connect() as connection:
+            rows = dict(connection.execute(f'SELECT key, label FROM seen WHERE key IN ({", ".join("?" * len(keys))})', keys).fetchall())
+            first_label = next((rows[key] for key in keys if key in rows), None)
+            connection.executemany('UPDATE seen SET last_seen = ? WHERE key = ?', [(now, key) for key in rows])
+            missing = [(key, label if first_label is None else first_label, now) for key in keys if key not in rows]
+            connection.executemany('INSERT OR IGNORE INTO seen (key, label, last_seen) VALUES (?, ?, ?)', missing)
+            self.__inserted += len(missing)
+            if self.max_entries is not None and self.__inserted >= self.evict_interval:
+                self.__inserted = 0
+                connection.execute('DELETE FROM seen WHERE key IN (SELECT key FROM seen ORDER BY last_seen DESC LIMIT -1 OFFSET ?)',
+                                   (self.max_entries,))
+        return first_label
+
+    def clear(self):
+        with self.__connect() as connection:
+            connection.execute('DELETE FROM seen')
+
+    def __len__(self):
+        with self.__connect() as connection:
+            return connection.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
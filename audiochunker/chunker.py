@@ -0,0 +1,801 @@
+import mmap
+import os
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import List, Union
+
+import numpy as np
+from pydub import AudioSegment
+
+from .cache import SeenStore, SilenceCache
+from .chunks import BaseChunk, ChunkTable, FileChunk, SegmentChunk, _chunk_bounds, _chunk_end_available
+from .detectors import FFMPEGSilenceDetector, NumpySilenceDetector, SilenceDetector, _get_silence_detector
+from .exceptions import AudioFormatException, FFMPEGException
+from .ffmpeg import FFMPEGTools
+from .manifest import ChunkManifest
+from .metrics import _count, get_metrics_sink, measure_stage
+from .pcm import PCMAudio, _frame_position, _is_wav_file, _parse_wav_header, _read_pcm_wav
+from .runner import _rusage_dict, get_process_runner
+from .shared import SharedPCMBlock
+
+
+class SweepResult:
+    """
+    Silences, chunks and chunk statistics of one silence_threshold/silence_duration combination.
+    """
+    def __init__(self, **kwargs):
+        self.silence_threshold: float = kwargs.get('silence_threshold', None)
+        self.silence_duration: float = kwargs.get('silence_duration', None)
+        self.silences: list = kwargs.get('silences', [])
+        self.chunks: ChunkTable = kwargs.get('chunks', ChunkTable())
+        self.chunk_count: int = len(self.chunks)
+        durations = self.chunks.durations
+        self.mean_chunk_duration: float = float(durations.mean()) if len(durations) else 0.0
+        self.max_chunk_duration: float = float(durations.max()) if len(durations) else 0.0
+        self.speech_duration: float = kwargs.get('speech_duration', 0.0)
+
+    def to_dict(self) -> dict:
+        return {
+            'silence_threshold': self.silence_threshold,
+            'silence_duration': self.silence_duration,
+            'silences': len(self.silences),
+            'chunk_count': self.chunk_count,
+            'mean_chunk_duration': round(self.mean_chunk_duration, 6),
+            'max_chunk_duration': round(self.max_chunk_duration, 6),
+            'speech_duration': round(self.speech_duration, 6),
+        }
+
+    def __repr__(self):
+        return (f'silence_threshold:{self.silence_threshold} silence_duration:{self.silence_duration} chunk_count:{self.chunk_count} '
+                f'mean_chunk_duration:{self.mean_chunk_duration} max_chunk_duration:{self.max_chunk_duration} speech_duration:{self.speech_duration}')
+
+
+class AudioChunker:
+    def __init__(self, input_file_path: str, silence_threshold: float=-30, silence_duration: float=0.5,
+                 detector: Union[str, SilenceDetector]='ffmpeg', single_decode: bool=False, memory_map: bool=False,
+                 cache: SilenceCache=None, shards: int=1, silences: list=None, max_chunk_duration: float=None,
+                 min_chunk_duration: float=None, target_chunk_duration: float=None, audio: PCMAudio=None,
+                 per_channel: bool=False, fingerprint: bool=False, seen_store: SeenStore=None):
+        """
+        Audio chunker.
+
+        Parameters:
+            input_file_path (str): File path to the input audio file.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+            detector (Union[str, SilenceDetector]): Silence detection backend, 'ffmpeg', 'numpy' or a SilenceDetector instance.
+            single_decode (bool): Decode the input once and share the PCM buffer between silence detection
+                and chunking. PCM WAV files are read directly, other formats are decoded to 16 bits PCM.
+                Also allows chunking of non WAV inputs.
+            memory_map (bool): Memory-map the input PCM WAV file. Chunks are zero-copy views of the
+                file and chunk files are written straight from them.
+            cache (SilenceCache): Cache of detected silences, detection is skipped on a hit.
+            shards (int): Run the ffmpeg detector on this many time ranges of a WAV file concurrently.
+            silences (list): Silences already detected for this file, detection is skipped.
+            max_chunk_duration (float): Chunks longer than this are split at their lowest-energy points.
+            min_chunk_duration (float): Chunks shorter than this are merged with an adjacent chunk.
+            target_chunk_duration (float): Adjacent chunks are merged while the merged chunk is not longer than this.
+            audio (PCMAudio): Already decoded audio, input_file_path may then be None. See from_bytes and from_fileobj.
+            per_channel (bool): Detect the silences of every channel of the decoded audio and chunk each channel
+                separately, silences is then one list per channel and chunks are mono, tagged with their channel.
+                The cache is not used in this mode.
+            fingerprint (bool): Set the content_hash and fingerprint of every chunk, see PCMAudio.content_hash and PCMAudio.fingerprint.
+            seen_store (SeenStore): Store of the chunks already seen, implies fingerprint. A chunk whose content hash
+                is in the store gets the label of the first one in duplicate_of; a chunk whose fingerprint only is in
+                the store gets it in near_duplicate_of, distinct audio may share a fingerprint.
+        Returns:
+            AudioChunker: Audio chunker instance.
+        """
+        if input_file_path is None and audio is None:
+            raise ValueError('input_file_path is not set.')
+
+        if max_chunk_duration is not None and max_chunk_duration <= 0:
+            raise ValueError('max_chunk_duration must be greater than zero.')
+
+        if max_chunk_duration is not None and min_chunk_duration is not None and min_chunk_duration >= max_chunk_duration:
+            raise ValueError('min_chunk_duration must be lower than max_chunk_duration.')
+
+        if max_chunk_duration is not None and target_chunk_duration is not None and target_chunk_duration > max_chunk_duration:
+            raise ValueError('target_chunk_duration must not be greater than max_chunk_duration.')
+
+        if input_file_path is not None and not os.path.exists(input_file_path):
+            raise FileNotFoundError(f'Audio file {input_file_path} not found.')
+
+        self.input_file_path = input_file_path
+        self.silence_threshold = silence_threshold
+        self.silence_duration = silence_duration
+        if shards is not None and shards > 1:
+            if detector != FFMPEGSilenceDetector.name:
+                raise ValueError('shards is only supported by the ffmpeg detector.')
+            detector = FFMPEGSilenceDetector(shards=shards)
+        self.detector: SilenceDetector = _get_silence_detector(detector)
+
+        self.single_decode = single_decode
+        self.memory_map = memory_map
+        self.cache = cache
+        self.max_chunk_duration = max_chunk_duration
+        self.min_chunk_duration = min_chunk_duration
+        self.target_chunk_duration = target_chunk_duration
+        self.per_channel = per_channel
+        self.fingerprint = fingerprint or seen_store is not None
+        self.seen_store = seen_store
+
+        self.chunks: List[BaseChunk] = []
+        self.audio: PCMAudio = audio
+        self.__converted: tuple = None
+        self.__split_envelopes: dict = {}
+        self.shared_block: SharedPCMBlock = None
+        self.__shared_source: PCMAudio = None
+
+        if self.memory_map and self.audio is None:
+            self.audio = PCMAudio.from_wav(self.input_file_path, memory_map=True)
+
+        cache_key = None
+        self.silences = silences
+        if self.per_channel:
+            if self.silences is None:
+                self.silences = self.__decode_and_detect_channels()
+                _count('silences_found', sum(len(channel_silences) for channel_silences in self.silences))
+            elif self.audio is None:
+                self.audio = PCMAudio.from_file(self.input_file_path)
+            return
+
+        if self.silences is None and self.cache is not None and self.input_file_path is not None:
+            cache_key = self.cache.make_key(self.input_file_path, self.detector, self.silence_threshold, self.silence_duration)
+            self.silences = self.cache.get(cache_key)
+
+        if self.silences is not None:
+            if self.single_decode and self.audio is None:
+                self.audio = PCMAudio.from_file(self.input_file_path)
+            return
+
+        if self.single_decode or self.memory_map or self.audio is not None:
+            self.silences = self.__decode_and_detect()
+        else:
+            self.silences = self.detector.detect(self.input_file_path, self.silence_threshold, self.silence_duration)
+        _count('silences_found', len(self.silences))
+
+        if cache_key is not None:
+            self.cache.put(cache_key, self.silences)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, silence_threshold: float=-30, silence_duration: float=0.5,
+                   detector: Union[str, SilenceDetector]='ffmpeg', **kwargs) -> 'AudioChunker':
+        """
+        Audio chunker of an in-memory audio file, nothing is written to disk.
+
+        PCM WAV data is used in place, any other format is decoded by ffmpeg through stdin (with the
+        ffmpeg detector, silences are detected on the same pass). Chunks are sliced from the decoded buffer.
+
+        Parameters:
+            data (bytes): Content of the audio file, any bytes-like object.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+            detector (Union[str, SilenceDetector]): Silence detection backend, 'ffmpeg', 'numpy' or a SilenceDetector instance.
+            kwargs: Other AudioChunker options. cache, shards and memory_map need a file and are not used.
+        Returns:
+            AudioChunker: Audio chunker instance.
+        """
+        if data is None:
+            raise ValueError('data is not set.')
+
+        try:
+            audio = PCMAudio.from_wav_bytes(data)
+        except (AudioFormatException, struct.error):
+            return cls.__from_decoder(FFMPEGTools.decode_bytes, data, silence_threshold, silence_duration, detector, kwargs)
+        return cls.__from_decoded(audio, None, silence_threshold, silence_duration, detector, kwargs)
+
+    @classmethod
+    def from_fileobj(cls, fileobj, silence_threshold: float=-30, silence_duration: float=0.5,
+                     detector: Union[str, SilenceDetector]='ffmpeg', **kwargs) -> 'AudioChunker':
+        """
+        Audio chunker of a binary file object (upload stream, pipe, socket or BytesIO), nothing is written to disk.
+
+        A file object with a file descriptor is handed to ffmpeg as its stdin, any other file object is read
+        into memory and chunked with from_bytes.
+
+        Parameters:
+            fileobj: Binary file object, read from its current position.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+            detector (Union[str, SilenceDetector]): Silence detection backend, 'ffmpeg', 'numpy' or a SilenceDetector instance.
+            kwargs: Other AudioChunker options, see from_bytes.
+        Returns:
+            AudioChunker: Audio chunker instance.
+        """
+        if fileobj is None:
+            raise ValueError('fileobj is not set.')
+
+        try:
+            fileobj.fileno()
+        except (AttributeError, OSError):
+            data = fileobj.getbuffer()[fileobj.tell():] if hasattr(fileobj, 'getbuffer') else fileobj.read()
+            return cls.from_bytes(data, silence_threshold, silence_duration, detector, **kwargs)
+        return cls.__from_decoder(FFMPEGTools.decode_fileobj, fileobj, silence_threshold, silence_duration, detector, kwargs)
+
+    @classmethod
+    def __from_decoder(cls, decode, source, silence_threshold: float, silence_duration: float,
+                       detector: Union[str, SilenceDetector], kwargs: dict) -> 'AudioChunker':
+        if isinstance(_get_silence_detector(detector), FFMPEGSilenceDetector) and kwargs.get('silences') is None:
+            # Decode and detect silences on the same ffmpeg pass.
+            audio, silence_content = decode(source, silence_threshold, silence_duration)
+            silences = FFMPEGTools.get_silences_from_content(silence_content)
+            _count('silences_found', len(silences))
+            return cls.__from_decoded(audio, silences, silence_threshold, silence_duration, detector, kwargs)
+
+        audio, _ = decode(source)
+        return cls.__from_decoded(audio, None, silence_threshold, silence_duration, detector, kwargs)
+
+    @classmethod
+    def __from_decoded(cls, audio: PCMAudio, silences: list, silence_threshold: float, silence_duration: float,
+                       detector: Union[str, SilenceDetector], kwargs: dict) -> 'AudioChunker':
+        options = {k: v for k, v in kwargs.items() if k not in ('cache', 'shards', 'memory_map', 'single_decode')}
+        if silences is not None:
+            options['silences'] = silences
+        return cls(None, silence_threshold, silence_duration, detector=detector, audio=audio, **options)
+
+    def __load_wav(self):
+        # Only the formats other than PCM WAV are decoded by ffmpeg.
+        if self.audio is None and self.input_file_path is not None:
+            self.audio = _read_pcm_wav(self.input_file_path)
+
+    def __decode_and_detect(self) -> list:
+        self.__load_wav()
+        if isinstance(self.detector, FFMPEGSilenceDetector):
+            if self.audio is None:
+                # Decode and detect silences on the same ffmpeg pass.
+                self.audio, silence_content = FFMPEGTools.decode_audio(self.input_file_path, self.silence_threshold, self.silence_duration)
+                return FFMPEGTools.get_silences_from_content(silence_content)
+            if self.input_file_path is not None:
+                # The file is a WAV file, ffmpeg reads it directly.
+                return self.detector.detect(self.input_file_path, self.silence_threshold, self.silence_duration)
+            return self.detector.detect_pcm(self.audio, self.silence_threshold, self.silence_duration)
+
+        if self.audio is None:
+            self.audio = PCMAudio.from_file(self.input_file_path)
+        return self.detector.detect_pcm(self.audio, self.silence_threshold, self.silence_duration)
+
+    def __decode_and_detect_channels(self) -> List[list]:
+        self.__load_wav()
+        if isinstance(self.detector, FFMPEGSilenceDetector) and self.audio is None:
+            # Decode and detect the silences of every channel on the same ffmpeg pass.
+            self.audio, silence_content = FFMPEGTools.decode_audio(self.input_file_path, self.silence_threshold, self.silence_duration,
+                                                                   per_channel=True)
+            return FFMPEGTools.get_silences_per_channel(silence_content, self.audio.channels)
+
+        if self.audio is None:
+            self.audio = PCMAudio.from_file(self.input_file_path)
+        return self.detector.detect_pcm_channels(self.audio, self.silence_threshold, self.silence_duration)
+
+    def __channel_chunks(self, audio: PCMAudio) -> List[tuple]:
+        # Chunks of every channel ordered by start time, as (channel, ChunkRow, channel audio) tuples.
+        channel_chunks = []
+        for channel in range(audio.channels):
+            channel_audio = audio.channel(channel)
+            chunk_table = self.__create_chunks_from_silences(self.silences[channel], channel_audio, channel)
+            channel_chunks.extend((channel, chunk, channel_audio) for chunk in chunk_table)
+        channel_chunks.sort(key=lambda channel_chunk: (channel_chunk[1].start, channel_chunk[0]))
+        return channel_chunks
+
+    def __create_chunks_from_silences(self, silences: List[dict], audio: PCMAudio=None, channel: int=None) -> ChunkTable:
+        chunk_table = ChunkTable.from_silences(silences)
+        if self.max_chunk_duration is not None and np.any(chunk_table.durations > self.max_chunk_duration):
+            envelope, frame_seconds = self.__split_envelope(audio, channel)
+            with measure_stage('split_long'):
+                chunk_table = chunk_table.split_long(self.max_chunk_duration, envelope, frame_seconds, self.min_chunk_duration)
+        return chunk_table.merge_short(self.min_chunk_duration, self.max_chunk_duration, self.target_chunk_duration)
+
+    def __split_envelope(self, audio: PCMAudio=None, channel: int=None) -> tuple:
+        # The RMS envelope used to split long chunks, computed once per channel.
+        if channel not in self.__split_envelopes:
+            if audio is None:
+                audio = self.audio if self.audio is not None else PCMAudio.from_file(self.input_file_path)
+            detector = NumpySilenceDetector(measure='rms')
+            with measure_stage('split_envelope'):
+                envelope = detector.pcm_envelope(audio)
+            self.__split_envelopes[channel] = (envelope, detector.frame_length(audio.sample_rate) / audio.sample_rate)
+        return self.__split_envelopes[channel]
+
+    def sweep(self, thresholds: List[float], durations: List[float]) -> List[SweepResult]:
+        """
+        Compute silences and chunks for every silence_threshold/silence_duration combination from a single analysis pass.
+
+        The frame level envelope is computed once with the NumPy detector (the chunker's own
+        detector when it is a NumpySilenceDetector) and every combination is derived from it.
+
+        Parameters:
+            thresholds (List[float]): Silence thresholds in dB.
+            durations (List[float]): Minimum silence durations in seconds.
+        Returns:
+            List[SweepResult]: One result per combination, thresholds first then durations.
+        """
+        if not thresholds:
+            raise ValueError('thresholds was not specified')
+
+        if not durations:
+            raise ValueError('durations was not specified')
+
+        audio = self.audio if self.audio is not None else PCMAudio.from_file(self.input_file_path)
+        detector = self.detector if isinstance(self.detector, NumpySilenceDetector) else NumpySilenceDetector()
+        envelope = detector.pcm_envelope(audio)
+        frame_seconds = detector.frame_length(audio.sample_rate) / audio.sample_rate
+
+        results = []
+        for silence_threshold in thresholds:
+            starts, ends = detector.silent_runs(envelope, frame_seconds, audio.duration, silence_threshold)
+            for silence_duration in durations:
+                silences = detector.silences_from_runs(starts, ends, silence_duration)
+                silence_total = sum(silence['duration'] for silence in silences)
+                results.append(SweepResult(silence_threshold=silence_threshold, silence_duration=silence_duration, silences=silences,
+                                           chunks=self.__create_chunks_from_silences(silences, audio),
+                                           speech_duration=audio.duration - silence_total))
+        return results
+
+    def __target_audio(self, sample_rate: int, channels: int, sample_width: int) -> PCMAudio:
+        # The whole audio is converted once (and kept for the next call), the chunks are sliced from it.
+        if self.per_channel and channels is not None:
+            raise ValueError('target_channels cannot be used with per_channel, the chunks are mono.')
+
+        if sample_rate is None and channels is None and sample_width is None:
+            return self.audio
+
+        target = (sample_rate, channels, sample_width)
+        if self.__converted is None or self.__converted[0] != target:
+            audio = self.audio if self.audio is not None else PCMAudio.from_file(self.input_file_path)
+            with measure_stage('convert'):
+                self.__converted = (target, audio.convert(sample_rate, channels, sample_width))
+        return self.__converted[1]
+
+    def __identify(self, chunk: BaseChunk, pcm: PCMAudio):
+        chunk.content_hash = pcm.content_hash()
+        chunk.fingerprint = pcm.fingerprint()
+        if self.seen_store is not None:
+            label = f'{self.input_file_path or "memory"}@{chunk.start:.3f}'
+            if chunk.channel is not None:
+                label += f'#{chunk.channel}'
+            chunk.duplicate_of = self.seen_store.check([f'hash:{chunk.content_hash}'], label)
+            near_duplicate_of = self.seen_store.check([f'fingerprint:{chunk.fingerprint}'], label)
+            if chunk.duplicate_of is not None:
+                _count('duplicates')
+            elif near_duplicate_of is not None:
+                # Only an exact match is a duplicate, the coarse fingerprint also matches distinct audio.
+                chunk.near_duplicate_of = near_duplicate_of
+                _count('near_duplicates')
+
+    def __shared_block(self, audio: PCMAudio) -> SharedPCMBlock:
+        # One block per source audio, a new target format replaces it.
+        if self.shared_block is None or self.__shared_source is not audio:
+            self.release_shared_memory()
+            self.shared_block = SharedPCMBlock(audio if audio is not None else PCMAudio.from_file(self.input_file_path))
+            self.__shared_source = audio
+        return self.shared_block
+
+    def release_shared_memory(self):
+        """
+        Close and unlink the shared memory block of chunking_segment(shared_memory=True).
+
+        Workers already attached keep their mapping until they exit or call SharedPCM.detach_all.
+        """
+        if self.shared_block is not None:
+            self.shared_block.close()
+            self.shared_block.unlink()
+            self.shared_block = None
+            self.__shared_source = None
+
+    def chunking_segment(self, target_sample_rate: int=None, target_channels: int=None, target_sample_width: int=None,
+                         shared_memory: bool=False) -> SegmentChunk:
+        """
+        Chunking the audio file and return a SegmentChunk iterator.
+
+        Parameters:
+            target_sample_rate (int): Sample rate of the chunks, e.g. 16000. The audio is converted once before slicing.
+            target_channels (int): Number of channels of the chunks, 1 downmixes.
+            target_sample_width (int): Sample width of the chunks in bytes, e.g. 2 for 16 bits.
+            shared_memory (bool): Copy the audio once into a shared memory block (see shared_block). Chunks carry
+                a SharedPCM handle and only the handle is pickled, worker processes attach the PCM zero-copy.
+                The block lives until release_shared_memory is called.
+        Returns:
+            SegmentChunk: SegmentChunk instance.
+        """
+        if self.per_channel and shared_memory:
+            raise ValueError('shared_memory is not supported with per_channel.')
+
+        audio = self.__target_audio(target_sample_rate, target_channels, target_sample_width)
+        if self.per_channel:
+            chunk_list = self.__channel_chunks(audio)
+        else:
+            chunk_list = [(None, chunk, audio) for chunk in self.__create_chunks_from_silences(self.silences)]
+        shared_block = None
+        if shared_memory:
+            shared_block = self.__shared_block(audio)
+        audio_segment = None
+        if audio is None and shared_block is None:
+            with measure_stage('wav_load'):
+                audio_segment = AudioSegment.from_wav(self.input_file_path)
+
+        # Slicing time is summed over the chunks and reported once, the consumer's time between chunks is not included.
+        slice_seconds = 0.0
+        fingerprint_seconds = 0.0
+        chunk_count = 0
+        try:
+            for channel, chunk, chunk_audio in chunk_list:
+                started = time.perf_counter()
+                if shared_block is not None:
+                    pcm, handle = shared_block.slice(chunk.start_milliseconds, chunk.end_milliseconds)
+                    segment_chunk = SegmentChunk(**chunk.to_dict(), pcm=pcm, shared=handle)
+                elif audio_segment is None:
+                    segment_chunk = SegmentChunk(**chunk.to_dict(), pcm=chunk_audio.slice(chunk.start_milliseconds, chunk.end_milliseconds),
+                                                 channel=channel)
+                else:
+                    segment_chunk = SegmentChunk(**chunk.to_dict(), audio_segment=audio_segment[chunk.start_milliseconds:chunk.end_milliseconds])
+                slice_seconds += time.perf_counter() - started
+                if self.fingerprint:
+                    started = time.perf_counter()
+                    pcm = segment_chunk.pcm if segment_chunk.pcm is not None else PCMAudio.from_audio_segment(segment_chunk.audio_segment)
+                    self.__identify(segment_chunk, pcm)
+                    fingerprint_seconds += time.perf_counter() - started
+                chunk_count += 1
+                yield segment_chunk
+        finally:
+            get_metrics_sink().stage('slice', slice_seconds)
+            if self.fingerprint:
+                get_metrics_sink().stage('fingerprint', fingerprint_seconds)
+            _count('chunks', chunk_count)
+
+    stream_read_size: int = 65536
+
+    @classmethod
+    def stream(cls, source, silence_threshold: float=-30, silence_duration: float=0.5, follow: bool=False) -> SegmentChunk:
+        """
+        Chunking an audio source while ffmpeg is still decoding it and return a SegmentChunk iterator.
+
+        ffmpeg silencedetect events are read from stderr line by line and the decoded PCM
+        from stdout, so each chunk is yielded as soon as its utterance is closed. The chunks
+        are the same as the ones produced by chunking_segment for the same audio.
+
+        Parameters:
+            source: File path to the audio file, '-' for the standard input, or a binary file-like object.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+            follow (bool): Keep reading a file that is still being written. The iterator only ends when it is closed.
+        Returns:
+            SegmentChunk: SegmentChunk instance.
+        """
+        if source is None:
+            raise ValueError('source is not set.')
+
+        if silence_threshold is None:
+            raise ValueError('silence_threshold is not set.')
+
+        if silence_duration is None:
+            raise ValueError('silence_duration is not set.')
+
+        if source == '-':
+            source = sys.stdin.buffer
+
+        input_file = None
+        if isinstance(source, str):
+            if not os.path.exists(source):
+                raise FileNotFoundError(f'Audio file {source} not found.')
+            # The WAV data size of a file still being written is stale, ffmpeg would stop reading there.
+            audio_input = ['-follow', '1', '-ignore_length', '1', '-i', f'file:{source}'] if follow else ['-i', source]
+        else:
+            input_file = source
+            audio_input = ['-i', 'pipe:0']
+
+        stream_command = ['ffmpeg', '-hide_banner', '-nostats', *audio_input, '-vn',
+                          '-af', f'silencedetect=noise={silence_threshold}dB:d={silence_duration}', '-acodec', 'pcm_s16le', '-f', 'wav', 'pipe:1']
+
+        stdin = subprocess.DEVNULL
+        if input_file is not None:
+            try:
+                stdin = input_file.fileno()
+            except (AttributeError, OSError):
+                stdin = subprocess.PIPE
+
+        # The process holds a runner slot while it streams, without a timeout.
+        runner = get_process_runner()
+        acquired = runner.acquire('ffmpeg_stream')
+        started = time.perf_counter()
+        try:
+            process = runner.popen(stream_command, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except BaseException:
+            runner.release('ffmpeg_stream', acquired)
+            raise
+        events = queue.Queue()
+        ffmpeg_content = []
+
+        def read_events():
+            for raw_line in process.stderr:
+                line = raw_line.decode('utf-8', errors='replace')
+                ffmpeg_content.append(line)
+                event = FFMPEGTools.parse_silence_line(line)
+                if event is not None:
+                    events.put(event)
+
+        def write_input():
+            try:
+                while True:
+                    block = input_file.read(cls.stream_read_size)
+                    if not block:
+                        break
+                    process.stdin.write(block)
+            except (BrokenPipeError, ValueError):
+                pass
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+        threads = [threading.Thread(target=read_events, daemon=True)]
+        if stdin == subprocess.PIPE:
+            threads.append(threading.Thread(target=write_input, daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            buffer = bytearray()
+            header = None
+            # Frame index of buffer[0], the PCM before it is not needed anymore.
+            buffer_frame = 0
+            received_frames = 0
+            last_silence_end = None
+            pending: List[BaseChunk] = []
+            finished = False
+            chunk_count = 0
+
+            while True:
+                block = process.stdout.read1(cls.stream_read_size)
+                finished = not block
+                buffer += block
+
+                if header is None:
+                    try:
+                        header = _parse_wav_header(buffer)
+                    except AudioFormatException:
+                        if finished:
+                            break
+                        continue
+                    del buffer[:header['data_offset']]
+                    frame_width = header['channels'] * header['sample_width']
+                    sample_rate = header['sample_rate']
+
+                received_frames = buffer_frame + len(buffer) // frame_width
+
+                if finished:
+                    for thread in threads:
+                        thread.join()
+
+                while not events.empty():
+                    event = events.get()
+                    if 'start' in event and last_silence_end is not None:
+                        start, duration = _chunk_bounds(last_silence_end, event['start'])
+                        pending.append(BaseChunk(start=start, end=duration + start, duration=duration))
+                    elif 'end' in event:
+                        last_silence_end = event['end']
+
+                while pending and (finished or _chunk_end_available(pending[0].end_milliseconds, sample_rate, received_frames)):
+                    chunk = pending.pop(0)
+                    start = _frame_position(chunk.start_milliseconds, sample_rate, received_frames) - buffer_frame
+                    end = _frame_position(chunk.end_milliseconds, sample_rate, received_frames) - buffer_frame
+                    data = bytes(buffer[start * frame_width:end * frame_width])
+                    missing_frames = (end - start) - len(data) // frame_width
+                    if missing_frames > 0:
+                        data += b'\x00' * frame_width * missing_frames
+                    chunk_count += 1
+                    yield SegmentChunk(**chunk.to_dict(), pcm=PCMAudio(data, sample_rate, header['channels'], header['sample_width']))
+
+                if last_silence_end is not None:
+                    # Drop the PCM before the start of the next chunk.
+                    next_start = pending[0].start if pending else _chunk_bounds(last_silence_end, last_silence_end)[0]
+                    drop_frames = min(int(next_start * sample_rate) - 1, received_frames) - buffer_frame
+                    if drop_frames > 0:
+                        del buffer[:drop_frames * frame_width]
+                        buffer_frame += drop_frames
+
+                if finished:
+                    break
+
+            process.wait()
+            if process.returncode != 0:
+                raise FFMPEGException(f'Error while trying to stream audio. {"".join(ffmpeg_content[-20:])}')
+        finally:
+            if process.returncode is None:
+                runner.kill(process)
+                process.wait()
+            process.stdout.close()
+            runner.release('ffmpeg_stream', acquired)
+            get_metrics_sink().stage('ffmpeg_stream', time.perf_counter() - started, _rusage_dict(process.rusage))
+            _count('chunks', chunk_count)
+
+    def chunking_manifest(self, manifest_path: str=None, format: str=None) -> ChunkManifest:
+        """
+        Chunking the audio file without writing any audio: every chunk is a frame and byte range of the input WAV file.
+
+        Parameters:
+            manifest_path (str): Save the manifest to this path, nothing is written when not set.
+            format (str): Manifest format, 'jsonl' or 'npz', see ChunkManifest.write.
+        Returns:
+            ChunkManifest: ChunkManifest instance.
+        """
+        if self.per_channel:
+            raise ValueError('chunking_manifest does not support per_channel, the chunks of a channel are not contiguous bytes.')
+
+        if self.input_file_path is None or not _is_wav_file(self.input_file_path):
+            raise AudioFormatException('chunking_manifest requires a PCM WAV input file.')
+
+        with open(self.input_file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                header = _parse_wav_header(mapped)
+        if header['audio_format'] != 1:
+            raise AudioFormatException(f'{self.input_file_path} is not a PCM WAV file.')
+
+        with measure_stage('manifest'):
+            chunk_times = self.__create_chunks_from_silences(self.silences)
+            manifest = ChunkManifest.from_chunk_table(self.input_file_path, header, chunk_times, self.silences)
+            if manifest_path is not None:
+                manifest.write(manifest_path, format)
+        _count('chunks', len(manifest))
+        return manifest
+
+    def chunking_file(self, chunks_path: str=None, chunk_suffix: str='chunk_', workers: int=1, executor: Executor=None,
+                      format: str='wav', parameters: List[str]=None, batch_size: int=256, target_sample_rate: int=None,
+                      target_channels: int=None, target_sample_width: int=None) -> tuple:
+        """
+        Chunking the audio file and return tuple with a FileChunk list and silences list.
+
+        WAV chunk files are written by a direct WAV writer, byte for byte identical to the pydub wav export.
+        Any other format is encoded by ffmpeg, one run writes up to batch_size chunks.
+
+        Parameters:
+            chunks_path (str): Path to the chunks directory.
+            chunk_suffix (str): Chunk suffix.
+            workers (int): Number of threads writing chunk files (or running ffmpeg batches) concurrently.
+            executor (Executor): Executor used to write the chunk files instead of a new thread pool.
+            format (str): Chunk file format and extension, e.g. 'wav', 'flac', 'mp3' or 'opus'.
+            parameters (List[str]): Extra ffmpeg output options for non WAV formats, e.g. ['-b:a', '32k'].
+            batch_size (int): Maximum number of chunks written by one ffmpeg run.
+            target_sample_rate (int): Sample rate of the chunks, e.g. 16000. The audio is converted once before slicing.
+            target_channels (int): Number of channels of the chunks, 1 downmixes.
+            target_sample_width (int): Sample width of the chunks in bytes, e.g. 2 for 16 bits.
+        Returns:
+            tuple: Tuple with a FileChunk list and silences list.
+        """
+        if chunks_path is None:
+            raise ValueError('chunks_path was not specified and must be a directory')             
+       
+        if not os.path.isdir(chunks_path):
+            raise Exception('chunks_path must be a directory')
+
+        if workers is None or workers < 1:
+            raise ValueError('workers must be greater than zero')
+
+        if batch_size is None or batch_size < 1:
+            raise ValueError('batch_size must be greater than zero')
+
+        try:
+            audio = self.__target_audio(target_sample_rate, target_channels, target_sample_width)
+            if self.per_channel:
+                chunk_list = self.__channel_chunks(audio)
+            else:
+                chunk_times: ChunkTable = self.__create_chunks_from_silences(self.silences)
+                chunk_list = [(None, chunk, audio) for chunk in chunk_times]
+            chunk_paths = [os.path.join(chunks_path, f'{chunk_suffix}{chunk_count}.{format}') for chunk_count in range(len(chunk_list))]
+            if format != 'wav':
+                if self.per_channel:
+                    file_chunks = self.__export_encoded_channels(chunk_list, chunk_paths, parameters, batch_size, workers, executor)
+                else:
+                    file_chunks = self.__export_encoded(chunk_times, chunk_paths, parameters, batch_size, workers, executor, audio)
+                self.__identify_file_chunks(file_chunks, chunk_list)
+                self.chunks.extend(file_chunks)
+                return (self.chunks, self.silences)
+
+            audio_segment = None
+            if audio is None:
+                with measure_stage('wav_load'):
+                    audio_segment = AudioSegment.from_wav(self.input_file_path)
+
+            def export(channel_chunk: tuple, chunk_path: str) -> FileChunk:
+                channel, chunk, chunk_audio = channel_chunk
+                if chunk_audio is not None:
+                    # Write straight from the decoded (or memory mapped) buffer.
+                    segment = chunk_audio.slice(chunk.start_milliseconds, chunk.end_milliseconds)
+                else:
+                    segment = PCMAudio.from_audio_segment(audio_segment[chunk.start_milliseconds:chunk.end_milliseconds])
+                chunk.content_size = segment.write_wav(chunk_path)
+                return FileChunk(**chunk.to_dict(), chunk_file_path=chunk_path, channel=channel)
+
+            with measure_stage('export'):
+                if executor is not None:
+                    file_chunks = list(executor.map(export, chunk_list, chunk_paths))
+                elif workers > 1:
+                    with ThreadPoolExecutor(max_workers=workers) as pool:
+                        file_chunks = list(pool.map(export, chunk_list, chunk_paths))
+                else:
+                    file_chunks = [export(channel_chunk, chunk_path) for channel_chunk, chunk_path in zip(chunk_list, chunk_paths)]
+            _count('chunks', len(file_chunks))
+            _count('bytes_written', sum(file_chunk.content_size for file_chunk in file_chunks))
+            self.__identify_file_chunks(file_chunks, chunk_list)
+
+            self.chunks.extend(file_chunks)
+            return (self.chunks, self.silences)
+        except Exception as e:
+            raise e
+
+    def __read_source(self) -> PCMAudio:
+        # Memory-mapped when the input is a PCM WAV file, other WAV encodings and formats are decoded by ffmpeg.
+        audio = _read_pcm_wav(self.input_file_path, memory_map=True)
+        return audio if audio is not None else PCMAudio.from_file(self.input_file_path)
+
+    def __identify_file_chunks(self, file_chunks: List[FileChunk], chunk_list: List[tuple]):
+        # The chunk PCM is sliced again from the source audio, the written files are not read back.
+        if not self.fingerprint:
+            return
+
+        source = None
+        try:
+            with measure_stage('fingerprint'):
+                for file_chunk, (_, chunk, chunk_audio) in zip(file_chunks, chunk_list):
+                    if chunk_audio is None:
+                        if source is None:
+                            source = self.__read_source()
+                        chunk_audio = source
+                    self.__identify(file_chunk, chunk_audio.slice(chunk.start_milliseconds, chunk.end_milliseconds))
+        finally:
+            if source is not None:
+                source.close()
+
+    def __export_encoded_channels(self, chunk_list: List[tuple], chunk_paths: List[str], parameters: List[str], batch_size: int,
+                                  workers: int, executor: Executor) -> List[FileChunk]:
+        # The mono audio of each channel is piped to its own ffmpeg batches.
+        file_chunks = [None] * len(chunk_list)
+        channels = {}
+        for position, (channel, chunk, chunk_audio) in enumerate(chunk_list):
+            channels.setdefault(channel, (chunk.table, chunk_audio, {}))[2][chunk.index] = position
+        for channel, (chunk_table, chunk_audio, positions) in channels.items():
+            indexes = sorted(positions)
+            channel_table = ChunkTable(chunk_table.array[indexes])
+            exported = self.__export_encoded(channel_table, [chunk_paths[positions[index]] for index in indexes], parameters,
+                                             batch_size, workers, executor, chunk_audio)
+            for index, file_chunk in zip(indexes, exported):
+                file_chunk.channel = channel
+                file_chunks[positions[index]] = file_chunk
+        return file_chunks
+
+    def __export_encoded(self, chunk_times: ChunkTable, chunk_paths: List[str], parameters: List[str], batch_size: int,
+                         workers: int, executor: Executor, source: PCMAudio) -> List[FileChunk]:
+        # Decoded (or converted) audio is piped to ffmpeg, a WAV input on disk is read by ffmpeg directly.
+        piped = source is not None and (source is not self.audio or not self.memory_map)
+        audio = source if source is not None else self.__read_source()
+        try:
+            segments = [(_frame_position(chunk.start_milliseconds, audio.sample_rate, audio.frame_count),
+                         _frame_position(chunk.end_milliseconds, audio.sample_rate, audio.frame_count)) for chunk in chunk_times]
+        finally:
+            if audio is not source:
+                audio.close()
+
+        def export(batch_start: int) -> List[int]:
+            batch = slice(batch_start, batch_start + batch_size)
+            return FFMPEGTools.export_segments(self.input_file_path, segments[batch], chunk_paths[batch], parameters,
+                                               audio=source if piped else None)
+
+        batch_starts = range(0, len(segments), batch_size)
+        with measure_stage('export'):
+            if executor is not None:
+                sizes = list(executor.map(export, batch_starts))
+            elif workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    sizes = list(pool.map(export, batch_starts))
+            else:
+                sizes = [export(batch_start) for batch_start in batch_starts]
+
+        chunk_times.content_sizes[:] = [size for batch_sizes in sizes for size in batch_sizes]
+        _count('chunks', len(chunk_times))
+        _count('bytes_written', int(chunk_times.content_sizes.sum()))
+        return [FileChunk(**chunk.to_dict(), chunk_file_path=chunk_path) for chunk, chunk_path in zip(chunk_times, chunk_paths)]
@@ -0,0 +1,358 @@
+from typing import List, Union
+
+import numpy as np
+from pydub import AudioSegment
+
+from .pcm import PCMAudio
+from .shared import SharedPCM
+
+
+def _chunk_bounds(silence_end, next_silence_start) -> tuple:
+    # Start and duration of the chunk between two silences, for floats or numpy arrays, see ChunkTable.from_silences.
+    start = silence_end - 0.25
+    duration = next_silence_start - silence_end + 3 * 0.25
+    return (start, duration)
+
+
+def _chunk_end_available(end_milliseconds: float, sample_rate: int, available_frames: int) -> bool:
+    # One millisecond past the chunk end must be available so the slicing matches the one on the whole audio.
+    return int(end_milliseconds * (sample_rate / 1000.0)) + sample_rate // 1000 + 1 <= available_frames
+
+
+class BaseChunk:
+    __slots__ = ('content_size', 'start', 'end', 'start_milliseconds', 'end_milliseconds', 'duration', 'conf', 'text', 'channel',
+                 'content_hash', 'fingerprint', 'duplicate_of', 'near_duplicate_of')
+
+    def __init__(self, **kwargs):
+        self.content_size: float = kwargs.get('content_size', 0)
+        self.start: float = kwargs.get('start', 0)
+        self.end: float = kwargs.get('end', 0)
+        self.start_milliseconds = self.start * 1000
+        self.end_milliseconds = self.end * 1000
+        self.duration: float = kwargs.get('duration', 0)        
+        self.conf = 1.0
+        self.text: str = kwargs.get('text', None)
+        self.channel: int = kwargs.get('channel', None)
+        self.content_hash: str = kwargs.get('content_hash', None)
+        self.fingerprint: str = kwargs.get('fingerprint', None)
+        self.duplicate_of: str = kwargs.get('duplicate_of', None)
+        self.near_duplicate_of: str = kwargs.get('near_duplicate_of', None)
+
+    def to_dict(self) -> dict:
+        return {'content_size': self.content_size, 'start': self.start, 'end': self.end, 'duration': self.duration, 'text': self.text,
+                'channel': self.channel, 'content_hash': self.content_hash, 'fingerprint': self.fingerprint,
+                'duplicate_of': self.duplicate_of, 'near_duplicate_of': self.near_duplicate_of}
+
+    def __getstate__(self) -> dict:
+        # Chunks have no __dict__, the slots of every class are pickled (and the __dict__ of subclasses without slots).
+        state = dict(getattr(self, '__dict__', {}))
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state: dict):
+        for name, value in state.items():
+            setattr(self, name, value)
+    
+    def __repr__(self):
+        return f'start:{self.start} end:{self.end} duration:{self.duration} content_size:{self.content_size} text:{self.text}'
+
+
+class SegmentChunk(BaseChunk):
+    __slots__ = ('pcm', '_audio_segment', 'shared')
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)        
+        self.pcm: PCMAudio = kwargs.get('pcm', None)
+        self.audio_segment: AudioSegment = kwargs.get('audio_segment', None) 
+        self.shared: SharedPCM = kwargs.get('shared', None)
+        if self.pcm is not None:
+            self.content_size = len(self.pcm.data)
+        elif self._audio_segment is not None:
+            self.content_size = len(self._audio_segment.raw_data)
+
+    @property
+    def audio_segment(self) -> AudioSegment:
+        # Chunks sliced from a PCMAudio only build their AudioSegment when it is requested.
+        if self._audio_segment is None and self.pcm is not None:
+            self._audio_segment = self.pcm.to_audio_segment()
+        return self._audio_segment
+
+    @audio_segment.setter
+    def audio_segment(self, audio_segment: AudioSegment):
+        self._audio_segment = audio_segment
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        if self.shared is not None:
+            # Only the handle crosses the process boundary, the PCM is attached from shared memory.
+            state['pcm'] = None
+            state['_audio_segment'] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        super().__setstate__(state)
+        if state.get('shared') is not None and state.get('pcm') is None:
+            self.pcm = self.shared.attach()
+
+    def samples(self) -> np.ndarray:
+        """
+        Zero-copy integer view of the chunk samples shaped (frames, channels).
+        """
+        if self.pcm is None:
+            return np.array(self.audio_segment.get_array_of_samples()).reshape(-1, self.audio_segment.channels)
+        return self.pcm.array()
+
+
+class FileChunk(BaseChunk):
+    __slots__ = ('chunk_file_path',)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.chunk_file_path: str = kwargs.get('chunk_file_path', None)
+    
+    def __repr__(self):
+        return f'chunk_file_path:{self.chunk_file_path}, start:{self.start} end:{self.end} duration:{self.duration} content_size:{self.content_size} text:{self.text}'
+
+
+class SilenceTable:
+    """
+    Silences stored column-wise in a NumPy structured array (start, end, duration).
+    """
+    dtype = np.dtype([('start', 'f8'), ('end', 'f8'), ('duration', 'f8')])
+
+    def __init__(self, array: np.ndarray=None):
+        self.array: np.ndarray = np.zeros(0, dtype=self.dtype) if array is None else array
+
+    @classmethod
+    def from_silences(cls, silences: Union[List[dict], 'SilenceTable']) -> 'SilenceTable':
+        """
+        Build a SilenceTable from a silence list (as returned by FFMPEGTools.get_silences_from_content).
+
+        Parameters:
+            silences (List[dict]): Silences with start, end and duration keys.
+        Returns:
+            SilenceTable: SilenceTable instance.
+        """
+        if isinstance(silences, SilenceTable):
+            return silences
+        array = np.fromiter(((silence['start'], silence['end'], silence['duration']) for silence in silences),
+                            dtype=cls.dtype, count=len(silences))
+        return cls(array)
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self.array['start']
+
+    @property
+    def ends(self) -> np.ndarray:
+        return self.array['end']
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self.array['duration']
+
+    def to_list(self) -> List[dict]:
+        return [{'start': start, 'end': end, 'duration': duration} for start, end, duration in self.array.tolist()]
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __repr__(self):
+        return f'SilenceTable(silences:{len(self)})'
+
+
+class ChunkRow:
+    """
+    Lightweight view over one ChunkTable row exposing the BaseChunk attributes.
+    """
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table: 'ChunkTable', index: int):
+        self.table = table
+        self.index = index
+
+    @property
+    def start(self) -> float:
+        return float(self.table.array['start'][self.index])
+
+    @property
+    def end(self) -> float:
+        return float(self.table.array['end'][self.index])
+
+    @property
+    def duration(self) -> float:
+        return float(self.table.array['duration'][self.index])
+
+    @property
+    def content_size(self) -> int:
+        return int(self.table.array['content_size'][self.index])
+
+    @content_size.setter
+    def content_size(self, content_size: int):
+        self.table.array['content_size'][self.index] = content_size
+
+    @property
+    def start_milliseconds(self) -> float:
+        return self.start * 1000
+
+    @property
+    def end_milliseconds(self) -> float:
+        return self.end * 1000
+
+    def to_dict(self) -> dict:
+        return {'content_size': self.content_size, 'start': self.start, 'end': self.end, 'duration': self.duration}
+
+    def __repr__(self):
+        return f'start:{self.start} end:{self.end} duration:{self.duration} content_size:{self.content_size}'
+
+
+class ChunkTable:
+    """
+    Chunk boundaries stored column-wise in a NumPy structured array (start, end, duration, content_size).
+
+    Iterating yields ChunkRow views, no per-chunk object is kept by the table.
+    """
+    dtype = np.dtype([('start', 'f8'), ('end', 'f8'), ('duration', 'f8'), ('content_size', 'i8')])
+
+    def __init__(self, array: np.ndarray=None):
+        self.array: np.ndarray = np.zeros(0, dtype=self.dtype) if array is None else array
+
+    @classmethod
+    def from_silences(cls, silences: Union[List[dict], SilenceTable]) -> 'ChunkTable':
+        """
+        Compute the chunks between consecutive silences.
+
+        Every chunk starts 0.25 seconds before the end of a silence and ends 0.5 seconds
+        after the start of the next one.
+
+        Parameters:
+            silences (List[dict]): Silences list or SilenceTable.
+        Returns:
+            ChunkTable: ChunkTable instance.
+        """
+        silence_table = SilenceTable.from_silences(silences)
+        array = np.zeros(max(len(silence_table) - 1, 0), dtype=cls.dtype)
+        if len(array):
+            start, duration = _chunk_bounds(silence_table.ends[:-1], silence_table.starts[1:])
+            array['start'] = start
+            array['duration'] = duration
+            array['end'] = duration + start
+        return cls(array)
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self.array['start']
+
+    @property
+    def ends(self) -> np.ndarray:
+        return self.array['end']
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self.array['duration']
+
+    @property
+    def content_sizes(self) -> np.ndarray:
+        return self.array['content_size']
+
+    @classmethod
+    def from_bounds(cls, starts: np.ndarray, ends: np.ndarray) -> 'ChunkTable':
+        array = np.zeros(len(starts), dtype=cls.dtype)
+        array['start'] = starts
+        array['end'] = ends
+        array['duration'] = array['end'] - array['start']
+        return cls(array)
+
+    def split_long(self, max_duration: float, envelope: np.ndarray, frame_seconds: float, min_duration: float=None) -> 'ChunkTable':
+        """
+        Split the chunks longer than max_duration at their lowest-energy frames.
+
+        Each cut is placed at the quietest frame between min_duration (max_duration / 2 when not set)
+        and max_duration after the previous cut, keeping the last piece at least min_duration long when possible.
+
+        Parameters:
+            max_duration (float): Maximum chunk duration in seconds.
+            envelope (np.ndarray): Level of each frame in dB, see NumpySilenceDetector.pcm_envelope.
+            frame_seconds (float): Duration of an envelope frame in seconds.
+            min_duration (float): Minimum duration of the pieces in seconds.
+        Returns:
+            ChunkTable: New ChunkTable, chunks not longer than max_duration are unchanged.
+        """
+        if not np.any(self.durations > max_duration):
+            return self
+
+        lower = min_duration if min_duration else max_duration / 2
+        starts, ends = [], []
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            cursor = start
+            while end - cursor > max_duration:
+                remaining = end - cursor
+                window_start, window_end = cursor + lower, min(cursor + max_duration, end - lower)
+                if window_end <= window_start:
+                    # The rest cannot be split in pieces of at least min_duration, cut around its middle.
+                    window_start = max(cursor + remaining / 4, end - max_duration)
+                    window_end = min(cursor + 3 * remaining / 4, cursor + max_duration)
+                first = int(np.ceil(window_start / frame_seconds))
+                last = min(int(window_end / frame_seconds), len(envelope))
+                if last > first:
+                    cut = (first + int(np.argmin(envelope[first:last])) + 0.5) * frame_seconds
+                else:
+                    cut = (window_start + window_end) / 2
+                starts.append(cursor)
+                ends.append(cut)
+                cursor = cut
+            starts.append(cursor)
+            ends.append(end)
+        return ChunkTable.from_bounds(np.array(starts), np.array(ends))
+
+    def merge_short(self, min_duration: float=None, max_duration: float=None, target_duration: float=None) -> 'ChunkTable':
+        """
+        Merge adjacent chunks, the silence between them becomes part of the merged chunk.
+
+        A chunk shorter than min_duration is merged with the previous one (or the previous one with it), and with
+        target_duration adjacent chunks are packed while the merged chunk is not longer than target_duration.
+        No merge produces a chunk longer than max_duration.
+
+        Returns:
+            ChunkTable: New ChunkTable.
+        """
+        if len(self) < 2 or (not min_duration and not target_duration):
+            return self
+
+        starts, ends = [], []
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            if starts:
+                merged_duration = end - starts[-1]
+                short = min_duration and (ends[-1] - starts[-1] < min_duration or end - start < min_duration)
+                packed = target_duration and merged_duration <= target_duration
+                if (short or packed) and (max_duration is None or merged_duration <= max_duration):
+                    ends[-1] = max(ends[-1], end)
+                    continue
+            starts.append(start)
+            ends.append(end)
+        return ChunkTable.from_bounds(np.array(starts), np.array(ends))
+
+    def to_chunks(self) -> List[BaseChunk]:
+        return [BaseChunk(**row.to_dict()) for row in self]
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, index: int) -> ChunkRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('chunk index out of range')
+        return ChunkRow(self, index)
+
+    def __iter__(self):
+        return (ChunkRow(self, index) for index in range(len(self)))
+
+    def __repr__(self):
+        return f'ChunkTable(chunks:{len(self)})'
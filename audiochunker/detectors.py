@@ -0,0 +1,587 @@
+import os
+import time
+from typing import List, Union
+
+import numpy as np
+
+from .chunks import SilenceTable
+from .ffmpeg import FFMPEGTools
+from .metrics import _count, measure_stage
+from .pcm import PCMAudio, _pcm_to_array, _read_pcm_wav
+
+
+class SilenceDetector:
+    """
+    Base class for silence detection backends.
+
+    A detector returns the silences of an audio file as a list of dictionaries
+    with the start, end and duration of each silence, in seconds, the same
+    format produced by FFMPEGTools.get_silences_from_content.
+    """
+    name: str = None
+
+    def cache_key(self) -> str:
+        """
+        Identify the detector and its parameters in cache keys.
+        """
+        return self.name
+
+    def detect(self, audio_path: str, silence_threshold: float=-30, silence_duration: float=0.5) -> list:
+        """
+        Detect the silences of an audio file.
+
+        Parameters:
+            audio_path (str): File path to the audio file.
+            silence_threshold (float): Silence threshold in dB.
+            silence_duration (float): Minimum silence duration in seconds.
+        Returns:
+            list: List of dictionaries with the start, end and duration of the silence.
+        """
+        raise NotImplementedError
+
+    def detect_pcm(self, audio: PCMAudio, silence_threshold: float=-30, silence_duration: float=0.5) -> list:
+        """
+        Detect the silences of already decoded audio.
+
+        Parameters:
+            audio (PCMAudio): Decoded audio.
+            silence_threshold (float): Silence threshold in dB.
+            silence_duration (float): Minimum silence duration in seconds.
+        Returns:
+            list: List of dictionaries with the start, end and duration of the silence.
+        """
+        raise NotImplementedError
+
+    def detect_pcm_channels(self, audio: PCMAudio, silence_threshold: float=-30, silence_duration: float=0.5) -> List[list]:
+        """
+        Detect the silences of each channel of already decoded audio.
+
+        The default implementation runs detect_pcm on every channel.
+
+        Parameters:
+            audio (PCMAudio): Decoded audio.
+            silence_threshold (float): Silence threshold in dB.
+            silence_duration (float): Minimum silence duration in seconds.
+        Returns:
+            List[list]: One silences list per channel.
+        """
+        return [self.detect_pcm(audio.channel(channel), silence_threshold, silence_duration) for channel in range(audio.channels)]
+
+
+class FFMPEGSilenceDetector(SilenceDetector):
+    """
+    Silence detector backed by the ffmpeg silencedetect filter.
+    """
+    name = 'ffmpeg'
+    shards: int = 1
+
+    def __init__(self, shards: int=1):
+        """
+        Parameters:
+            shards (int): Split long WAV files in this many time ranges analysed by concurrent ffmpeg processes.
+        """
+        if shards is None or shards < 1:
+            raise ValueError('shards must be greater than zero')
+
+        self.shards = shards
+
+    def detect(self, audio_path: str, silence_threshold: float=-30, silence_duration: float=0.5) -> list:
+        if self.shards > 1:
+            return FFMPEGTools.create_silences_sharded(audio_path, silence_threshold, silence_duration, self.shards)
+        silence_content = FFMPEGTools.create_silence_content(audio_path, silence_threshold, silence_duration)
+        return FFMPEGTools.get_silences_from_content(silence_content)
+
+    def detect_pcm(self, audio: PCMAudio, silence_threshold: float=-30, silence_duration: float=0.5) -> list:
+        silence_content = FFMPEGTools.create_silence_content_from_pcm(audio, silence_threshold, silence_duration)
+        return FFMPEGTools.get_silences_from_content(silence_content)
+
+    def detect_pcm_channels(self, audio: PCMAudio, silence_threshold: float=-30, silence_duration: float=0.5) -> List[list]:
+        # One ffmpeg run, silencedetect reports every channel in mono mode.
+        silence_content = FFMPEGTools.create_silence_content_from_pcm(audio, silence_threshold, silence_duration, per_channel=True)
+        return FFMPEGTools.get_silences_per_channel(silence_content, audio.channels)
+
+
+class NumpySilenceDetector(SilenceDetector):
+    """
+    In-process silence detector for PCM WAV files.
+
+    The audio is split in frames of frame_duration seconds and the level of each
+    frame is measured in dBFS. With measure='peak' (default) a frame is silent when
+    every sample is below the threshold, the same criterion used by ffmpeg
+    silencedetect, so silence_threshold means the same for both backends.
+    With measure='rms' the frame RMS is compared to the threshold instead.
+    """
+    name = 'numpy'
+    block_frames = 4096
+
+    def __init__(self, frame_duration: float=0.01, measure: str='peak'):
+        if frame_duration is None or frame_duration <= 0:
+            raise ValueError('frame_duration must be greater than zero.')
+
+        if measure not in ('peak', 'rms'):
+            raise ValueError(f'Unknown measure {measure}.')
+
+        self.frame_duration = frame_duration
+        self.measure = measure
+
+    def cache_key(self) -> str:
+        return f'{self.name}:{self.frame_duration}:{self.measure}'
+
+    def detect(self, audio_path: str, silence_threshold: float=-30, silence_duration: float=0.5) -> list:
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+
+        return self.detect_pcm(PCMAudio.from_wav(audio_path), silence_threshold, silence_duration)
+
+    def detect_pcm(self, audio: PCMAudio, silence_threshold: float=-30, silence_duration: float=0.5) -> list:
+        with measure_stage('numpy_silencedetect'):
+            envelope = self.pcm_envelope(audio)
+            frame_seconds = self.frame_length(audio.sample_rate) / audio.sample_rate
+            return self.silences_from_envelope(envelope, frame_seconds, audio.duration, silence_threshold, silence_duration)
+
+    def detect_pcm_channels(self, audio: PCMAudio, silence_threshold: float=-30, silence_duration: float=0.5) -> List[list]:
+        with measure_stage('numpy_silencedetect'):
+            envelopes = self.pcm_envelope(audio, per_channel=True)
+            frame_seconds = self.frame_length(audio.sample_rate) / audio.sample_rate
+            return [self.silences_from_envelope(envelopes[:, channel], frame_seconds, audio.duration, silence_threshold, silence_duration)
+                    for channel in range(audio.channels)]
+
+    def pcm_envelope(self, audio: PCMAudio, per_channel: bool=False) -> np.ndarray:
+        """
+        Compute the framewise level in dBFS of PCM audio, converting one block of frames at a time.
+
+        Parameters:
+            audio (PCMAudio): Decoded audio.
+            per_channel (bool): Measure each channel separately.
+        Returns:
+            np.ndarray: Level of each frame in dBFS, shaped (frames, channels) with per_channel. The last frame may be partial.
+        """
+        data = memoryview(audio.data)
+        block_bytes = self.block_frames * self.frame_length(audio.sample_rate) * audio.frame_width
+        envelope = self.channel_envelope if per_channel else self.energy_envelope
+        envelopes = [
+            envelope(_pcm_to_array(data[i:i + block_bytes], audio.sample_width, audio.channels), audio.sample_rate)
+            for i in range(0, len(data), block_bytes)
+        ]
+        if not envelopes:
+            return np.empty((0, audio.channels) if per_channel else 0, dtype=np.float64)
+        return np.concatenate(envelopes)
+
+    def frame_length(self, sample_rate: int) -> int:
+        """
+        Number of samples per analysis frame for a sample rate.
+        """
+        return max(1, int(round(sample_rate * self.frame_duration)))
+
+    def energy_envelope(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        Compute the framewise level in dBFS.
+
+        Parameters:
+            samples (np.ndarray): Samples shaped (frames, channels) in the [-1.0, 1.0] range.
+            sample_rate (int): Sample rate.
+        Returns:
+            np.ndarray: Level of each frame in dBFS. The last frame may be partial.
+        """
+        if samples.ndim == 1:
+            samples = samples.reshape(-1, 1)
+
+        frame_length = self.frame_length(sample_rate)
+        n_frames = -(-len(samples) // frame_length)
+        envelope = np.empty(n_frames, dtype=np.float64)
+
+        # Work in blocks of frames so long files do not allocate a float64 copy of the whole signal.
+        block_samples = self.block_frames * frame_length
+        for block_start in range(0, len(samples), block_samples):
+            block = samples[block_start:block_start + block_samples]
+            starts = np.arange(0, len(block), frame_length)
+            first = block_start // frame_length
+            if self.measure == 'peak':
+                level = np.maximum.reduceat(np.abs(block).max(axis=1), starts).astype(np.float64)
+                envelope[first:first + len(starts)] = 20 * np.log10(np.maximum(level, 1e-10))
+            else:
+                power = np.square(block, dtype=np.float64).mean(axis=1)
+                counts = np.diff(np.append(starts, len(block)))
+                level = np.add.reduceat(power, starts) / counts
+                envelope[first:first + len(starts)] = 10 * np.log10(np.maximum(level, 1e-20))
+        return envelope
+
+    def channel_envelope(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        Compute the framewise level in dBFS of every channel, see energy_envelope.
+
+        Returns:
+            np.ndarray: Level of each frame in dBFS shaped (frames, channels). The last frame may be partial.
+        """
+        if samples.ndim == 1:
+            samples = samples.reshape(-1, 1)
+
+        frame_length = self.frame_length(sample_rate)
+        n_frames = -(-len(samples) // frame_length)
+        envelope = np.empty((n_frames, samples.shape[1]), dtype=np.float64)
+
+        block_samples = self.block_frames * frame_length
+        for block_start in range(0, len(samples), block_samples):
+            block = samples[block_start:block_start + block_samples]
+            starts = np.arange(0, len(block), frame_length)
+            first = block_start // frame_length
+            if self.measure == 'peak':
+                level = np.maximum.reduceat(np.abs(block), starts, axis=0).astype(np.float64)
+                envelope[first:first + len(starts)] = 20 * np.log10(np.maximum(level, 1e-10))
+            else:
+                counts = np.diff(np.append(starts, len(block)))
+                level = np.add.reduceat(np.square(block, dtype=np.float64), starts, axis=0) / counts[:, None]
+                envelope[first:first + len(starts)] = 10 * np.log10(np.maximum(level, 1e-20))
+        return envelope
+
+    def silences_from_envelope(self, envelope: np.ndarray, frame_seconds: float, total_seconds: float,
+                               silence_threshold: float=-30, silence_duration: float=0.5) -> list:
+        """
+        Find the runs of silent frames that last at least silence_duration.
+
+        Parameters:
+            envelope (np.ndarray): Framewise level in dBFS.
+            frame_seconds (float): Duration of one frame in seconds.
+            total_seconds (float): Duration of the audio in seconds.
+            silence_threshold (float): Silence threshold in dB.
+            silence_duration (float): Minimum silence duration in seconds.
+        Returns:
+            list: List of dictionaries with the start, end and duration of the silence.
+        """
+        if silence_threshold is None:
+            raise ValueError('silence_threshold is not set.')
+
+        if silence_duration is None:
+            raise ValueError('silence_duration is not set.')
+
+        starts, ends = self.silent_runs(envelope, frame_seconds, total_seconds, silence_threshold)
+        return self.silences_from_runs(starts, ends, silence_duration)
+
+    @staticmethod
+    def silent_runs(envelope: np.ndarray, frame_seconds: float, total_seconds: float, silence_threshold: float) -> tuple:
+        """
+        Find every run of frames below the threshold, whatever its duration.
+
+        Returns:
+            tuple: Arrays with the start and end of each run in seconds.
+        """
+        silent = np.concatenate(([0], (envelope < silence_threshold).astype(np.int8), [0]))
+        edges = np.flatnonzero(np.diff(silent))
+        return (edges[0::2] * frame_seconds, np.minimum(edges[1::2] * frame_seconds, total_seconds))
+
+    @staticmethod
+    def silences_from_runs(starts: np.ndarray, ends: np.ndarray, silence_duration: float) -> list:
+        """
+        Keep the silent runs that last at least silence_duration.
+
+        Returns:
+            list: List of dictionaries with the start, end and duration of the silence.
+        """
+        keep = (ends - starts) >= silence_duration
+        silences = []
+        for start, end in zip(starts[keep], ends[keep]):
+            start, end = round(float(start), 6), round(float(end), 6)
+            silences.append({'start': start, 'end': end, 'duration': round(end - start, 6)})
+        return silences
+
+    def detect_samples(self, samples: np.ndarray, sample_rate: int, silence_threshold: float=-30, silence_duration: float=0.5) -> list:
+        """
+        Detect the silences of decoded samples.
+
+        Parameters:
+            samples (np.ndarray): Samples shaped (frames, channels) in the [-1.0, 1.0] range.
+            sample_rate (int): Sample rate.
+            silence_threshold (float): Silence threshold in dB.
+            silence_duration (float): Minimum silence duration in seconds.
+        Returns:
+            list: List of dictionaries with the start, end and duration of the silence.
+        """
+        envelope = self.energy_envelope(samples, sample_rate)
+        frame_seconds = self.frame_length(sample_rate) / sample_rate
+        return self.silences_from_envelope(envelope, frame_seconds, len(samples) / sample_rate, silence_threshold, silence_duration)
+
+
+class CoarseSilenceDetector(SilenceDetector):
+    """
+    Coarse-to-fine silence detector for PCM audio, a fast approximation of the ffmpeg backend.
+
+    A first pass looks at a decimated stream, one sample every sample_rate // coarse_sample_rate
+    (every 6th sample of 48 kHz audio for 8 kHz), in frames of frame_duration seconds, with the peak
+    of all the channels. Then the boundaries of every candidate silence are searched sample by sample
+    in the full resolution audio, within window seconds. The refined boundaries use the silencedetect
+    criterion, so they match the ffmpeg backend except where a loud passage shorter than the decimation
+    step hides inside a silence, which compare() measures.
+    """
+    name = 'coarse'
+    block_frames = 4096
+
+    def __init__(self, coarse_sample_rate: int=8000, window: float=0.05, frame_duration: float=0.01):
+        """
+        Parameters:
+            coarse_sample_rate (int): Approximate sample rate of the decimated stream.
+            window (float): How far inside a candidate silence its boundaries are searched, in seconds.
+            frame_duration (float): Duration of the frames of the first pass in seconds.
+        """
+        if coarse_sample_rate is None or coarse_sample_rate <= 0:
+            raise ValueError('coarse_sample_rate must be greater than zero.')
+
+        if window is None or window <= 0:
+            raise ValueError('window must be greater than zero.')
+
+        if frame_duration is None or frame_duration <= 0:
+            raise ValueError('frame_duration must be greater than zero.')
+
+        self.coarse_sample_rate = coarse_sample_rate
+        self.window = window
+        self.frame_duration = frame_duration
+
+    def cache_key(self) -> str:
+        return f'{self.name}:{self.coarse_sample_rate}:{self.window}:{self.frame_duration}'
+
+    def detect(self, audio_path: str, silence_threshold: float=-30, silence_duration: float=0.5) -> list:
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+
+        # Memory-mapped, the first pass and the refinement only touch the pages they read.
+        audio = _read_pcm_wav(audio_path, memory_map=True)
+        if audio is None:
+            audio = PCMAudio.from_file(audio_path)
+        try:
+            return self.detect_pcm(audio, silence_threshold, silence_duration)
+        finally:
+            audio.close()
+
+    def detect_pcm(self, audio: PCMAudio, silence_threshold: float=-30, silence_duration: float=0.5) -> list:
+        if silence_threshold is None:
+            raise ValueError('silence_threshold is not set.')
+
+        if silence_duration is None:
+            raise ValueError('silence_duration is not set.')
+
+        frame_length = max(1, int(round(audio.sample_rate * self.frame_duration)))
+        frame_seconds = frame_length / audio.sample_rate
+        with measure_stage('coarse_silencedetect'):
+            loud = self.coarse_loud_frames(audio, silence_threshold, frame_length)
+            envelope = np.where(loud, 0.0, -np.inf)
+            starts, ends = NumpySilenceDetector.silent_runs(envelope, frame_seconds, audio.duration, silence_threshold)
+        # A silence starts and ends inside the loud frames around its coarse run, which may be two frames shorter.
+        keep = (ends - starts) >= silence_duration - 2 * frame_seconds
+        with measure_stage('coarse_refine'):
+            silences = []
+            for start, end in zip(starts[keep], ends[keep]):
+                start, end = self.refine(audio, float(start), float(end), silence_threshold, frame_seconds)
+                if end - start >= silence_duration:
+                    start, end = round(start, 6), round(end, 6)
+                    silences.append({'start': start, 'end': end, 'duration': round(end - start, 6)})
+        _count('coarse_silences', len(starts))
+        return silences
+
+    def coarse_loud_frames(self, audio: PCMAudio, silence_threshold: float, frame_length: int) -> np.ndarray:
+        """
+        Find the frames with a decimated sample at or above the threshold.
+
+        Parameters:
+            audio (PCMAudio): Decoded audio.
+            silence_threshold (float): Silence threshold in dB.
+            frame_length (int): Number of samples per frame.
+        Returns:
+            np.ndarray: Boolean loudness of each frame. The last frame may be partial.
+        """
+        step = min(frame_length, max(1, audio.sample_rate // self.coarse_sample_rate))
+        limit = self.__limit(audio.sample_width, silence_threshold)
+        n_frames = -(-audio.frame_count // frame_length)
+        loud = np.zeros(n_frames, dtype=bool)
+
+        data = memoryview(audio.data)[:audio.frame_count * audio.frame_width]
+        block_samples = self.block_frames * frame_length
+        for block_start in range(0, audio.frame_count, block_samples):
+            block_end = min(block_start + block_samples, audio.frame_count)
+            samples = self.__samples(data, audio, block_start, block_end)[::step]
+            # First decimated sample of each frame of the block.
+            frame_starts = -(-np.arange(0, block_end - block_start, frame_length) // step)
+            frame_starts = frame_starts[frame_starts < len(samples)]
+            first = block_start // frame_length
+            peaks = np.maximum.reduceat(np.abs(samples).max(axis=1), frame_starts)
+            loud[first:first + len(frame_starts)] = peaks >= limit
+        return loud
+
+    def refine(self, audio: PCMAudio, start: float, end: float, silence_threshold: float, frame_seconds: float) -> tuple:
+        """
+        Move the boundaries of a coarse silence to the samples where the audio crosses the threshold.
+
+        The frames around a coarse silence hold a loud sample, so the silence starts after the last loud
+        sample between one frame before start and window after it, and ends at the first loud sample
+        between window before end and one frame after it.
+
+        Parameters:
+            audio (PCMAudio): Decoded audio.
+            start (float): Coarse silence start in seconds.
+            end (float): Coarse silence end in seconds.
+            silence_threshold (float): Silence threshold in dB.
+            frame_seconds (float): Duration of the frames of the first pass in seconds.
+        Returns:
+            tuple: The refined start and end in seconds.
+        """
+        sample_rate = audio.sample_rate
+        limit = self.__limit(audio.sample_width, silence_threshold)
+        data = memoryview(audio.data)
+
+        window_start = max(0, int(round((start - frame_seconds) * sample_rate)))
+        window_end = min(audio.frame_count, int(round((start + self.window) * sample_rate)))
+        loud = np.flatnonzero(np.abs(self.__samples(data, audio, window_start, window_end)).max(axis=1) >= limit)
+        refined_start = window_start + int(loud[-1]) + 1 if len(loud) else window_start
+
+        window_start = max(refined_start, int(round((end - self.window) * sample_rate)))
+        window_end = min(audio.frame_count, int(round((end + frame_seconds) * sample_rate)))
+        loud = np.flatnonzero(np.abs(self.__samples(data, audio, window_start, window_end)).max(axis=1) >= limit)
+        refined_end = window_start + int(loud[0]) if len(loud) else window_end
+
+        return (refined_start / sample_rate, min(refined_end / sample_rate, audio.duration))
+
+    def compare(self, audio_path: str, silence_threshold: float=-30, silence_duration: float=0.5,
+                reference: Union[str, SilenceDetector]='ffmpeg') -> 'SilenceDeviation':
+        """
+        Detect the silences of an audio file with this detector and with an exact one, and report how far they differ.
+
+        Parameters:
+            audio_path (str): File path to the audio file.
+            silence_threshold (float): Silence threshold in dB.
+            silence_duration (float): Minimum silence duration in seconds.
+            reference (Union[str, SilenceDetector]): The exact silence detection backend.
+        Returns:
+            SilenceDeviation: Boundary deviations and detection times of both detectors.
+        """
+        reference = _get_silence_detector(reference)
+
+        started = time.perf_counter()
+        silences = self.detect(audio_path, silence_threshold, silence_duration)
+        seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reference_silences = reference.detect(audio_path, silence_threshold, silence_duration)
+        reference_seconds = time.perf_counter() - started
+
+        return compare_silences(silences, reference_silences, seconds=seconds, reference_seconds=reference_seconds)
+
+    @staticmethod
+    def __samples(data: memoryview, audio: PCMAudio, start_frame: int, end_frame: int) -> np.ndarray:
+        return _pcm_to_array(data[start_frame * audio.frame_width:end_frame * audio.frame_width], audio.sample_width, audio.channels)
+
+    @staticmethod
+    def __limit(sample_width: int, silence_threshold: float) -> float:
+        # silencedetect compares 16 bits samples to noise * INT16_MAX, _pcm_to_array divides them by 32768.
+        scale = 32767 / 32768 if sample_width <= 2 else 1.0
+        return 10 ** (silence_threshold / 20) * scale
+
+
+class SilenceDeviation:
+    """
+    How far the silences of a detector are from the silences of a reference detector, see compare_silences.
+    """
+    def __init__(self, **kwargs):
+        self.matched: int = kwargs.get('matched', 0)
+        self.missed: list = kwargs.get('missed', [])
+        self.extra: list = kwargs.get('extra', [])
+        self.start_deviations: np.ndarray = kwargs.get('start_deviations', np.empty(0))
+        self.end_deviations: np.ndarray = kwargs.get('end_deviations', np.empty(0))
+        self.seconds: float = kwargs.get('seconds', None)
+        self.reference_seconds: float = kwargs.get('reference_seconds', None)
+
+    @property
+    def max_deviation(self) -> float:
+        if not self.matched:
+            return 0.0
+        return float(max(np.abs(self.start_deviations).max(), np.abs(self.end_deviations).max()))
+
+    @property
+    def mean_deviation(self) -> float:
+        if not self.matched:
+            return 0.0
+        return float(np.abs(np.concatenate((self.start_deviations, self.end_deviations))).mean())
+
+    @property
+    def speedup(self) -> float:
+        if not self.seconds or self.reference_seconds is None:
+            return None
+        return self.reference_seconds / self.seconds
+
+    def to_dict(self) -> dict:
+        return {
+            'matched': self.matched,
+            'missed': len(self.missed),
+            'extra': len(self.extra),
+            'max_deviation': round(self.max_deviation, 6),
+            'mean_deviation': round(self.mean_deviation, 6),
+            'seconds': None if self.seconds is None else round(self.seconds, 6),
+            'reference_seconds': None if self.reference_seconds is None else round(self.reference_seconds, 6),
+            'speedup': None if self.speedup is None else round(self.speedup, 3),
+        }
+
+    def __repr__(self):
+        return (f'matched:{self.matched} missed:{len(self.missed)} extra:{len(self.extra)} '
+                f'max_deviation:{self.max_deviation} mean_deviation:{self.mean_deviation} speedup:{self.speedup}')
+
+
+def compare_silences(silences: list, reference: list, seconds: float=None, reference_seconds: float=None) -> SilenceDeviation:
+    """
+    Match each reference silence to the silence overlapping it the most and measure the boundary deviations.
+
+    Parameters:
+        silences (list): Silences to validate, sorted by start.
+        reference (list): Exact silences, sorted by start.
+        seconds (float): Detection time of silences.
+        reference_seconds (float): Detection time of reference.
+    Returns:
+        SilenceDeviation: Signed start and end deviations (silences minus reference) of the matched silences,
+            the reference silences without a match (missed) and the silences without a match (extra).
+    """
+    if silences is None or reference is None:
+        raise ValueError('silences and reference must be set.')
+
+    silence_table = SilenceTable.from_silences(silences)
+    reference_table = SilenceTable.from_silences(reference)
+    used = np.zeros(len(silence_table), dtype=bool)
+    matches = []
+    missed = []
+    for index, (start, end) in enumerate(zip(reference_table.starts, reference_table.ends)):
+        overlaps = np.minimum(silence_table.ends, end) - np.maximum(silence_table.starts, start)
+        overlaps[used] = 0
+        best = int(np.argmax(overlaps)) if len(overlaps) else -1
+        if best < 0 or overlaps[best] <= 0:
+            missed.append(reference[index])
+            continue
+        used[best] = True
+        matches.append((best, index))
+
+    silence_indexes = np.array([match[0] for match in matches], dtype=np.int64)
+    reference_indexes = np.array([match[1] for match in matches], dtype=np.int64)
+    return SilenceDeviation(
+        matched=len(matches),
+        missed=missed,
+        extra=[silences[index] for index in np.flatnonzero(~used)],
+        start_deviations=silence_table.starts[silence_indexes] - reference_table.starts[reference_indexes],
+        end_deviations=silence_table.ends[silence_indexes] - reference_table.ends[reference_indexes],
+        seconds=seconds,
+        reference_seconds=reference_seconds,
+    )
+
+
+SILENCE_DETECTORS = {
+    FFMPEGSilenceDetector.name: FFMPEGSilenceDetector,
+    NumpySilenceDetector.name: NumpySilenceDetector,
+    CoarseSilenceDetector.name: CoarseSilenceDetector,
+}
+
+
+def _get_silence_detector(detector: Union[str, SilenceDetector]) -> SilenceDetector:
+    if isinstance(detector, SilenceDetector):
+        return detector
+    if detector not in SILENCE_DETECTORS:
+        raise ValueError(f'Unknown silence detector {detector}.')
+    return SILENCE_DETECTORS[detector]()
@@ -0,0 +1,8 @@
+class FFMPEGException(Exception):
+    pass
+
+class FFPROBEException(Exception):
+    pass
+
+class AudioFormatException(Exception):
+    pass
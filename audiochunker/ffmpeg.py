@@ -0,0 +1,636 @@
+import json
+import mmap
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import mkstemp
+from typing import List
+
+from .exceptions import AudioFormatException, FFMPEGException, FFPROBEException
+from .metrics import measure_stage
+from .pcm import PCMAudio, _is_uncompressed_wav_file, _is_wav_file, _parse_wav_header, _probe_audio_header
+from .runner import _check_output, _rusage_dict, get_process_runner
+
+
+class AudioInfo:
+    def __init__(self, **kwargs):
+        try:
+            self.codec_name: str = kwargs.get('codec_name', None)
+            self.codec_long_name: str = kwargs.get('codec_long_name', None)
+            self.profile: str = kwargs.get('profile', None)
+            self.codec_type: str = kwargs.get('codec_type', None)
+            self.codec_tag_string: str = kwargs.get('codec_tag_string', None)
+            self.codec_tag: str = kwargs.get('codec_tag', None)
+            self.sample_fmt: str = kwargs.get('sample_fmt', None)
+            self.sample_rate: int = int(kwargs.get('sample_rate', 16000))
+            self.channels: int = int(kwargs.get('channels', 0))
+            self.channel_layout: str = kwargs.get('channel_layout', None)
+            self.bits_per_sample: int = int(kwargs.get('bits_per_sample', 0))
+            self.id: str = kwargs.get('id', None)
+            self.duration_ts: int = int(kwargs.get('duration_ts', 0))
+            self.duration: float = float(kwargs.get('duration', 0.0))
+            self.bit_rate: int = int(kwargs.get('bit_rate', 0))
+        except Exception as e:
+            raise e
+
+class FFMPEGTools:
+    """
+    FFMPEGTools class.
+    """
+    
+    def __get_start_time(time_str):
+        if 'silence_start' in time_str:
+            t = time_str.split('silence_start:')[1] 
+            return {'start': float(t)}
+    
+    def __get_end_time(time_str):
+        if 'silence_end' in time_str:
+            times = time_str.split(' | ')
+            se = float(times[0].split('silence_end: ')[1])
+            sd = float(times[1].split('silence_duration: ')[1])
+            return {'end':se, 'duration':sd}
+    
+    @staticmethod
+    def is_valid_silence_file(silence_file: str) -> bool:
+        """
+        Check if the silence file is valid.
+        
+        Parameters:
+            silence_file (str): File path to the silence file.
+        Returns:
+            bool: True if the silence file is valid, False otherwise.
+        """        
+        if not os.path.isfile(silence_file):
+            return False
+        try:
+            with open(silence_file, 'r') as f:
+                lines = f.readlines()
+                for line in lines:
+                    if 'silence_start' in line:
+                        start_match = True
+                    if 'silence_end' in line:
+                        end_match = True
+                if start_match and end_match:
+                    return True
+                else:
+                    return False
+        except:
+            return False
+
+    @staticmethod
+    def create_silence_content(audio_path: str, silence_threshold: float=-30, silence_duration: float=0.5) -> List[str]:
+        """
+        Create a list[str] with the content produced by ffmpeg silence.
+
+        Parameters:
+            audio_path (str): File path to the audio file.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+        Returns:
+            List[str]: List of strings with the content produced by ffmpeg silence.
+        """
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+            
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if silence_threshold is None:
+            raise ValueError('silence_threshold is not set.')
+        
+        if silence_duration is None:
+            raise ValueError('silence_duration is not set.')
+
+        times_command = ['ffmpeg', '-i', audio_path, '-af', f'silencedetect=noise={silence_threshold}dB:d={silence_duration}', '-f', 'null', '-']
+
+        ffmpeg_result = None
+        try:
+            ffmpeg_result = _check_output('ffmpeg_silencedetect', times_command)
+            return ffmpeg_result.decode('utf-8')
+        except subprocess.CalledProcessError as e:
+            raise FFMPEGException(f'Error while trying to create silence file. {e.output}')
+        except subprocess.TimeoutExpired as e:
+            raise FFMPEGException(f'Error while trying to create silence file. {e}')
+
+    @classmethod
+    def decode_audio(cls, audio_path: str, silence_threshold: float=None, silence_duration: float=None,
+                     per_channel: bool=False) -> tuple:
+        """
+        Decode an audio file to 16 bits PCM through a pipe, optionally running silencedetect on the same pass.
+
+        Parameters:
+            audio_path (str): File path to the audio file.
+            silence_threshold (float): Silence threshold. When set with silence_duration, silencedetect runs while decoding.
+            silence_duration (float): Silence duration.
+            per_channel (bool): Detect the silences of each channel, see get_silences_per_channel.
+        Returns:
+            tuple: Tuple with the PCMAudio and the content produced by ffmpeg on stderr.
+        """
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+
+        return cls.__decode(audio_path, silence_threshold, silence_duration, per_channel=per_channel)
+
+    @classmethod
+    def decode_bytes(cls, data: bytes, silence_threshold: float=None, silence_duration: float=None) -> tuple:
+        """
+        Decode an in-memory audio file fed to ffmpeg through stdin, see decode_audio.
+
+        Parameters:
+            data (bytes): Content of the audio file, any bytes-like object.
+            silence_threshold (float): Silence threshold. When set with silence_duration, silencedetect runs while decoding.
+            silence_duration (float): Silence duration.
+        Returns:
+            tuple: Tuple with the PCMAudio and the content produced by ffmpeg on stderr.
+        """
+        if data is None:
+            raise ValueError('data is not set.')
+
+        return cls.__decode('pipe:0', silence_threshold, silence_duration, input=data)
+
+    @classmethod
+    def decode_fileobj(cls, fileobj, silence_threshold: float=None, silence_duration: float=None) -> tuple:
+        """
+        Decode an audio file object, see decode_audio.
+
+        A file object with a file descriptor (file, pipe, socket) is handed to ffmpeg as its stdin and read
+        from its current position, any other file object is read into memory first.
+
+        Parameters:
+            fileobj: Binary file object.
+            silence_threshold (float): Silence threshold. When set with silence_duration, silencedetect runs while decoding.
+            silence_duration (float): Silence duration.
+        Returns:
+            tuple: Tuple with the PCMAudio and the content produced by ffmpeg on stderr.
+        """
+        if fileobj is None:
+            raise ValueError('fileobj is not set.')
+
+        try:
+            stdin = fileobj.fileno()
+        except (AttributeError, OSError):
+            data = fileobj.getbuffer()[fileobj.tell():] if hasattr(fileobj, 'getbuffer') else fileobj.read()
+            return cls.__decode('pipe:0', silence_threshold, silence_duration, input=data)
+        return cls.__decode('pipe:0', silence_threshold, silence_duration, stdin=stdin)
+
+    @staticmethod
+    def __decode(audio_input: str, silence_threshold: float=None, silence_duration: float=None, input: bytes=None,
+                 stdin=subprocess.DEVNULL, per_channel: bool=False) -> tuple:
+        silence_filter = []
+        if silence_threshold is not None and silence_duration is not None:
+            silence_filter = ['-af', f'silencedetect=noise={silence_threshold}dB:d={silence_duration}{":mono=1" if per_channel else ""}']
+
+        decode_command = ['ffmpeg', '-i', audio_input, '-vn', *silence_filter, '-acodec', 'pcm_s16le', '-f', 'wav', 'pipe:1']
+
+        runner = get_process_runner()
+        with runner.slot('ffmpeg_decode'), measure_stage('ffmpeg_decode') as record:
+            try:
+                process = runner.popen(decode_command, stdin=subprocess.PIPE if input is not None else stdin,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            except FileNotFoundError as e:
+                raise FFMPEGException(f'Error while trying to decode audio. {e}')
+            try:
+                wav_content, ffmpeg_content = runner.communicate('ffmpeg_decode', process, input)
+            except subprocess.TimeoutExpired as e:
+                raise FFMPEGException(f'Error while trying to decode audio. {e}')
+            record['usage'] = _rusage_dict(process.rusage)
+        if process.returncode != 0:
+            raise FFMPEGException(f'Error while trying to decode audio. {ffmpeg_content}')
+
+        header = _parse_wav_header(wav_content)
+        # The PCM stays in the buffer read from ffmpeg, without a copy.
+        data = memoryview(wav_content)[header['data_offset']:header['data_offset'] + header['data_size']]
+        audio = PCMAudio(data, header['sample_rate'], header['channels'], header['sample_width'])
+        return (audio, ffmpeg_content.decode('utf-8'))
+
+    @staticmethod
+    def create_silence_content_from_pcm(audio: 'PCMAudio', silence_threshold: float=-30, silence_duration: float=0.5,
+                                        per_channel: bool=False) -> str:
+        """
+        Run ffmpeg silencedetect on already decoded PCM audio fed through stdin.
+
+        Parameters:
+            audio (PCMAudio): Decoded audio.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+            per_channel (bool): Detect the silences of each channel (silencedetect mono mode), see get_silences_per_channel.
+        Returns:
+            str: The content produced by ffmpeg silence.
+        """
+        if audio is None:
+            raise ValueError('audio is not set.')
+
+        if silence_threshold is None:
+            raise ValueError('silence_threshold is not set.')
+
+        if silence_duration is None:
+            raise ValueError('silence_duration is not set.')
+
+        sample_format = {1: 'u8', 2: 's16le', 3: 's24le', 4: 's32le'}[audio.sample_width]
+        times_command = ['ffmpeg', '-f', sample_format, '-ar', str(audio.sample_rate), '-ac', str(audio.channels), '-i', 'pipe:0',
+                         '-af', f'silencedetect=noise={silence_threshold}dB:d={silence_duration}{":mono=1" if per_channel else ""}',
+                         '-f', 'null', '-']
+
+        try:
+            ffmpeg_result = _check_output('ffmpeg_silencedetect', times_command, input=audio.data)
+            return ffmpeg_result.decode('utf-8')
+        except subprocess.CalledProcessError as e:
+            raise FFMPEGException(f'Error while trying to create silence file. {e.output}')
+        except subprocess.TimeoutExpired as e:
+            raise FFMPEGException(f'Error while trying to create silence file. {e}')
+
+    @staticmethod
+    def create_silence_file(audio_path: str, silence_threshold: float=-30, silence_duration: float=0.5) -> str:
+        """
+        Create a temporary file with the content produced by ffmpeg silence.
+
+        Parameters:
+            audio_path (str): File path to the audio file.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+        Returns:
+            str: File path to the temporary file.
+        """
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+            
+        silence_file = mkstemp(suffix='_times', prefix='silences_', dir=None, text=True)
+        _, silence_file_path = silence_file 
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if silence_threshold is None:
+            raise ValueError('silence_threshold is not set.')
+        
+        if silence_duration is None:
+            raise ValueError('silence_duration is not set.')
+
+        times_command = ['ffmpeg', '-i', audio_path, '-af', f'silencedetect=noise={silence_threshold}dB:d={silence_duration}', '-f', 'null', '-']
+
+        try:
+            ffmpeg_result = _check_output('ffmpeg_silencedetect', times_command)
+            with open(silence_file_path, 'wb') as f:
+                f.write(ffmpeg_result)
+            return silence_file_path
+        except subprocess.CalledProcessError as e:
+            raise FFMPEGException(f'Error while trying to create silence file. {e.output}')
+        except subprocess.TimeoutExpired as e:
+            raise FFMPEGException(f'Error while trying to create silence file. {e}')
+
+    @staticmethod
+    def export_segments(audio_path: str, segments: List[tuple], output_paths: List[str], parameters: List[str]=None,
+                        audio: 'PCMAudio'=None) -> List[int]:
+        """
+        Write several segments of an audio file with a single ffmpeg run, the output format follows the path extension.
+
+        Every segment is cut sample accurately from one decode of the input with asplit and atrim.
+
+        Parameters:
+            audio_path (str): File path to the audio file, ignored when audio is set.
+            segments (List[tuple]): (start_frame, end_frame) of every segment.
+            output_paths (List[str]): Output file path of every segment.
+            parameters (List[str]): Extra ffmpeg output options applied to every output, e.g. ['-b:a', '32k'].
+            audio (PCMAudio): Decoded audio fed to ffmpeg through stdin instead of reading audio_path.
+        Returns:
+            List[int]: Size in bytes of every output file.
+        """
+        if len(segments) != len(output_paths):
+            raise ValueError('segments and output_paths must have the same length.')
+
+        if not segments:
+            return []
+
+        if audio is None:
+            if audio_path is None:
+                raise ValueError('audio_path is not set.')
+
+            if not os.path.exists(audio_path):
+                raise FileNotFoundError(f'Audio file {audio_path} not found.')
+            audio_input = ['-i', audio_path]
+        else:
+            sample_format = {1: 'u8', 2: 's16le', 3: 's24le', 4: 's32le'}[audio.sample_width]
+            audio_input = ['-f', sample_format, '-ar', str(audio.sample_rate), '-ac', str(audio.channels), '-i', 'pipe:0']
+
+        labels = [f'[s{index}]' for index in range(len(segments))]
+        filters = [f'[0:a]asplit={len(segments)}{"".join(labels)}' if len(segments) > 1 else '[0:a]anull[s0]']
+        for index, (start, end) in enumerate(segments):
+            filters.append(f'[s{index}]atrim=start_sample={start}:end_sample={end},asetpts=PTS-STARTPTS[o{index}]')
+
+        outputs = []
+        for index, output_path in enumerate(output_paths):
+            outputs.extend(['-map', f'[o{index}]', *(parameters or []), output_path])
+
+        # The filter graph grows with the segment count, it is passed in a file rather than on the command line.
+        descriptor, filter_path = mkstemp(suffix='.txt', prefix='segments_', text=True)
+        try:
+            with os.fdopen(descriptor, 'w') as f:
+                f.write(';\n'.join(filters))
+            export_command = ['ffmpeg', '-y', '-nostats', *audio_input, '-filter_complex_script', filter_path, *outputs]
+            _check_output('ffmpeg_export', export_command, input=None if audio is None else audio.data)
+        except subprocess.CalledProcessError as e:
+            raise FFMPEGException(f'Error while trying to export segments. {e.output}')
+        except subprocess.TimeoutExpired as e:
+            raise FFMPEGException(f'Error while trying to export segments. {e}')
+        finally:
+            os.remove(filter_path)
+
+        return [os.path.getsize(output_path) for output_path in output_paths]
+
+    @classmethod
+    def get_silences_from_file(cls, silence_file_path: str) -> list:
+        """
+        Get the silences from a silence file.
+
+        Parameters:
+            silence_file_path (str): File path to the silence file.
+        Returns:
+            list: List of dictionaries with the start and end time of the silence.
+        """
+        if silence_file_path is None:
+            raise ValueError('silence_file_path was not specified')
+        
+        if cls.is_valid_silence_file(silence_file_path) is False:
+            raise FFMPEGException(f'Invalid silence file {silence_file_path}')
+
+        try:
+            silences = []
+
+            with open(silence_file_path, 'r') as f:
+                lines = f.readlines()
+                times = []
+                for line in lines:
+                    if 'silencedetect' in line:
+                        line_str = line.split('] ')[1].strip()
+                        if 'silence_start' in line_str:
+                            times.append(cls.__get_start_time(line_str))
+                        elif 'silence_end' in line_str:
+                            times.append(cls.__get_end_time(line_str))
+
+                for i in range(0, len(times), 2):
+                    silence = times[i:i+2]
+                    silences.append({**silence[0], **silence[1]})
+            return silences            
+        except Exception as e:
+            raise e
+    
+    @classmethod
+    def parse_silence_line(cls, line: str) -> dict:
+        """
+        Parse one line of ffmpeg silencedetect output.
+
+        Parameters:
+            line (str): A line produced by ffmpeg.
+        Returns:
+            dict: {'start': ...} for a silence_start line, {'end': ..., 'duration': ...} for a silence_end line, None otherwise.
+        """
+        if 'silencedetect' not in line:
+            return None
+        line_str = line.split('] ')[1].strip()
+        if 'silence_start' in line_str:
+            return cls.__get_start_time(line_str)
+        elif 'silence_end' in line_str:
+            return cls.__get_end_time(line_str)
+        return None
+
+    @classmethod
+    def get_silences_from_content(cls, silence_content: List[str]) -> list:
+        """
+        Get the silences from a list of silence content.
+
+        Parameters:
+            silence_content (List[str]): List of strings with the content produced by ffmpeg silence.
+        Returns:
+            list: List of dictionaries with the start and end time of the silence.
+        """
+        if silence_content is None:
+                raise ValueError('silence_content was not specified')
+
+        try:
+            with measure_stage('parse_silences'):
+                silences = []
+
+                lines = silence_content.splitlines()
+                times = []
+                for line in lines:
+                    if 'silencedetect' in line:
+                        line_str = line.split('] ')[1].strip()
+                        if 'silence_start' in line_str:
+                            times.append(cls.__get_start_time(line_str))
+                        elif 'silence_end' in line_str:
+                            times.append(cls.__get_end_time(line_str))
+
+                for i in range(0, len(times), 2):
+                    silence = times[i:i+2]
+                    silences.append({**silence[0], **silence[1]})
+                return silences
+        except Exception as e:
+            raise e
+
+    @classmethod
+    def get_silences_per_channel(cls, silence_content: str, channels: int) -> List[list]:
+        """
+        Get the silences of each channel from the content of silencedetect in mono mode.
+
+        Parameters:
+            silence_content (str): The content produced by ffmpeg silencedetect with mono=1.
+            channels (int): Number of channels of the audio.
+        Returns:
+            List[list]: One silences list per channel, see get_silences_from_content.
+        """
+        if silence_content is None:
+            raise ValueError('silence_content was not specified')
+
+        with measure_stage('parse_silences'):
+            times = [[] for _ in range(channels)]
+            for line in silence_content.splitlines():
+                if 'silencedetect' not in line or 'channel: ' not in line:
+                    continue
+                channel_str, line_str = line.split('] ')[1].strip().split(' | ', 1)
+                channel = int(channel_str.split('channel: ')[1])
+                if 'silence_start' in line_str:
+                    times[channel].append(cls.__get_start_time(line_str))
+                elif 'silence_end' in line_str:
+                    times[channel].append(cls.__get_end_time(line_str))
+
+            return [[{**channel_times[i], **channel_times[i + 1]} for i in range(0, len(channel_times) - 1, 2)]
+                    for channel_times in times]
+
+    ffprobe_info_command: List[str] = ['ffprobe', '-v', 'error', '-select_streams', 'a:0', '-show_streams', '-show_format', '-of', 'json']
+
+    @classmethod
+    def get_audio_information(cls, audio_path: str, probe: bool=True) -> AudioInfo:
+        """
+        Get audio information from the file header for WAV, FLAC and Ogg (Vorbis, Opus) files, using ffprobe otherwise.
+
+        Parameters:
+            audio_path (str): File path to the audio file.
+            probe (bool): Read the header in process when the format is supported, False always runs ffprobe.
+        Returns:
+            AudioInfo: Information of the first audio stream.
+        """
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+
+        if probe:
+            with measure_stage('header_probe'):
+                file_info = _probe_audio_header(audio_path)
+            if file_info is not None:
+                return AudioInfo(**file_info)
+
+        info_command = [*cls.ffprobe_info_command, audio_path]
+
+        ffprobe_result = None
+        try:
+            ffprobe_result = _check_output('ffprobe_info', info_command)
+            return cls.parse_audio_information(ffprobe_result.decode('utf-8'))
+        except subprocess.CalledProcessError as e:
+            raise FFPROBEException(f'Error while trying to get audio information. {e.output}')
+        except subprocess.TimeoutExpired as e:
+            raise FFPROBEException(f'Error while trying to get audio information. {e}')
+
+    @staticmethod
+    def parse_audio_information(info: str) -> AudioInfo:
+        """
+        Parse the output of ffprobe -show_streams, in JSON (-of json) or in the default format.
+        """
+        if info.lstrip().startswith('{'):
+            probe = json.loads(info)
+            streams = probe.get('streams') or []
+            if not streams:
+                raise FFPROBEException('No audio stream found.')
+            file_info = {key: value for key, value in streams[0].items() if not isinstance(value, (dict, list))}
+            stream_format = probe.get('format', {})
+            for key in ('duration', 'bit_rate'):
+                # Some containers only report the duration and bit rate of the whole file.
+                if key not in file_info and key in stream_format:
+                    file_info[key] = stream_format[key]
+            return AudioInfo(**file_info)
+
+        lines = info.splitlines()
+        stream_start = lines.index('[STREAM]')
+        stream_end = lines.index('[/STREAM]', stream_start)
+        # DISPOSITION:* and TAG:* entries are not stream fields.
+        audio_info = [line.split('=', 1) for line in lines[stream_start+1:stream_end] if '=' in line and ':' not in line.split('=', 1)[0]]
+        file_info = {key: value for key, value in audio_info if value != 'N/A'}
+        return AudioInfo(**file_info)
+
+    @classmethod
+    def get_audio_duration(cls, audio_path: str) -> float:
+        """
+        Get the duration of an audio file in seconds, from the header of PCM WAV files or with ffprobe otherwise.
+        """
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+
+        if _is_wav_file(audio_path):
+            try:
+                with open(audio_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    header = _parse_wav_header(mapped)
+                frame_width = header['channels'] * header['sample_width']
+                if header['audio_format'] == 1 and frame_width:
+                    return header['data_size'] / frame_width / header['sample_rate']
+            except AudioFormatException:
+                pass
+        return cls.get_audio_information(audio_path).duration
+
+    @classmethod
+    def create_silences_sharded(cls, audio_path: str, silence_threshold: float=-30, silence_duration: float=0.5,
+                                shards: int=2, duration: float=None) -> list:
+        """
+        Get the silences of an audio file running one ffmpeg silencedetect per time range concurrently.
+
+        Each shard reads silence_duration past its range, so a silence that straddles a shard
+        boundary is seen whole by one shard or continued by the next one; the stitched result
+        matches a single ffmpeg pass. Shards seek with ffmpeg -ss, which is only sample exact in
+        uncompressed WAV files: other files are analysed in a single pass.
+
+        Parameters:
+            audio_path (str): File path to the audio file.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+            shards (int): Number of time ranges (and concurrent ffmpeg processes).
+            duration (float): Duration of the audio in seconds, read from the file when not set.
+        Returns:
+            list: List of dictionaries with the start and end time of the silence.
+        """
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+
+        if silence_threshold is None:
+            raise ValueError('silence_threshold is not set.')
+
+        if silence_duration is None:
+            raise ValueError('silence_duration is not set.')
+
+        if shards is None or shards < 1:
+            raise ValueError('shards must be greater than zero')
+
+        if shards == 1 or not _is_uncompressed_wav_file(audio_path):
+            return cls.get_silences_from_content(cls.create_silence_content(audio_path, silence_threshold, silence_duration))
+
+        if duration is None:
+            duration = cls.get_audio_duration(audio_path)
+
+        shard_length = duration / shards
+        overlap = silence_duration + 0.05
+        if shard_length <= overlap:
+            return cls.get_silences_from_content(cls.create_silence_content(audio_path, silence_threshold, silence_duration))
+
+        boundaries = [shard * shard_length for shard in range(shards)] + [duration]
+
+        def detect_shard(shard: int) -> list:
+            start = boundaries[shard]
+            length = min(boundaries[shard + 1] + overlap, duration) - start
+            times_command = ['ffmpeg', '-ss', f'{start:.6f}', '-t', f'{length:.6f}', '-i', audio_path,
+                             '-af', f'silencedetect=noise={silence_threshold}dB:d={silence_duration}', '-f', 'null', '-']
+            try:
+                ffmpeg_result = _check_output('ffmpeg_silencedetect', times_command)
+            except subprocess.CalledProcessError as e:
+                raise FFMPEGException(f'Error while trying to create silence file. {e.output}')
+            except subprocess.TimeoutExpired as e:
+                raise FFMPEGException(f'Error while trying to create silence file. {e}')
+
+            silences = []
+            for line in ffmpeg_result.decode('utf-8').splitlines():
+                time = cls.parse_silence_line(line)
+                if time is None:
+                    continue
+                if 'start' in time:
+                    silences.append({'start': round(start + time['start'], 6)})
+                elif silences:
+                    silences[-1]['end'] = round(start + time['end'], 6)
+            if silences and 'end' not in silences[-1]:
+                # Older ffmpeg versions do not close a silence that lasts until the end of the input.
+                silences[-1]['end'] = round(start + length, 6)
+            return silences
+
+        with ThreadPoolExecutor(max_workers=shards) as pool:
+            shard_silences = list(pool.map(detect_shard, range(shards)))
+
+        silences = []
+        for shard, shard_silence in enumerate(shard_silences):
+            for silence in shard_silence:
+                if silences and silence['start'] <= silences[-1]['end']:
+                    # The same silence seen by two shards, or its continuation in the next shard.
+                    silences[-1]['end'] = max(silences[-1]['end'], silence['end'])
+                    continue
+                if silence['start'] >= boundaries[shard + 1] and shard < shards - 1:
+                    # Starts in the overlap, it belongs to the next shard.
+                    continue
+                silences.append(dict(silence))
+
+        for silence in silences:
+            silence['duration'] = round(silence['end'] - silence['start'], 6)
+        return silences
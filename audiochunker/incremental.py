@@ -0,0 +1,268 @@
+import json
+import os
+import struct
+from typing import List
+
+import numpy as np
+
+from .chunks import BaseChunk, SegmentChunk, _chunk_bounds, _chunk_end_available
+from .detectors import NumpySilenceDetector
+from .exceptions import AudioFormatException
+from .metrics import _count, measure_stage
+from .pcm import PCMAudio, _frame_position, _parse_wav_header, _pcm_to_array
+
+
+class IncrementalChunker:
+    """
+    Chunker of a PCM WAV recording that is still being written.
+
+    Every update reads only the audio appended since the previous one (a direct PCM read,
+    the data size of the WAV header is not trusted while the file grows), runs the NumPy
+    silence detector on it and returns the chunks closed by the new audio. The detector
+    state (analysed frames, open silent run, silences and emitted chunks) is kept in
+    state_path when set, so a new process resumes where the previous one stopped.
+    The chunks are the same as chunking_segment with the 'numpy' detector on the final file.
+    """
+    state_version = 1
+
+    def __init__(self, input_file_path: str, silence_threshold: float=-30, silence_duration: float=0.5,
+                 state_path: str=None, frame_duration: float=0.01):
+        """
+        Incremental audio chunker.
+
+        Parameters:
+            input_file_path (str): File path to the growing PCM WAV file.
+            silence_threshold (float): Silence threshold.
+            silence_duration (float): Silence duration.
+            state_path (str): JSON file persisting the chunker state, loaded when it exists and saved after each update.
+            frame_duration (float): Analysis frame duration of the NumPy detector.
+        Returns:
+            IncrementalChunker: IncrementalChunker instance.
+        """
+        if input_file_path is None:
+            raise ValueError('input_file_path is not set.')
+
+        if silence_threshold is None:
+            raise ValueError('silence_threshold is not set.')
+
+        if silence_duration is None:
+            raise ValueError('silence_duration is not set.')
+
+        if not os.path.exists(input_file_path):
+            raise FileNotFoundError(f'Audio file {input_file_path} not found.')
+
+        self.input_file_path = input_file_path
+        self.silence_threshold = silence_threshold
+        self.silence_duration = silence_duration
+        self.state_path = state_path
+        self.detector = NumpySilenceDetector(frame_duration=frame_duration)
+
+        self.state: dict = {
+            'version': self.state_version,
+            'source': os.path.abspath(input_file_path),
+            'silence_threshold': silence_threshold,
+            'silence_duration': silence_duration,
+            'frame_duration': frame_duration,
+            'format': None,
+            # Audio frames analysed so far, always a whole number of analysis frames until the final update.
+            'analysed_frames': 0,
+            # Analysis frame index where the silent run reaching the end of the analysed audio started.
+            'open_run_start': None,
+            # Start of the silent run whose preceding chunk is already queued.
+            'queued_run_start': None,
+            'silences': [],
+            'pending': [],
+            'chunks': [],
+            'final': False,
+        }
+        if state_path is not None and os.path.exists(state_path):
+            self.__load_state(state_path)
+
+    def __load_state(self, state_path: str):
+        with open(state_path) as f:
+            state = json.load(f)
+
+        if state.get('version') != self.state_version:
+            raise ValueError(f'Unsupported state version {state.get("version")}.')
+
+        for key in ('source', 'silence_threshold', 'silence_duration', 'frame_duration'):
+            if state[key] != self.state[key]:
+                raise ValueError(f'{state_path} was written for another {key}: {state[key]}.')
+        self.state = state
+
+    def save_state(self, state_path: str=None) -> str:
+        """
+        Write the chunker state atomically.
+
+        Parameters:
+            state_path (str): State file path, the chunker's state_path when not set.
+        Returns:
+            str: The state file path.
+        """
+        state_path = state_path or self.state_path
+        if state_path is None:
+            raise ValueError('state_path is not set.')
+
+        temporary_path = f'{state_path}.tmp'
+        with open(temporary_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(temporary_path, state_path)
+        return state_path
+
+    @property
+    def silences(self) -> list:
+        return self.state['silences']
+
+    @property
+    def chunks(self) -> List[BaseChunk]:
+        return [BaseChunk(**chunk) for chunk in self.state['chunks']]
+
+    def __read_format(self, fd: int) -> dict:
+        head = os.pread(fd, 65536, 0)
+        try:
+            header = _parse_wav_header(head)
+        except AudioFormatException:
+            if len(head) < 65536:
+                # The writer has not written the header yet.
+                return None
+            raise
+        if header['audio_format'] != 1:
+            raise AudioFormatException(f'{self.input_file_path} is not a PCM WAV file.')
+        declared_size = struct.unpack('<I', head[header['data_offset'] - 4:header['data_offset']])[0]
+        audio_format = {key: header[key] for key in ('sample_rate', 'channels', 'sample_width', 'data_offset')}
+        audio_format['declared_size'] = declared_size
+        return audio_format
+
+    def __available_frames(self, fd: int, audio_format: dict) -> int:
+        available = os.fstat(fd).st_size - audio_format['data_offset']
+        # A finished file may carry chunks after the data, a growing one has a placeholder size.
+        declared_size = audio_format['declared_size']
+        if 0 < declared_size < available:
+            available = declared_size
+        return max(available, 0) // (audio_format['channels'] * audio_format['sample_width'])
+
+    def update(self, final: bool=False) -> List[SegmentChunk]:
+        """
+        Analyse the audio appended since the previous update and return the new chunks.
+
+        Parameters:
+            final (bool): The recording is complete: the partial last analysis frame is analysed,
+                the open silence is closed at the end of the audio and every queued chunk is returned.
+        Returns:
+            List[SegmentChunk]: The chunks not returned by a previous update.
+        """
+        state = self.state
+        if state['final']:
+            return []
+
+        fd = os.open(self.input_file_path, os.O_RDONLY)
+        try:
+            audio_format = state['format']
+            if audio_format is None:
+                audio_format = self.__read_format(fd)
+                if audio_format is None:
+                    return []
+                state['format'] = audio_format
+            else:
+                # The writer may patch the data size at any time, it is re-read on every update.
+                data_offset = audio_format['data_offset']
+                audio_format['declared_size'] = struct.unpack('<I', os.pread(fd, 4, data_offset - 4))[0]
+
+            available_frames = self.__available_frames(fd, audio_format)
+            if available_frames < state['analysed_frames']:
+                raise AudioFormatException(f'{self.input_file_path} is shorter than the analysed audio.')
+
+            self.__analyse(fd, audio_format, available_frames, final)
+            chunks = self.__emit(fd, audio_format, available_frames, final)
+        finally:
+            os.close(fd)
+
+        state['final'] = final
+        if self.state_path is not None:
+            self.save_state()
+        _count('chunks', len(chunks))
+        return chunks
+
+    def __analyse(self, fd: int, audio_format: dict, available_frames: int, final: bool):
+        state = self.state
+        sample_rate = audio_format['sample_rate']
+        frame_width = audio_format['channels'] * audio_format['sample_width']
+        frame_length = self.detector.frame_length(sample_rate)
+        frame_seconds = frame_length / sample_rate
+
+        first_frame = state['analysed_frames']
+        last_frame = available_frames if final else available_frames - available_frames % frame_length
+        if last_frame <= first_frame and not final:
+            return
+
+        with measure_stage('numpy_silencedetect'):
+            envelopes = []
+            block_frames = self.detector.block_frames * frame_length
+            for block_start in range(first_frame, last_frame, block_frames):
+                block_end = min(block_start + block_frames, last_frame)
+                data = os.pread(fd, (block_end - block_start) * frame_width, audio_format['data_offset'] + block_start * frame_width)
+                samples = _pcm_to_array(data, audio_format['sample_width'], audio_format['channels'])
+                envelopes.append(self.detector.energy_envelope(samples, sample_rate))
+            envelope = np.concatenate(envelopes) if envelopes else np.empty(0, dtype=np.float64)
+
+            first = first_frame // frame_length
+            open_run_start = state['open_run_start']
+            silent = np.concatenate(([0 if open_run_start is None else 1], (envelope < self.silence_threshold).astype(np.int8)))
+            edges = np.diff(silent)
+            run_starts = list(np.flatnonzero(edges == 1) + first)
+            run_ends = list(np.flatnonzero(edges == -1) + first)
+            if open_run_start is not None:
+                run_starts.insert(0, open_run_start)
+            open_run_start = int(run_starts.pop()) if len(run_starts) > len(run_ends) else None
+
+            total_seconds = last_frame / sample_rate
+            if final and open_run_start is not None:
+                run_starts.append(open_run_start)
+                run_ends.append(first + len(envelope))
+                open_run_start = None
+
+            starts = np.array(run_starts, dtype=np.int64) * frame_seconds
+            ends = np.minimum(np.array(run_ends, dtype=np.int64) * frame_seconds, total_seconds)
+            keep = (ends - starts) >= self.silence_duration
+            for run_start, silence in zip(np.array(run_starts, dtype=np.int64)[keep],
+                                          NumpySilenceDetector.silences_from_runs(starts, ends, self.silence_duration)):
+                if state['silences'] and state['queued_run_start'] != int(run_start):
+                    self.__queue_chunk(silence['start'])
+                state['silences'].append(silence)
+
+            if open_run_start is not None and state['silences'] and state['queued_run_start'] != open_run_start:
+                # The open run is already a silence, its start closes the chunk before it.
+                if (first + len(envelope)) * frame_seconds - open_run_start * frame_seconds >= self.silence_duration:
+                    self.__queue_chunk(round(float(open_run_start * frame_seconds), 6))
+                    state['queued_run_start'] = open_run_start
+
+        state['open_run_start'] = open_run_start
+        state['analysed_frames'] = last_frame
+
+    def __queue_chunk(self, silence_start: float):
+        start, duration = _chunk_bounds(self.state['silences'][-1]['end'], silence_start)
+        self.state['pending'].append({'content_size': 0, 'start': start, 'end': duration + start, 'duration': duration})
+
+    def __emit(self, fd: int, audio_format: dict, available_frames: int, final: bool) -> List[SegmentChunk]:
+        state = self.state
+        sample_rate = audio_format['sample_rate']
+        frame_width = audio_format['channels'] * audio_format['sample_width']
+
+        chunks = []
+        while state['pending']:
+            chunk = BaseChunk(**state['pending'][0])
+            if not final and not _chunk_end_available(chunk.end_milliseconds, sample_rate, available_frames):
+                break
+            start = _frame_position(chunk.start_milliseconds, sample_rate, available_frames)
+            end = _frame_position(chunk.end_milliseconds, sample_rate, available_frames)
+            data = os.pread(fd, (end - start) * frame_width, audio_format['data_offset'] + start * frame_width)
+            missing_frames = (end - start) - len(data) // frame_width
+            if missing_frames > 0:
+                data += (b'\x80' if audio_format['sample_width'] == 1 else b'\x00') * frame_width * missing_frames
+            pcm = PCMAudio(data, sample_rate, audio_format['channels'], audio_format['sample_width'])
+            chunks.append(SegmentChunk(**chunk.to_dict(), pcm=pcm))
+            state['chunks'].append(state['pending'].pop(0))
+        return chunks
+
+    def __repr__(self):
+        return f'IncrementalChunker(input_file_path:{self.input_file_path}, chunks:{len(self.state["chunks"])})'
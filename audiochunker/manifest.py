@@ -0,0 +1,202 @@
+import json
+import os
+
+import numpy as np
+
+from .chunks import ChunkTable, SilenceTable
+from .exceptions import AudioFormatException
+from .pcm import PCMAudio
+
+
+class ChunkManifest:
+    """
+    Chunk boundaries as frame and byte ranges of the source PCM WAV file, no chunk file is written.
+
+    Workers read a chunk straight from the source file with a single pread, see read_chunk.
+    start_frame/end_frame follow PCMAudio.slice and may run a few frames past the end of the data,
+    byte_offset/byte_length only cover the data, read_chunk pads the rest with silence like slice.
+    A manifest is saved as JSON Lines (a header line followed by one line per chunk) or as
+    a NumPy .npz archive holding the same columns.
+    """
+    dtype = np.dtype([('start', 'f8'), ('end', 'f8'), ('duration', 'f8'), ('start_frame', 'i8'), ('end_frame', 'i8'),
+                      ('byte_offset', 'i8'), ('byte_length', 'i8')])
+    formats = ('jsonl', 'npz')
+
+    def __init__(self, source: str, sample_rate: int, channels: int, sample_width: int, data_offset: int,
+                 frame_count: int, array: np.ndarray=None, silences: SilenceTable=None):
+        self.source = source
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.data_offset = data_offset
+        self.frame_count = frame_count
+        self.array: np.ndarray = np.zeros(0, dtype=self.dtype) if array is None else array
+        self.silences: SilenceTable = SilenceTable() if silences is None else silences
+        self.__fd = None
+
+    @property
+    def frame_width(self) -> int:
+        return self.channels * self.sample_width
+
+    @classmethod
+    def from_chunk_table(cls, source: str, header: dict, chunk_table: ChunkTable, silences: list) -> 'ChunkManifest':
+        """
+        Map chunk times to frame and byte ranges of a PCM WAV file.
+
+        Frames are computed with the same arithmetic as PCMAudio.slice, the byte range of the last
+        chunk is clipped to the end of the data chunk.
+
+        Parameters:
+            source (str): File path to the PCM WAV file.
+            header (dict): The parsed WAV header of the file, see _parse_wav_header.
+            chunk_table (ChunkTable): Chunk boundaries in seconds.
+            silences (list): Silences list or SilenceTable.
+        Returns:
+            ChunkManifest: ChunkManifest instance.
+        """
+        frame_width = header['channels'] * header['sample_width']
+        frame_count = header['data_size'] // frame_width
+        sample_rate = header['sample_rate']
+        length_milliseconds = round(1000 * (frame_count / sample_rate))
+
+        array = np.zeros(len(chunk_table), dtype=cls.dtype)
+        array['start'] = chunk_table.starts
+        array['end'] = chunk_table.ends
+        array['duration'] = chunk_table.durations
+        for column, milliseconds in (('start_frame', chunk_table.starts * 1000), ('end_frame', chunk_table.ends * 1000)):
+            # Vectorized _frame_position.
+            milliseconds = np.minimum(milliseconds, length_milliseconds)
+            milliseconds = np.where(milliseconds < 0, length_milliseconds + milliseconds, milliseconds)
+            array[column] = (milliseconds * (sample_rate / 1000.0)).astype('i8')
+        array['end_frame'] = np.maximum(array['end_frame'], array['start_frame'])
+        read_start = np.minimum(array['start_frame'], frame_count)
+        array['byte_offset'] = header['data_offset'] + read_start * frame_width
+        array['byte_length'] = (np.minimum(array['end_frame'], frame_count) - read_start) * frame_width
+        return cls(source, sample_rate, header['channels'], header['sample_width'], header['data_offset'], frame_count,
+                   array, SilenceTable.from_silences(silences))
+
+    def header(self) -> dict:
+        return {
+            'source': self.source,
+            'sample_rate': self.sample_rate,
+            'channels': self.channels,
+            'sample_width': self.sample_width,
+            'data_offset': self.data_offset,
+            'frame_count': self.frame_count,
+        }
+
+    def write(self, manifest_path: str, format: str=None) -> str:
+        """
+        Save the manifest.
+
+        Parameters:
+            manifest_path (str): File path of the manifest.
+            format (str): 'jsonl' or 'npz', taken from the manifest_path extension when not set.
+        Returns:
+            str: The manifest path.
+        """
+        format = format or os.path.splitext(manifest_path)[1].lstrip('.') or 'jsonl'
+        if format not in self.formats:
+            raise ValueError(f'format must be one of {", ".join(self.formats)}.')
+
+        if format == 'npz':
+            with open(manifest_path, 'wb') as f:
+                np.savez(f, header=np.array(json.dumps(self.header())), chunks=self.array, silences=self.silences.array)
+            return manifest_path
+
+        columns = self.dtype.names
+        with open(manifest_path, 'w') as f:
+            f.write(json.dumps({**self.header(), 'silences': self.silences.to_list()}) + '\n')
+            for row in self.array.tolist():
+                f.write(json.dumps(dict(zip(columns, row))) + '\n')
+        return manifest_path
+
+    @classmethod
+    def read(cls, manifest_path: str) -> 'ChunkManifest':
+        """
+        Load a manifest written by write, the format is detected from the content.
+
+        Parameters:
+            manifest_path (str): File path of the manifest.
+        Returns:
+            ChunkManifest: ChunkManifest instance.
+        """
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f'Manifest file {manifest_path} not found.')
+
+        with open(manifest_path, 'rb') as f:
+            is_npz = f.read(4) == b'PK\x03\x04'
+
+        if is_npz:
+            with np.load(manifest_path, allow_pickle=False) as archive:
+                header = json.loads(str(archive['header']))
+                return cls(**header, array=archive['chunks'].astype(cls.dtype), silences=SilenceTable(archive['silences'].astype(SilenceTable.dtype)))
+
+        with open(manifest_path) as f:
+            header = json.loads(f.readline())
+            silences = SilenceTable.from_silences(header.pop('silences'))
+            rows = [json.loads(line) for line in f if line.strip()]
+        array = np.array([tuple(row[column] for column in cls.dtype.names) for row in rows], dtype=cls.dtype)
+        return cls(**header, array=array, silences=silences)
+
+    def to_chunk_table(self) -> ChunkTable:
+        chunk_table = ChunkTable.from_bounds(self.array['start'], self.array['end'])
+        chunk_table.content_sizes[:] = (self.array['end_frame'] - self.array['start_frame']) * self.frame_width
+        return chunk_table
+
+    def open(self) -> 'ChunkManifest':
+        """
+        Keep the source file open for read_chunk, close releases it.
+        """
+        if self.__fd is None:
+            self.__fd = os.open(self.source, os.O_RDONLY)
+        return self
+
+    def close(self):
+        if self.__fd is not None:
+            os.close(self.__fd)
+            self.__fd = None
+
+    def __enter__(self) -> 'ChunkManifest':
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read_chunk(self, index: int, fd: int=None) -> PCMAudio:
+        """
+        Read the PCM data of one chunk from the source file with a single pread.
+
+        Parameters:
+            index (int): Chunk index.
+            fd (int): Open file descriptor of the source file, the manifest's own (see open) when not set.
+        Returns:
+            PCMAudio: The chunk audio, padded with silence past the end of the data like PCMAudio.slice.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('chunk index out of range')
+
+        byte_offset = int(self.array['byte_offset'][index])
+        byte_length = int(self.array['byte_length'][index])
+        if fd is not None:
+            data = os.pread(fd, byte_length, byte_offset)
+        elif self.__fd is not None:
+            data = os.pread(self.__fd, byte_length, byte_offset)
+        else:
+            with self:
+                data = os.pread(self.__fd, byte_length, byte_offset)
+
+        if len(data) != byte_length:
+            raise AudioFormatException(f'{self.source} is shorter than the manifest, got {len(data)} of {byte_length} bytes.')
+        missing_frames = int(self.array['end_frame'][index] - self.array['start_frame'][index]) - byte_length // self.frame_width
+        if missing_frames > 0:
+            data += (b'\x80' if self.sample_width == 1 else b'\x00') * self.frame_width * missing_frames
+        return PCMAudio(data, self.sample_rate, self.channels, self.sample_width)
+
+    def __len__(self):
+        return len(self.array)
+
+    def __repr__(self):
+        return f'ChunkManifest(source:{self.source}, chunks:{len(self)})'
@@ -0,0 +1,141 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsSink:
+    """
+    Receives the stage timings and counters of chunking runs. Subclass and override stage and count.
+    """
+    def stage(self, name: str, seconds: float, usage: dict=None):
+        """
+        Parameters:
+            name (str): Stage name, e.g. ffmpeg_decode, parse_silences, slice or export.
+            seconds (float): Wall clock time of the stage.
+            usage (dict): cpu_seconds and max_rss_bytes of the child process, when the stage ran one.
+        """
+        pass
+
+    def count(self, name: str, value: float=1):
+        """
+        Parameters:
+            name (str): Counter name, e.g. chunks, bytes_written or silences_found.
+            value (float): Increment.
+        """
+        pass
+
+
+class LoggingMetricsSink(MetricsSink):
+    """
+    Default sink, logs every stage and counter.
+    """
+    def __init__(self, level: int=logging.DEBUG):
+        self.level = level
+
+    def stage(self, name: str, seconds: float, usage: dict=None):
+        if not logger.isEnabledFor(self.level):
+            return
+        child = f' child_cpu_seconds:{usage["cpu_seconds"]:.6f} child_max_rss_bytes:{usage["max_rss_bytes"]}' if usage else ''
+        logger.log(self.level, f'stage:{name} seconds:{seconds:.6f}{child}')
+
+    def count(self, name: str, value: float=1):
+        logger.log(self.level, f'counter:{name} value:{value}')
+
+
+class PrometheusMetricsSink(MetricsSink):
+    """
+    Aggregates the stages and counters and renders them in the Prometheus text exposition format.
+    """
+    def __init__(self, prefix: str='audiochunker'):
+        self.prefix = prefix
+        self.__lock = threading.Lock()
+        self.__stage_seconds = {}
+        self.__stage_count = {}
+        self.__child_cpu_seconds = {}
+        self.__child_max_rss_bytes = {}
+        self.__counters = {}
+
+    def stage(self, name: str, seconds: float, usage: dict=None):
+        with self.__lock:
+            self.__stage_seconds[name] = self.__stage_seconds.get(name, 0.0) + seconds
+            self.__stage_count[name] = self.__stage_count.get(name, 0) + 1
+            if usage:
+                self.__child_cpu_seconds[name] = self.__child_cpu_seconds.get(name, 0.0) + usage['cpu_seconds']
+                self.__child_max_rss_bytes[name] = max(self.__child_max_rss_bytes.get(name, 0), usage['max_rss_bytes'])
+
+    def count(self, name: str, value: float=1):
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def render(self) -> str:
+        """
+        Returns:
+            str: The metrics in the Prometheus text exposition format.
+        """
+        with self.__lock:
+            lines = []
+            if self.__stage_seconds:
+                lines.append(f'# TYPE {self.prefix}_stage_seconds summary')
+                for name in sorted(self.__stage_seconds):
+                    lines.append(f'{self.prefix}_stage_seconds_sum{{stage="{name}"}} {self.__stage_seconds[name]}')
+                    lines.append(f'{self.prefix}_stage_seconds_count{{stage="{name}"}} {self.__stage_count[name]}')
+            if self.__child_cpu_seconds:
+                lines.append(f'# TYPE {self.prefix}_child_cpu_seconds_total counter')
+                for name in sorted(self.__child_cpu_seconds):
+                    lines.append(f'{self.prefix}_child_cpu_seconds_total{{stage="{name}"}} {self.__child_cpu_seconds[name]}')
+                lines.append(f'# TYPE {self.prefix}_child_max_rss_bytes gauge')
+                for name in sorted(self.__child_max_rss_bytes):
+                    lines.append(f'{self.prefix}_child_max_rss_bytes{{stage="{name}"}} {self.__child_max_rss_bytes[name]}')
+            for name in sorted(self.__counters):
+                lines.append(f'# TYPE {self.prefix}_{name}_total counter')
+                lines.append(f'{self.prefix}_{name}_total {self.__counters[name]}')
+            return '\n'.join(lines) + '\n' if lines else ''
+
+    def write(self, path: str):
+        """
+        Atomically write the metrics to path, e.g. for the node_exporter textfile collector.
+        """
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'w') as f:
+            f.write(self.render())
+        os.replace(temporary_path, path)
+
+
+_metrics_sink: MetricsSink = LoggingMetricsSink()
+
+def set_metrics_sink(sink: MetricsSink=None) -> MetricsSink:
+    """
+    Set the sink receiving the metrics of every chunking run, None restores the logging sink.
+
+    Returns:
+        MetricsSink: The previous sink.
+    """
+    global _metrics_sink
+    previous = _metrics_sink
+    _metrics_sink = sink if sink is not None else LoggingMetricsSink()
+    return previous
+
+def get_metrics_sink() -> MetricsSink:
+    return _metrics_sink
+
+@contextmanager
+def measure_stage(name: str):
+    """
+    Time the enclosed block and report it to the metrics sink as stage name.
+
+    Yields a dict, setting its usage key attaches child process resource usage to the stage.
+    """
+    record = {}
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        _metrics_sink.stage(name, time.perf_counter() - started, record.get('usage'))
+
+def _count(name: str, value: float=1):
+    _metrics_sink.count(name, value)
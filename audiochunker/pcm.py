@@ -0,0 +1,627 @@
+import functools
+import hashlib
+import math
+import mmap
+import os
+import struct
+
+import numpy as np
+from pydub import AudioSegment
+
+from .exceptions import AudioFormatException
+from .metrics import measure_stage
+
+
+def _pcm_to_array(data: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """
+    Convert interleaved little-endian PCM bytes to a float32 array in the [-1.0, 1.0] range.
+
+    Parameters:
+        data (bytes): Interleaved PCM data.
+        sample_width (int): Sample width in bytes (1, 2, 3 or 4).
+        channels (int): Number of channels.
+    Returns:
+        np.ndarray: Array shaped (frames, channels).
+    """
+    if sample_width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768
+    elif sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        packed = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = np.where(packed >= 1 << 23, packed - (1 << 24), packed).astype(np.float32) / (1 << 23)
+    elif sample_width == 4:
+        samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / (1 << 31)
+    else:
+        raise AudioFormatException(f'Unsupported sample width {sample_width}.')
+    return samples.reshape(-1, channels)
+
+
+def _array_to_pcm(samples: np.ndarray, sample_width: int) -> bytes:
+    """
+    Convert float samples in the [-1.0, 1.0] range to interleaved little-endian PCM bytes, the inverse of _pcm_to_array.
+    """
+    if sample_width == 1:
+        return (np.clip(np.rint(samples * 128), -128, 127) + 128).astype(np.uint8).tobytes()
+    if sample_width == 2:
+        return np.clip(np.rint(samples * 32768), -32768, 32767).astype('<i2').tobytes()
+    if sample_width == 4:
+        return np.clip(np.rint(samples.astype(np.float64) * (1 << 31)), -(1 << 31), (1 << 31) - 1).astype('<i4').tobytes()
+    raise AudioFormatException(f'Unsupported target sample width {sample_width}.')
+
+
+_RESAMPLE_ZERO_CROSSINGS = 8
+
+
+@functools.lru_cache(maxsize=16)
+def _resample_filter(up: int, down: int, rolloff: float=0.945) -> np.ndarray:
+    """
+    Kaiser windowed sinc low-pass filter of a polyphase up/down resampler, padded to a multiple of up taps.
+
+    The filter is centered on tap _RESAMPLE_ZERO_CROSSINGS * max(up, down).
+    """
+    ratio = max(up, down)
+    taps = 2 * _RESAMPLE_ZERO_CROSSINGS * ratio + 1
+    cutoff = rolloff / ratio
+    positions = np.arange(taps) - (taps - 1) / 2
+    coefficients = cutoff * np.sinc(cutoff * positions) * np.kaiser(taps, 8.6) * up
+    padded = np.zeros(-(-taps // up) * up, dtype=np.float32)
+    padded[:taps] = coefficients
+    return padded
+
+
+def _parse_wav_header(buffer) -> dict:
+    """
+    Parse the RIFF/WAVE header of a bytes-like object.
+
+    Streamed WAV files (as written by ffmpeg to a pipe) and files that are still
+    being written may carry a placeholder data size; in that case the data chunk
+    is assumed to extend to the end of the buffer.
+
+    Parameters:
+        buffer (bytes-like): The WAV file content, or at least its beginning.
+    Returns:
+        dict: audio_format, channels, sample_rate, sample_width, data_offset and data_size.
+    """
+    if len(buffer) < 12 or bytes(buffer[0:4]) != b'RIFF' or bytes(buffer[8:12]) != b'WAVE':
+        raise AudioFormatException('Not a RIFF/WAVE file.')
+
+    header = None
+    position = 12
+    while position + 8 <= len(buffer):
+        chunk_id = bytes(buffer[position:position + 4])
+        chunk_size = struct.unpack('<I', buffer[position + 4:position + 8])[0]
+        body = position + 8
+        if chunk_id == b'fmt ':
+            if chunk_size < 16 or body + 16 > len(buffer):
+                raise AudioFormatException('Invalid fmt chunk.')
+            audio_format, channels, sample_rate, _, _, bits_per_sample = struct.unpack('<HHIIHH', buffer[body:body + 16])
+            if audio_format == 0xFFFE and chunk_size >= 26:
+                # WAVE_FORMAT_EXTENSIBLE: the actual format is the first field of the sub format GUID.
+                audio_format = struct.unpack('<H', buffer[body + 24:body + 26])[0]
+            header = {
+                'audio_format': audio_format,
+                'channels': channels,
+                'sample_rate': sample_rate,
+                'sample_width': bits_per_sample // 8,
+                'bits_per_sample': bits_per_sample,
+            }
+        elif chunk_id == b'data':
+            if header is None:
+                raise AudioFormatException('data chunk found before fmt chunk.')
+            available = len(buffer) - body
+            data_size = available if chunk_size == 0xFFFFFFFF or chunk_size > available else chunk_size
+            frame_width = header['channels'] * header['sample_width']
+            header['data_offset'] = body
+            header['data_size'] = data_size - data_size % frame_width if frame_width else data_size
+            return header
+        position = body + chunk_size + (chunk_size & 1)
+
+    raise AudioFormatException('data chunk not found.')
+
+
+_WAV_CODECS = {1: 'pcm_{sign}{bits}le', 3: 'pcm_f{bits}le', 6: 'pcm_alaw', 7: 'pcm_mulaw'}
+_CHANNEL_LAYOUTS = {1: 'mono', 2: 'stereo', 3: '2.1', 4: 'quad', 6: '5.1', 8: '7.1'}
+
+
+def _probe_wav(mapped) -> dict:
+    header = _parse_wav_header(mapped)
+    if header['audio_format'] not in _WAV_CODECS or not header['channels'] or not header['sample_rate']:
+        return None
+    bits = header['bits_per_sample']
+    frame_width = header['channels'] * header['sample_width']
+    frames = header['data_size'] // frame_width if frame_width else 0
+    codec_name = _WAV_CODECS[header['audio_format']].format(sign='u' if bits == 8 else 's', bits=bits)
+    sample_fmt = {'pcm_u8': 'u8', 'pcm_s16le': 's16', 'pcm_s24le': 's32', 'pcm_s32le': 's32',
+                  'pcm_f32le': 'flt', 'pcm_f64le': 'dbl', 'pcm_alaw': 's16', 'pcm_mulaw': 's16'}.get(codec_name)
+    return {
+        'codec_name': codec_name,
+        'codec_type': 'audio',
+        'sample_fmt': sample_fmt,
+        'sample_rate': header['sample_rate'],
+        'channels': header['channels'],
+        'channel_layout': _CHANNEL_LAYOUTS.get(header['channels']),
+        'bits_per_sample': bits,
+        'duration_ts': frames,
+        'duration': frames / header['sample_rate'],
+        'bit_rate': header['sample_rate'] * header['channels'] * bits,
+    }
+
+
+def _probe_flac(f, file_size: int) -> dict:
+    head = f.read(10)
+    offset = 0
+    if head[0:3] == b'ID3' and len(head) == 10:
+        # ID3v2 tag in front of the stream, its size is a 28 bits syncsafe integer.
+        offset = 10 + ((head[6] & 0x7F) << 21 | (head[7] & 0x7F) << 14 | (head[8] & 0x7F) << 7 | (head[9] & 0x7F))
+    f.seek(offset)
+    block = f.read(42)
+    if len(block) < 42 or block[0:4] != b'fLaC' or block[4] & 0x7F != 0:
+        return None
+    # STREAMINFO: 20 bits sample rate, 3 bits channels - 1, 5 bits bits per sample - 1, 36 bits total samples.
+    packed = int.from_bytes(block[18:26], 'big')
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits = ((packed >> 36) & 0x1F) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    if not sample_rate:
+        return None
+    duration = total_samples / sample_rate
+    return {
+        'codec_name': 'flac',
+        'codec_long_name': 'FLAC (Free Lossless Audio Codec)',
+        'codec_type': 'audio',
+        'sample_fmt': 's16' if bits <= 16 else 's32',
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'channel_layout': _CHANNEL_LAYOUTS.get(channels),
+        'bits_per_sample': bits,
+        'duration_ts': total_samples,
+        'duration': duration,
+        'bit_rate': int((file_size - offset) * 8 / duration) if duration else 0,
+    }
+
+
+def _probe_ogg(f, file_size: int) -> dict:
+    page = f.read(27 + 255 + 19)
+    if len(page) < 28 or page[0:4] != b'OggS':
+        return None
+    serial = page[14:18]
+    packet = page[27 + page[26]:]
+    if packet[0:7] == b'\x01vorbis' and len(packet) >= 30:
+        channels = packet[11]
+        sample_rate, nominal_bitrate = struct.unpack('<I4xi', packet[12:24])
+        info = {'codec_name': 'vorbis', 'codec_long_name': 'Vorbis', 'sample_rate': sample_rate, 'bit_rate': max(nominal_bitrate, 0)}
+        pre_skip = 0
+    elif packet[0:8] == b'OpusHead' and len(packet) >= 19:
+        channels = packet[9]
+        # Opus always decodes at 48 kHz, granule positions count 48 kHz samples.
+        pre_skip = struct.unpack('<H', packet[10:12])[0]
+        sample_rate = 48000
+        info = {'codec_name': 'opus', 'codec_long_name': 'Opus (Opus Interactive Audio Codec)', 'sample_rate': sample_rate}
+    else:
+        return None
+    if not channels or not sample_rate:
+        return None
+
+    # The granule position of the last page of the stream is its length in samples.
+    f.seek(max(file_size - 65536, 0))
+    tail = f.read()
+    granule = None
+    position = tail.rfind(b'OggS')
+    while position != -1:
+        if position + 18 <= len(tail) and tail[position + 14:position + 18] == serial:
+            value = struct.unpack('<q', tail[position + 6:position + 14])[0]
+            if value >= 0:
+                granule = value
+                break
+        position = tail.rfind(b'OggS', 0, position)
+    duration_ts = max(granule - pre_skip, 0) if granule is not None else 0
+    duration = duration_ts / sample_rate
+    info.update({
+        'codec_type': 'audio',
+        'sample_fmt': 'fltp',
+        'channels': channels,
+        'channel_layout': _CHANNEL_LAYOUTS.get(channels),
+        'duration_ts': duration_ts,
+        'duration': duration,
+    })
+    if not info.get('bit_rate') and duration:
+        info['bit_rate'] = int(file_size * 8 / duration)
+    return info
+
+
+def _probe_audio_header(audio_path: str) -> dict:
+    """
+    Read the stream information of WAV, FLAC and Ogg (Vorbis, Opus) files from their headers.
+
+    Returns:
+        dict: AudioInfo fields, or None when the format is not recognized.
+    """
+    with open(audio_path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        magic = f.read(12)
+        f.seek(0)
+        try:
+            if magic[0:4] == b'RIFF' and magic[8:12] == b'WAVE':
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return _probe_wav(mapped)
+            if magic[0:4] == b'fLaC' or magic[0:3] == b'ID3':
+                return _probe_flac(f, file_size)
+            if magic[0:4] == b'OggS':
+                return _probe_ogg(f, file_size)
+        except (AudioFormatException, struct.error, ValueError):
+            return None
+    return None
+
+
+def _frame_position(milliseconds: float, sample_rate: int, frame_count: int) -> int:
+    """
+    Convert a position in milliseconds to a frame index with the same arithmetic as AudioSegment slicing.
+    """
+    length_milliseconds = round(1000 * (frame_count / sample_rate))
+    milliseconds = min(milliseconds, length_milliseconds)
+    if milliseconds < 0:
+        milliseconds = length_milliseconds - abs(milliseconds)
+    return int(milliseconds * (sample_rate / 1000.0))
+
+
+def _is_wav_file(path: str) -> bool:
+    with open(path, 'rb') as f:
+        magic = f.read(12)
+    return magic[0:4] == b'RIFF' and magic[8:12] == b'WAVE'
+
+
+def _is_uncompressed_wav_file(path: str) -> bool:
+    # PCM, float, A-law and mu-law WAV files have fixed size frames ffmpeg can seek to exactly.
+    if not _is_wav_file(path):
+        return False
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _parse_wav_header(mapped)['audio_format'] in _WAV_CODECS
+    except (AudioFormatException, ValueError):
+        return False
+
+
+def _wav_header(data_size: int, sample_rate: int, channels: int, sample_width: int) -> bytes:
+    """
+    Build a canonical 44 bytes PCM WAV header, identical to the one written by the wave module.
+    """
+    return struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16, 1, channels,
+                       sample_rate, channels * sample_rate * sample_width, channels * sample_width,
+                       sample_width * 8, b'data', data_size)
+
+
+class PCMAudio:
+    """
+    Decoded interleaved PCM audio.
+
+    A PCMAudio is decoded once and shared between silence detection and chunk slicing.
+    The data keeps the WAV layout (8 bits samples are unsigned) and may be a
+    memoryview over a memory-mapped file, in which case slices are zero-copy views.
+    """
+    def __init__(self, data: bytes, sample_rate: int, channels: int, sample_width: int):
+        self.data: bytes = data
+        self.sample_rate: int = sample_rate
+        self.channels: int = channels
+        self.sample_width: int = sample_width
+        self.__mapped: mmap.mmap = None
+
+    @property
+    def frame_width(self) -> int:
+        return self.channels * self.sample_width
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.data) // self.frame_width
+
+    @property
+    def duration(self) -> float:
+        return self.frame_count / self.sample_rate
+
+    def samples(self) -> np.ndarray:
+        """
+        Samples shaped (frames, channels) in the [-1.0, 1.0] range.
+        """
+        return _pcm_to_array(self.data, self.sample_width, self.channels)
+
+    def array(self) -> np.ndarray:
+        """
+        Zero-copy integer view of the samples shaped (frames, channels).
+        """
+        dtypes = {1: np.uint8, 2: '<i2', 4: '<i4'}
+        if self.sample_width not in dtypes:
+            raise AudioFormatException(f'{self.sample_width * 8} bits samples cannot be viewed as integers, use samples().')
+        return np.frombuffer(self.data, dtype=dtypes[self.sample_width]).reshape(-1, self.channels)
+
+    def content_hash(self) -> str:
+        """
+        Fast hash (BLAKE2b, 128 bits) of the PCM data and its format, equal for byte-identical audio.
+        """
+        digest = hashlib.blake2b(struct.pack('<IHH', self.sample_rate, self.channels, self.sample_width), digest_size=16)
+        digest.update(self.data)
+        return digest.hexdigest()
+
+    def fingerprint(self, bands: int=32) -> str:
+        """
+        Coarse perceptual fingerprint computed from a downsampled energy envelope.
+
+        The audio is split in bands + 1 parts of equal duration and each bit tells whether the
+        energy rises by more than 1 dB from one part to the next. Gain, sample format and lossy
+        encoding barely change it, so near-identical audio of the same duration (to a tenth of a
+        second) shares it. Distinct audio with a similar envelope can share it too.
+
+        Parameters:
+            bands (int): Number of bits of the envelope.
+        Returns:
+            str: The duration in tenths of seconds and the envelope bits, in hexadecimal.
+        """
+        if bands is None or bands < 1:
+            raise ValueError('bands must be greater than zero')
+
+        samples = self.samples()
+        part_length = len(samples) // (bands + 1)
+        bits = 0
+        if part_length:
+            power = np.square(samples[:part_length * (bands + 1)], dtype=np.float64).reshape(bands + 1, -1).mean(axis=1)
+            for rising in power[1:] > power[:-1] * 10 ** 0.1:
+                bits = (bits << 1) | int(rising)
+        return f'{round(self.duration * 10):x}:{bits:0{-(-bands // 4)}x}'
+
+    def channel(self, index: int) -> 'PCMAudio':
+        """
+        Extract one channel as mono audio.
+
+        Parameters:
+            index (int): Channel index.
+        Returns:
+            PCMAudio: The channel, a copy of its samples.
+        """
+        if not 0 <= index < self.channels:
+            raise IndexError(f'channel {index} out of range, the audio has {self.channels} channels.')
+
+        if self.channels == 1:
+            return self
+        frames = np.frombuffer(self.data, dtype=np.uint8).reshape(-1, self.channels, self.sample_width)
+        return PCMAudio(frames[:, index, :].tobytes(), self.sample_rate, 1, self.sample_width)
+
+    def convert(self, sample_rate: int=None, channels: int=None, sample_width: int=None, block_frames: int=65536) -> 'PCMAudio':
+        """
+        Convert the audio to another sample rate, channel count and sample width in one vectorized pass.
+
+        Channels are downmixed by averaging (or a mono input is duplicated) and the sample rate is changed
+        with a polyphase windowed sinc resampler. The audio is processed block_frames output frames at a time.
+
+        Parameters:
+            sample_rate (int): Target sample rate, None keeps the current one.
+            channels (int): Target number of channels, None keeps the current one.
+            sample_width (int): Target sample width in bytes (1, 2 or 4), None keeps the current one.
+            block_frames (int): Number of output frames converted at once.
+        Returns:
+            PCMAudio: The converted audio, this audio when nothing changes.
+        """
+        sample_rate = sample_rate or self.sample_rate
+        channels = channels or self.channels
+        sample_width = sample_width or self.sample_width
+        if (sample_rate, channels, sample_width) == (self.sample_rate, self.channels, self.sample_width):
+            return self
+
+        if channels != self.channels and 1 not in (channels, self.channels):
+            raise AudioFormatException(f'Cannot convert {self.channels} channels to {channels} channels.')
+
+        if sample_width not in (1, 2, 4):
+            raise AudioFormatException(f'Unsupported target sample width {sample_width}.')
+
+        divisor = math.gcd(sample_rate, self.sample_rate)
+        up, down = sample_rate // divisor, self.sample_rate // divisor
+        frame_count = self.frame_count
+        output_frames = frame_count * up // down
+        coefficients = _resample_filter(up, down) if (up, down) != (1, 1) else None
+
+        def read(first: int, last: int) -> np.ndarray:
+            # Input frames first to last (exclusive), frames outside the audio are silence.
+            start, end = max(first, 0), min(last, frame_count)
+            samples = _pcm_to_array(memoryview(self.data)[start * self.frame_width:max(end, start) * self.frame_width],
+                                    self.sample_width, self.channels)
+            if channels == 1 and self.channels > 1:
+                samples = samples.mean(axis=1, keepdims=True)
+            if start - first or last - max(end, start):
+                samples = np.pad(samples, ((start - first, last - max(end, start)), (0, 0)))
+            return samples
+
+        blocks = []
+        for block_start in range(0, output_frames, block_frames):
+            block_end = min(block_start + block_frames, output_frames)
+            if coefficients is None:
+                block = read(block_start, block_end)
+            else:
+                taps = len(coefficients) // up
+                center = _RESAMPLE_ZERO_CROSSINGS * max(up, down)
+                positions = np.arange(block_start, block_end, dtype=np.int64) * down + center
+                newest = positions // up
+                phases = positions % up
+                first = int(newest[0]) - taps + 1
+                samples = read(first, int(newest[-1]) + 1)
+                indexes = (newest - first)[:, None] - np.arange(taps)[None, :]
+                weights = coefficients[phases[:, None] + np.arange(taps)[None, :] * up]
+                block = np.einsum('btc,bt->bc', samples[indexes], weights)
+            if channels > 1 and block.shape[1] == 1:
+                block = np.repeat(block, channels, axis=1)
+            blocks.append(_array_to_pcm(block, sample_width))
+
+        return PCMAudio(b''.join(blocks), sample_rate, channels, sample_width)
+
+    def slice(self, start_milliseconds: float, end_milliseconds: float) -> 'PCMAudio':
+        """
+        Slice the audio by milliseconds using the same frame arithmetic as AudioSegment slicing.
+
+        Parameters:
+            start_milliseconds (float): Slice start.
+            end_milliseconds (float): Slice end.
+        Returns:
+            PCMAudio: The slice, a zero-copy view of this audio.
+        """
+        start = _frame_position(start_milliseconds, self.sample_rate, self.frame_count) * self.frame_width
+        end = _frame_position(end_milliseconds, self.sample_rate, self.frame_count) * self.frame_width
+
+        data = memoryview(self.data)[start:end]
+        missing_frames = (end - start - len(data)) // self.frame_width
+        if missing_frames > 0:
+            # Like AudioSegment, fill the rounding gap at the end of the audio with silence.
+            data = bytes(data) + (b'\x80' if self.sample_width == 1 else b'\x00') * self.frame_width * missing_frames
+        return PCMAudio(data, self.sample_rate, self.channels, self.sample_width)
+
+    @classmethod
+    def from_audio_segment(cls, audio_segment: AudioSegment) -> 'PCMAudio':
+        """
+        Wrap the PCM data of a pydub AudioSegment.
+
+        Parameters:
+            audio_segment (AudioSegment): The audio segment.
+        Returns:
+            PCMAudio: The PCM audio.
+        """
+        data = audio_segment.raw_data
+        if audio_segment.sample_width == 1:
+            # pydub keeps 8 bits samples signed, WAV stores them unsigned.
+            data = (np.frombuffer(data, dtype=np.uint8) ^ 0x80).tobytes()
+        return cls(data, audio_segment.frame_rate, audio_segment.channels, audio_segment.sample_width)
+
+    def to_audio_segment(self) -> AudioSegment:
+        """
+        Wrap the PCM data in a pydub AudioSegment without decoding it again.
+        """
+        data = bytes(self.data)
+        if self.sample_width == 1:
+            # pydub keeps 8 bits samples signed.
+            data = (np.frombuffer(data, dtype=np.uint8) ^ 0x80).tobytes()
+        return AudioSegment(data=data, sample_width=self.sample_width, frame_rate=self.sample_rate, channels=self.channels)
+
+    def write_wav(self, wav_path: str) -> int:
+        """
+        Write the audio to a PCM WAV file straight from its buffer.
+
+        The file is byte for byte identical to AudioSegment.export(wav_path, format='wav').
+
+        Parameters:
+            wav_path (str): File path to the WAV file.
+        Returns:
+            int: Number of PCM bytes written.
+        """
+        with open(wav_path, 'wb') as f:
+            f.write(_wav_header(len(self.data), self.sample_rate, self.channels, self.sample_width))
+            f.write(self.data)
+        return len(self.data)
+
+    def close(self):
+        """
+        Release the memory map of a PCMAudio created with memory_map=True.
+
+        The map stays open while slices of it are still referenced.
+        """
+        if self.__mapped is None:
+            return
+        if isinstance(self.data, memoryview):
+            self.data.release()
+        try:
+            self.__mapped.close()
+        except BufferError:
+            pass
+        self.__mapped = None
+
+    @classmethod
+    def from_wav_bytes(cls, data: bytes) -> 'PCMAudio':
+        """
+        Read the PCM data of an in-memory WAV file, the data is a zero-copy view of it.
+
+        Parameters:
+            data (bytes): Content of the WAV file, any bytes-like object.
+        Returns:
+            PCMAudio: The PCM audio.
+        """
+        if data is None:
+            raise ValueError('data is not set.')
+
+        view = memoryview(data).cast('B')
+        if view[0:4] != b'RIFF' or view[8:12] != b'WAVE':
+            raise AudioFormatException('data is not a WAV file.')
+
+        header = _parse_wav_header(view)
+        if header['audio_format'] != 1:
+            raise AudioFormatException('data is not a PCM WAV file.')
+
+        data_offset = header['data_offset']
+        return cls(view[data_offset:data_offset + header['data_size']], header['sample_rate'], header['channels'], header['sample_width'])
+
+    @classmethod
+    def from_wav(cls, wav_path: str, memory_map: bool=False) -> 'PCMAudio':
+        """
+        Read the PCM data of a WAV file directly, without ffmpeg.
+
+        Parameters:
+            wav_path (str): File path to the WAV file.
+            memory_map (bool): Memory-map the file instead of reading it, the data is then a zero-copy view of the file.
+        Returns:
+            PCMAudio: The PCM audio.
+        """
+        if wav_path is None:
+            raise ValueError('wav_path is not set.')
+
+        if not os.path.exists(wav_path):
+            raise FileNotFoundError(f'Audio file {wav_path} not found.')
+
+        with measure_stage('wav_load'):
+            with open(wav_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    raise AudioFormatException(f'{wav_path} is empty.')
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    header = _parse_wav_header(mapped)
+                    if header['audio_format'] != 1:
+                        raise AudioFormatException(f'{wav_path} is not a PCM WAV file.')
+                except Exception:
+                    mapped.close()
+                    raise
+                if not memory_map:
+                    mapped.close()
+                    f.seek(header['data_offset'])
+                    return cls(f.read(header['data_size']), header['sample_rate'], header['channels'], header['sample_width'])
+
+        data_offset = header['data_offset']
+        data = memoryview(mapped)[data_offset:data_offset + header['data_size']]
+        audio = cls(data, header['sample_rate'], header['channels'], header['sample_width'])
+        audio.__mapped = mapped
+        return audio
+
+    @classmethod
+    def from_file(cls, audio_path: str) -> 'PCMAudio':
+        """
+        Decode an audio file. PCM WAV files are read directly, any other format is decoded by ffmpeg.
+
+        Parameters:
+            audio_path (str): File path to the audio file.
+        Returns:
+            PCMAudio: The PCM audio.
+        """
+        if audio_path is None:
+            raise ValueError('audio_path is not set.')
+
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f'Audio file {audio_path} not found.')
+
+        audio = _read_pcm_wav(audio_path)
+        if audio is None:
+            from .ffmpeg import FFMPEGTools
+            audio, _ = FFMPEGTools.decode_audio(audio_path)
+        return audio
+
+
+def _read_pcm_wav(audio_path: str, memory_map: bool=False) -> PCMAudio:
+    # PCM WAV files are read directly, keeping their sample width. None for any other file, to be decoded by ffmpeg.
+    if _is_wav_file(audio_path):
+        try:
+            return PCMAudio.from_wav(audio_path, memory_map)
+        except AudioFormatException:
+            pass
+    return None
@@ -0,0 +1,331 @@
+import asyncio
+import functools
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import List
+
+from .metrics import get_metrics_sink, measure_stage
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, stages are then reported without child resource usage.
+    resource = None
+
+
+def _rusage_dict(rusage) -> dict:
+    if rusage is None:
+        return None
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    max_rss_bytes = rusage.ru_maxrss if sys.platform == 'darwin' else rusage.ru_maxrss * 1024
+    return {'cpu_seconds': rusage.ru_utime + rusage.ru_stime, 'max_rss_bytes': max_rss_bytes}
+
+
+class _MeasuredPopen(subprocess.Popen):
+    """
+    Popen keeping the child resource usage in rusage once it has been waited for.
+
+    wait reaps the child itself with os.wait4 where it exists and sets returncode, so Popen
+    finds it already reaped. Otherwise, or when the child was reaped by poll, rusage is the
+    RUSAGE_CHILDREN delta since the child started, which also counts children of other
+    threads reaped meanwhile.
+    """
+    rusage = None
+
+    def __init__(self, *args, **kwargs):
+        self.__children_usage = resource.getrusage(resource.RUSAGE_CHILDREN) if resource is not None else None
+        super().__init__(*args, **kwargs)
+
+    def wait(self, timeout=None):
+        if self.returncode is None and hasattr(os, 'wait4'):
+            self.__wait4(timeout)
+        returncode = super().wait(timeout)
+        if self.rusage is None and self.__children_usage is not None:
+            before, after = self.__children_usage, resource.getrusage(resource.RUSAGE_CHILDREN)
+            # ru_maxrss of RUSAGE_CHILDREN is the largest child so far, not a delta.
+            self.rusage = SimpleNamespace(ru_utime=after.ru_utime - before.ru_utime, ru_stime=after.ru_stime - before.ru_stime,
+                                          ru_maxrss=after.ru_maxrss)
+        return returncode
+
+    def __wait4(self, timeout: float):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = 0.0005
+        while True:
+            try:
+                (pid, status, rusage) = os.wait4(self.pid, 0 if deadline is None else os.WNOHANG)
+            except ChildProcessError:
+                # Already reaped elsewhere, Popen.wait sets the returncode.
+                return
+            if pid == self.pid:
+                self.rusage = rusage
+                self.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.05)
+
+
+class ProcessRunner:
+    """
+    Runner of every ffmpeg/ffprobe child process.
+
+    A process-wide semaphore caps the number of concurrent children (callers wait for
+    a slot, the wait is measured, asyncio callers wait on the event loop), every call gets
+    a wall-clock timeout after which the child's process group is killed and
+    subprocess.TimeoutExpired is raised (FFMPEGTools raise FFMPEGException or FFPROBEException),
+    ffmpeg gets -threads caps on every input and output and -filter_threads caps, and children
+    start with the given niceness. Commands are always argv lists, never a shell. Install a
+    runner with set_process_runner.
+
+    Queue waits and run times are kept per stage (see stats), the waits are also reported
+    to the metrics sink as the process_queue stage when max_processes is set.
+    """
+    def __init__(self, max_processes: int=None, timeout: float=None, threads: int=None, nice: int=None):
+        """
+        Parameters:
+            max_processes (int): Maximum number of concurrent children, unlimited when not set.
+            timeout (float): Wall-clock timeout of a call in seconds, none when not set. Streaming runs have no timeout.
+            threads (int): Decoder, encoder and filter threads of each ffmpeg child, ffmpeg's default when not set.
+            nice (int): Niceness increment of the children.
+        """
+        if max_processes is not None and max_processes < 1:
+            raise ValueError('max_processes must be greater than zero')
+
+        if timeout is not None and timeout <= 0:
+            raise ValueError('timeout must be greater than zero')
+
+        if threads is not None and threads < 1:
+            raise ValueError('threads must be greater than zero')
+
+        self.max_processes = max_processes
+        self.timeout = timeout
+        self.threads = threads
+        self.nice = nice
+        self.__semaphore = threading.BoundedSemaphore(max_processes) if max_processes is not None else None
+        self.__slot_lock = threading.Lock()
+        self.__waiters = deque()
+        self.__lock = threading.Lock()
+        self.__stats = {}
+
+    # ffmpeg options without a value, every other option takes one.
+    ffmpeg_flags = frozenset(('-y', '-n', '-nostats', '-stats', '-nostdin', '-hide_banner', '-vn', '-an', '-sn', '-dn', '-re'))
+
+    def command(self, command: List[str]) -> List[str]:
+        """
+        Add the thread caps to an ffmpeg command: -threads before every input (decoders) and every output (encoders),
+        and the filter thread caps.
+        """
+        if self.threads is None or os.path.basename(command[0]) != 'ffmpeg':
+            return list(command)
+
+        threads = ['-threads', str(self.threads)]
+        capped = [command[0], '-filter_threads', str(self.threads), '-filter_complex_threads', str(self.threads)]
+        index = 1
+        while index < len(command):
+            argument = command[index]
+            if argument == '-i':
+                capped.extend([*threads, argument, command[index + 1]])
+                index += 2
+            elif argument.startswith('-') and argument != '-':
+                width = 1 if argument in self.ffmpeg_flags else 2
+                capped.extend(command[index:index + width])
+                index += width
+            else:
+                # An output file, its options precede it.
+                capped.extend([*threads, argument])
+                index += 1
+        return capped
+
+    def acquire(self, stage: str) -> float:
+        """
+        Wait for a process slot.
+
+        Returns:
+            float: perf_counter time the slot was acquired, pass it to release.
+        """
+        started = time.perf_counter()
+        if self.__semaphore is not None:
+            self.__semaphore.acquire()
+        return self.__acquired(stage, started)
+
+    async def acquire_async(self, stage: str) -> float:
+        """
+        Wait for a process slot on the event loop, see acquire. A released slot goes to the asyncio waiters first.
+        """
+        started = time.perf_counter()
+        if self.__semaphore is None:
+            return self.__acquired(stage, started)
+
+        loop = asyncio.get_running_loop()
+        with self.__slot_lock:
+            if self.__semaphore.acquire(blocking=False):
+                return self.__acquired(stage, started)
+            waiter = (loop, loop.create_future())
+            self.__waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self.__slot_lock:
+                queued = waiter in self.__waiters
+                if queued:
+                    self.__waiters.remove(waiter)
+            if not queued and waiter[1].done() and not waiter[1].cancelled():
+                # The slot was handed over just before the cancellation.
+                self.__release_slot()
+            raise
+        return self.__acquired(stage, started)
+
+    def __release_slot(self):
+        with self.__slot_lock:
+            while self.__waiters:
+                loop, future = self.__waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self.__hand_over, future)
+                    return
+                except RuntimeError:
+                    # The loop of the waiter is closed.
+                    continue
+            self.__semaphore.release()
+
+    def __hand_over(self, future: asyncio.Future):
+        if future.cancelled():
+            self.__release_slot()
+        else:
+            future.set_result(None)
+
+    def __acquired(self, stage: str, started: float) -> float:
+        acquired = time.perf_counter()
+        self.__record(stage, runs=1, queue_seconds=acquired - started)
+        if self.__semaphore is not None:
+            get_metrics_sink().stage('process_queue', acquired - started)
+        return acquired
+
+    def release(self, stage: str, acquired: float):
+        self.__record(stage, run_seconds=time.perf_counter() - acquired)
+        if self.__semaphore is not None:
+            self.__release_slot()
+
+    @contextmanager
+    def slot(self, stage: str):
+        """
+        Hold a process slot for the enclosed block.
+        """
+        acquired = self.acquire(stage)
+        try:
+            yield
+        finally:
+            self.release(stage, acquired)
+
+    def popen(self, command: List[str], **kwargs) -> '_MeasuredPopen':
+        """
+        Start a child in its own process group, with the thread caps and niceness. Hold a slot first.
+        """
+        return _MeasuredPopen(self.command(command), start_new_session=True, preexec_fn=self.preexec_fn, **kwargs)
+
+    @property
+    def preexec_fn(self):
+        """
+        Function run in the child before exec to apply the niceness, None without niceness.
+        """
+        if not self.nice or not hasattr(os, 'nice'):
+            return None
+        return functools.partial(os.nice, self.nice)
+
+    @staticmethod
+    def kill(process):
+        """
+        Kill the process group of a child started by popen and reap it.
+        """
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            process.kill()
+
+    def communicate(self, stage: str, process: subprocess.Popen, input: bytes=None, timeout: float=None) -> tuple:
+        """
+        Popen.communicate with the runner timeout, the process group is killed when it expires.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        try:
+            return process.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.kill(process)
+            output, error = process.communicate()
+            self.__record(stage, timeouts=1)
+            raise subprocess.TimeoutExpired(process.args, timeout, output=output, stderr=error)
+        except BaseException:
+            self.kill(process)
+            process.wait()
+            raise
+
+    def __record(self, stage: str, **values):
+        with self.__lock:
+            stats = self.__stats.setdefault(stage, {'runs': 0, 'timeouts': 0, 'queue_seconds': 0.0, 'max_queue_seconds': 0.0,
+                                                    'run_seconds': 0.0})
+            if 'queue_seconds' in values:
+                stats['max_queue_seconds'] = max(stats['max_queue_seconds'], values['queue_seconds'])
+            for key, value in values.items():
+                stats[key] += value
+
+    def stats(self) -> dict:
+        """
+        Per stage call counts, timeouts, total and maximum queue wait and total run time (slot held) in seconds.
+        """
+        with self.__lock:
+            return {stage: dict(stats) for stage, stats in self.__stats.items()}
+
+    def reset_stats(self):
+        with self.__lock:
+            self.__stats.clear()
+
+    def __repr__(self):
+        return f'ProcessRunner(max_processes:{self.max_processes}, timeout:{self.timeout}, threads:{self.threads}, nice:{self.nice})'
+
+
+_process_runner = ProcessRunner()
+
+
+def set_process_runner(runner: ProcessRunner=None) -> ProcessRunner:
+    """
+    Set the runner of every ffmpeg/ffprobe call, None restores an unlimited runner.
+
+    Returns:
+        ProcessRunner: The previous runner.
+    """
+    global _process_runner
+    previous = _process_runner
+    _process_runner = runner if runner is not None else ProcessRunner()
+    return previous
+
+def get_process_runner() -> ProcessRunner:
+    return _process_runner
+
+
+def _check_output(stage: str, command: List[str], input: bytes=None) -> bytes:
+    """
+    subprocess.check_output (stderr merged into stdout) run by the process runner and measured as stage,
+    with the child resource usage.
+    """
+    runner = _process_runner
+    with runner.slot(stage):
+        with measure_stage(stage) as record:
+            try:
+                process = runner.popen(command, stdin=subprocess.DEVNULL if input is None else subprocess.PIPE,
+                                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            except FileNotFoundError as e:
+                # Same exit status as a shell that cannot find the command.
+                raise subprocess.CalledProcessError(127, command, output=str(e).encode('utf-8'))
+            output, _ = runner.communicate(stage, process, input)
+            record['usage'] = _rusage_dict(process.rusage)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, output=output)
+    return output
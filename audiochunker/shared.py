@@ -0,0 +1,150 @@
+import atexit
+import weakref
+from multiprocessing import shared_memory
+
+from .pcm import PCMAudio, _frame_position
+
+
+class _SharedMemory(shared_memory.SharedMemory):
+    # close leaves the block mapped while PCMAudio views of it are still referenced, also from __del__ at exit.
+    def close(self):
+        try:
+            super().close()
+        except BufferError:
+            pass
+
+
+def _shared_view(audio: PCMAudio, block: shared_memory.SharedMemory) -> PCMAudio:
+    # The view keeps the block object alive: a SharedMemory collected while views of it exist cannot unmap.
+    audio._shared_memory = block
+    return audio
+
+
+class SharedPCM:
+    """
+    Picklable reference to PCM audio held in a multiprocessing.shared_memory block.
+
+    Only the block name, the byte range and the audio format are pickled. attach maps
+    the block (once per process) and returns a zero-copy PCMAudio view of the range.
+    Attached blocks are detached when the process exits, or earlier with detach_all.
+    """
+    __attached: dict = {}
+
+    def __init__(self, name: str, offset: int, length: int, sample_rate: int, channels: int, sample_width: int,
+                 pad_frames: int=0):
+        self.name: str = name
+        self.offset: int = offset
+        self.length: int = length
+        self.sample_rate: int = sample_rate
+        self.channels: int = channels
+        self.sample_width: int = sample_width
+        # Silence frames appended past the end of the block, like PCMAudio.slice does at the end of the audio.
+        self.pad_frames: int = pad_frames
+
+    def attach(self) -> PCMAudio:
+        """
+        Map the shared memory block and return the audio.
+
+        Returns:
+            PCMAudio: Zero-copy view of the block, unless silence frames are padded.
+        """
+        block = SharedPCM.__attached.get(self.name)
+        if block is None:
+            block = _SharedMemory(name=self.name)
+            if not SharedPCM.__attached:
+                atexit.register(SharedPCM.detach_all)
+            SharedPCM.__attached[self.name] = block
+        data = block.buf[self.offset:self.offset + self.length]
+        if self.pad_frames:
+            data = bytes(data) + (b'\x80' if self.sample_width == 1 else b'\x00') * self.channels * self.sample_width * self.pad_frames
+        return _shared_view(PCMAudio(data, self.sample_rate, self.channels, self.sample_width), block)
+
+    @classmethod
+    def detach_all(cls):
+        """
+        Unmap every block attached by this process. Blocks still referenced by PCMAudio views stay mapped.
+        """
+        for name, block in list(cls.__attached.items()):
+            del cls.__attached[name]
+            block.close()
+        atexit.unregister(cls.detach_all)
+
+    def __repr__(self):
+        return f'SharedPCM(name:{self.name}, offset:{self.offset}, length:{self.length})'
+
+
+class SharedPCMBlock:
+    """
+    Decoded PCM audio copied once into a multiprocessing.shared_memory block.
+
+    The block is owned by the process that created it: close unmaps it, unlink removes it
+    (workers keep their own mapping until they detach). Used as a context manager the block
+    is closed and unlinked on exit; a block never released is unlinked when garbage collected.
+    """
+    def __init__(self, audio: PCMAudio):
+        if audio is None:
+            raise ValueError('audio is not set.')
+
+        length = len(audio.data)
+        self.__block = _SharedMemory(create=True, size=max(length, 1))
+        self.__block.buf[:length] = audio.data
+        self.__finalizer = weakref.finalize(self, SharedPCMBlock.__release, self.__block)
+        self.audio: PCMAudio = _shared_view(PCMAudio(self.__block.buf[:length], audio.sample_rate, audio.channels, audio.sample_width),
+                                            self.__block)
+
+    @property
+    def name(self) -> str:
+        return self.__block.name
+
+    @property
+    def size(self) -> int:
+        return len(self.audio.data)
+
+    def slice(self, start_milliseconds: float, end_milliseconds: float) -> tuple:
+        """
+        Slice the audio by milliseconds, with the same frame arithmetic as PCMAudio.slice.
+
+        Parameters:
+            start_milliseconds (float): Slice start.
+            end_milliseconds (float): Slice end.
+        Returns:
+            tuple: Tuple with the PCMAudio view of the slice and its SharedPCM handle.
+        """
+        audio = self.audio
+        frame_width = audio.frame_width
+        start = _frame_position(start_milliseconds, audio.sample_rate, audio.frame_count)
+        end = _frame_position(end_milliseconds, audio.sample_rate, audio.frame_count)
+        available_end = min(end, audio.frame_count)
+        handle = SharedPCM(self.name, start * frame_width, max(available_end - start, 0) * frame_width, audio.sample_rate,
+                           audio.channels, audio.sample_width, pad_frames=end - max(available_end, start))
+        return (_shared_view(audio.slice(start_milliseconds, end_milliseconds), self.__block), handle)
+
+    def close(self):
+        """
+        Unmap the block in this process. It stays mapped while chunk views of it are still referenced.
+        """
+        if isinstance(self.audio.data, memoryview):
+            self.audio.data.release()
+        self.__block.close()
+
+    def unlink(self):
+        """
+        Remove the block, workers already attached keep their mapping.
+        """
+        if self.__finalizer.detach() is not None:
+            self.__block.unlink()
+
+    @staticmethod
+    def __release(block: shared_memory.SharedMemory):
+        block.close()
+        block.unlink()
+
+    def __enter__(self) -> 'SharedPCMBlock':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        self.unlink()
+
+    def __repr__(self):
+        return f'SharedPCMBlock(name:{self.name}, size:{self.size})'
@@ -16,7 +16,10 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    install_requires=['pydub==0.25.1'],
+    install_requires=['pydub==0.25.1', 'numpy>=1.20'],
+    entry_points={
+        'console_scripts': ['audiochunker=audiochunker:main'],
+    },
     setup_requires=['pytest-runner'],
     tests_require=['pytest==7.1.2'],
     test_suite='tests',
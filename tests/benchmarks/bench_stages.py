@@ -0,0 +1,237 @@
+"""
+Stage level benchmarks on synthetic audio.
+
+Every stage runs in a fresh process, so its peak RSS is not inherited from the stages before it.
+Each stage reports its time, the peak RSS of its process, the growth of that peak during the stage
+(rss_delta_kb) and the peak RSS of the ffmpeg children it ran. Slicing and export times and memory
+are taken from the metrics sink, so they do not include loading the WAV file. Results are written
+as JSON and can be compared with a previous run:
+
+    python -m tests.benchmarks.bench_stages --durations 60 3600 --sample-rates 16000 44100 --channels 1 2 -o new.json
+    python -m tests.benchmarks.bench_stages --compare old.json new.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from audiochunker import MetricsSink
+
+STAGES = ['get_audio_information', 'create_silence_content', 'get_silences_from_content', 'wav_load', 'slice', 'export']
+
+
+def peak_rss_kb(who: int=resource.RUSAGE_SELF) -> int:
+    if who == resource.RUSAGE_SELF and os.path.exists('/proc/self/status'):
+        # VmHWM can be reset by reset_peak_rss, ru_maxrss even survives exec (a spawned process starts at its parent's peak).
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def reset_peak_rss():
+    """
+    Reset the peak RSS of this process to its current RSS, where the platform allows it (Linux).
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        pass
+
+
+class StageRecorder(MetricsSink):
+    """
+    Metrics sink keeping the time of each stage and the peak RSS when the stage was reported.
+    """
+    def __init__(self):
+        self.stages = {}
+
+    def stage(self, name: str, seconds: float, usage: dict=None):
+        self.stages[name] = {'seconds': seconds, 'peak_rss_kb': peak_rss_kb()}
+
+
+def run_stage(name: str, path: str, chunks_path: str, silence_threshold: float, silence_duration: float, inputs: dict) -> tuple:
+    """
+    Run one stage and measure it.
+
+    Parameters:
+        name (str): Stage name, one of STAGES.
+        path (str): Synthetic WAV file.
+        chunks_path (str): Directory of the exported chunks.
+        silence_threshold (float): Silence threshold.
+        silence_duration (float): Silence duration.
+        inputs (dict): Outputs of the previous stages, 'content' and 'silences'.
+    Returns:
+        tuple: The stage output and its measures.
+    """
+    from audiochunker import AudioChunker, FFMPEGTools, set_metrics_sink
+    from pydub import AudioSegment
+
+    recorder = StageRecorder()
+    previous = set_metrics_sink(recorder)
+    chunker = None
+    if name in ('slice', 'export'):
+        chunker = AudioChunker(path, silence_threshold, silence_duration, silences=inputs['silences'])
+    reset_peak_rss()
+    baseline = peak_rss_kb()
+    started = time.perf_counter()
+    output = None
+    try:
+        if name == 'get_audio_information':
+            FFMPEGTools.get_audio_information(path)
+        elif name == 'create_silence_content':
+            output = FFMPEGTools.create_silence_content(path, silence_threshold, silence_duration)
+        elif name == 'get_silences_from_content':
+            output = FFMPEGTools.get_silences_from_content(inputs['content'])
+        elif name == 'wav_load':
+            AudioSegment.from_wav(path)
+        elif name == 'slice':
+            output = sum(1 for _ in chunker.chunking_segment())
+        else:
+            chunker.chunking_file(chunks_path)
+        error = None
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    finally:
+        set_metrics_sink(previous)
+    seconds = time.perf_counter() - started
+    peak = peak_rss_kb()
+
+    if name in recorder.stages:
+        # Measured by the chunker itself: the WAV load before slicing or export is left out.
+        seconds = recorder.stages[name]['seconds']
+        if 'wav_load' in recorder.stages:
+            baseline = recorder.stages['wav_load']['peak_rss_kb']
+        peak = recorder.stages[name]['peak_rss_kb']
+    measures = {'seconds': round(seconds, 6), 'peak_rss_kb': peak, 'rss_delta_kb': peak - baseline,
+                'children_peak_rss_kb': peak_rss_kb(resource.RUSAGE_CHILDREN), 'error': error}
+    return (output, measures)
+
+
+def run_case(duration: float, sample_rate: int, channels: int, silence_threshold: float=-30,
+             silence_duration: float=0.5, seed: int=0, isolate: bool=True) -> dict:
+    """
+    Generate one synthetic file and time every chunking stage on it.
+
+    Parameters:
+        isolate (bool): Run every stage in a fresh process. Otherwise children_peak_rss_kb is cumulative
+            and, where the peak RSS cannot be reset, so are peak_rss_kb and rss_delta_kb.
+    Returns:
+        dict: Case parameters, expected/found silence counts and per stage measures.
+    """
+    from tests.benchmarks.synthetic import generate_wav
+
+    with tempfile.TemporaryDirectory() as directory:
+        audio = generate_wav(os.path.join(directory, 'synthetic.wav'), duration, sample_rate, channels, seed=seed)
+        chunks_path = os.path.join(directory, 'chunks')
+        os.mkdir(chunks_path)
+        inputs = {'silences': []}
+
+        stages = {}
+        for name in STAGES:
+            arguments = (name, audio['path'], chunks_path, silence_threshold, silence_duration, inputs)
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                    output, stages[name] = pool.submit(run_stage, *arguments).result()
+            else:
+                output, stages[name] = run_stage(*arguments)
+            if name == 'create_silence_content' and output is not None:
+                inputs['content'] = output
+            elif name == 'get_silences_from_content' and output is not None:
+                inputs['silences'] = output
+            elif name == 'slice':
+                inputs['chunks'] = output
+
+        return {
+            'duration': audio['duration'],
+            'sample_rate': sample_rate,
+            'channels': channels,
+            'file_size': os.path.getsize(audio['path']),
+            'expected_silences': len(audio['silences']),
+            'found_silences': len(inputs['silences']),
+            'chunks': inputs.get('chunks'),
+            'stages': stages,
+        }
+
+
+def run(durations: list, sample_rates: list, channels: list, isolate: bool=True) -> dict:
+    try:
+        from importlib.metadata import version
+        audiochunker_version = version('audiochunker')
+    except Exception:
+        audiochunker_version = None
+
+    cases = []
+    for duration in durations:
+        for sample_rate in sample_rates:
+            for channel_count in channels:
+                cases.append(run_case(duration, sample_rate, channel_count, isolate=isolate))
+
+    return {'audiochunker_version': audiochunker_version, 'python': platform.python_version(),
+            'platform': platform.platform(), 'created': time.time(), 'cases': cases}
+
+
+def case_key(case: dict) -> tuple:
+    return (case['duration'], case['sample_rate'], case['channels'])
+
+
+def compare(baseline: dict, current: dict, tolerance: float=0.2) -> list:
+    """
+    List the stages whose time or RSS growth (rss_delta_kb) grew more than tolerance (a ratio) against the baseline.
+    """
+    regressions = []
+    baseline_cases = {case_key(case): case for case in baseline['cases']}
+    for case in current['cases']:
+        previous = baseline_cases.get(case_key(case))
+        if previous is None:
+            continue
+        for name, stage in case['stages'].items():
+            before = previous['stages'].get(name)
+            if before is None or stage['error'] or before['error']:
+                continue
+            for metric in ('seconds', 'rss_delta_kb'):
+                if before.get(metric) and stage.get(metric) is not None and stage[metric] > before[metric] * (1 + tolerance):
+                    regressions.append({'case': case_key(case), 'stage': name, 'metric': metric,
+                                        'baseline': before[metric], 'current': stage[metric]})
+    return regressions
+
+
+def main(argv: list=None) -> int:
+    parser = argparse.ArgumentParser(description='Run the audiochunker stage benchmarks on synthetic audio.')
+    parser.add_argument('--durations', type=float, nargs='+', default=[10, 600])
+    parser.add_argument('--sample-rates', type=int, nargs='+', default=[16000, 44100])
+    parser.add_argument('--channels', type=int, nargs='+', default=[1, 2])
+    parser.add_argument('--no-isolate', action='store_true', help='Run every stage in this process.')
+    parser.add_argument('-o', '--output', help='Write the results to this JSON file instead of stdout.')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help='Compare two result files.')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as baseline, open(args.compare[1]) as current:
+            regressions = compare(json.load(baseline), json.load(current), args.tolerance)
+        for regression in regressions:
+            print(json.dumps(regression))
+        return 1 if regressions else 0
+
+    results = run(args.durations, args.sample_rates, args.channels, isolate=not args.no_isolate)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
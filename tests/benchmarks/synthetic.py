@@ -0,0 +1,89 @@
+import wave
+
+import numpy as np
+
+block_seconds = 10
+
+
+def speech_like(frames: int, sample_rate: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Voiced harmonics with a drifting pitch, plus noise bursts, shaped by a ~4 Hz syllable envelope.
+    """
+    t = np.arange(frames) / sample_rate
+    pitch = rng.uniform(90, 220) * (1 + 0.05 * np.sin(2 * np.pi * rng.uniform(0.5, 2) * t))
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    noise = rng.standard_normal(frames) * 0.3
+    syllables = 0.55 + 0.45 * np.sin(2 * np.pi * rng.uniform(3, 5) * t + rng.uniform(0, np.pi))
+    signal = (voiced * 0.6 + noise) * syllables
+    return signal / np.max(np.abs(signal)) * 10 ** (rng.uniform(-12, -3) / 20)
+
+
+def silence_layout(duration: float, rng: np.random.Generator, utterance=(1.0, 4.0), silence=(0.6, 1.5)) -> list:
+    """
+    Alternate silences and utterances until duration, starting and ending with a silence.
+
+    Returns:
+        list: Expected silences, as dicts with start, end and duration keys.
+    """
+    duration = float(duration)
+    silences = []
+    position = 0.0
+    while True:
+        length = rng.uniform(*silence)
+        if position + length + utterance[0] + silence[0] > duration:
+            silences.append({'start': round(position, 6), 'end': round(duration, 6), 'duration': round(duration - position, 6)})
+            return silences
+        silences.append({'start': round(position, 6), 'end': round(position + length, 6), 'duration': round(length, 6)})
+        position += length
+        position += min(rng.uniform(*utterance), duration - position - silence[0])
+
+
+def generate_wav(path: str, duration: float, sample_rate: int=16000, channels: int=1, sample_width: int=2,
+                 noise_floor: float=-70, seed: int=0) -> dict:
+    """
+    Write a synthetic speech-like WAV file with a known silence layout.
+
+    The file is written block by block so hours long files do not have to fit in memory.
+
+    Parameters:
+        path (str): Output WAV file path.
+        duration (float): Duration in seconds.
+        sample_rate (int): Sample rate in Hz.
+        channels (int): Number of channels, every channel carries the same utterances.
+        sample_width (int): Bytes per sample, 2 or 4.
+        noise_floor (float): Level of the background noise in dBFS.
+        seed (int): Random seed.
+    Returns:
+        dict: path, duration, sample_rate, channels, sample_width and the expected silences.
+    """
+    rng = np.random.default_rng(seed)
+    silences = silence_layout(duration, rng)
+    total_frames = int(round(duration * sample_rate))
+    utterances = [(round(a['end'] * sample_rate), round(b['start'] * sample_rate)) for a, b in zip(silences, silences[1:])]
+    scale = 2 ** (8 * sample_width - 1) - 1
+    dtype = {2: '<i2', 4: '<i4'}[sample_width]
+    block_frames = block_seconds * sample_rate
+
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(sample_rate)
+        utterance = 0
+        for block_start in range(0, total_frames, block_frames):
+            block_end = min(block_start + block_frames, total_frames)
+            block = rng.standard_normal(block_end - block_start) * 10 ** (noise_floor / 20)
+            while utterance < len(utterances) and utterances[utterance][0] < block_end:
+                start, end = utterances[utterance]
+                if start >= block_start or end > block_start:
+                    signal = speech_like(end - start, sample_rate, np.random.default_rng(seed + utterance + 1))
+                    first, last = max(start, block_start), min(end, block_end)
+                    block[first - block_start:last - block_start] += signal[first - start:last - start]
+                if end > block_end:
+                    break
+                utterance += 1
+            samples = np.clip(block, -1, 1) * scale
+            wav.writeframes(np.repeat(samples[:, None], channels, axis=1).astype(dtype).tobytes())
+
+    return {'path': path, 'duration': total_frames / sample_rate, 'sample_rate': sample_rate,
+            'channels': channels, 'sample_width': sample_width, 'silences': silences}
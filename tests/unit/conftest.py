@@ -2,6 +2,10 @@ import logging
 import os
 from shutil import rmtree
 
+import pytest
+
+from audiochunker import MetricsSink, set_metrics_sink
+
 logger = logging.getLogger(__name__)
 
 chunks_path = 'tests/resources/chunks'
@@ -17,4 +21,33 @@ def pytest_sessionstart(session):
 def pytest_sessionfinish(session, exitstatus):
     print('\nSession finish')
     if os.path.exists(chunks_path):
-        rmtree(chunks_path)
\ No newline at end of file
+        rmtree(chunks_path)
+
+
+class RecordingSink(MetricsSink):
+    def __init__(self):
+        self.stages = []
+        self.counters = {}
+
+    def stage(self, name, seconds, usage=None):
+        self.stages.append((name, seconds, usage))
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    @property
+    def names(self):
+        return [name for name, _, _ in self.stages]
+
+    def clear(self):
+        self.stages.clear()
+        self.counters.clear()
+
+
+@pytest.fixture
+def sink():
+    # Record the metrics of the test instead of logging them.
+    sink = RecordingSink()
+    previous = set_metrics_sink(sink)
+    yield sink
+    set_metrics_sink(previous)
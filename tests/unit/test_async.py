@@ -0,0 +1,101 @@
+import asyncio
+import subprocess
+
+import pytest
+
+from audiochunker import (
+    AsyncAudioChunker, AsyncFFMPEGTools, AudioChunker, FFMPEGException, FFMPEGTools, SegmentChunk
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+# Inexistent audio file
+inexistent_audio = 'tests/resources/inexistent.wav'
+
+reference_silence_file = 'tests/resources/silence_reference'
+
+
+def test_async_create_silence_content():
+    silence_content = asyncio.run(AsyncFFMPEGTools.create_silence_content(audio_3_utterances))
+
+    assert FFMPEGTools.get_silences_from_content(silence_content) == AudioChunker(audio_3_utterances).silences
+
+def test_async_ffmpeg_exception():
+    with pytest.raises(FFMPEGException):
+        asyncio.run(AsyncFFMPEGTools.create_silence_content(reference_silence_file))
+
+def test_async_inexistent_audio_file():
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(AsyncAudioChunker.create(inexistent_audio))
+
+@pytest.mark.parametrize('detector,single_decode', [('ffmpeg', False), ('ffmpeg', True), ('numpy', False)])
+def test_async_chunking_segment(detector, single_decode):
+    async def chunk():
+        chunker = await AsyncAudioChunker.create(audio_3_utterances, detector=detector, single_decode=single_decode)
+        return chunker, [chunk async for chunk in chunker.chunking_segment()]
+
+    chunker, chunks = asyncio.run(chunk())
+    expected = list(AudioChunker(audio_3_utterances, detector=detector).chunking_segment())
+
+    assert chunker.silences == AudioChunker(audio_3_utterances, detector=detector).silences
+    assert len(chunks) == 3
+    assert type(chunks[0]) == SegmentChunk
+    assert [c.audio_segment.raw_data for c in chunks] == [c.audio_segment.raw_data for c in expected]
+
+def test_async_single_decode_reads_wav(tmp_path, sink):
+    path = str(tmp_path / 'audio_24.wav')
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-i', audio_3_utterances, '-acodec', 'pcm_s24le', path], check=True)
+
+    async def chunk():
+        chunker = await AsyncAudioChunker.create(path, single_decode=True)
+        return chunker, [chunk async for chunk in chunker.chunking_segment()]
+
+    chunker, chunks = asyncio.run(chunk())
+    expected = list(AudioChunker(path, single_decode=True).chunking_segment())
+
+    assert chunker.chunker.audio.sample_width == 3
+    assert 'ffmpeg_decode' not in sink.names
+    assert [bytes(c.pcm.data) for c in chunks] == [bytes(c.pcm.data) for c in expected]
+
+def test_async_chunking_file(tmp_path):
+    async def chunk():
+        chunker = await AsyncAudioChunker.create(audio_3_utterances)
+        return await chunker.chunking_file(chunks_path=str(tmp_path), workers=2)
+
+    chunks, silences = asyncio.run(chunk())
+
+    assert len(chunks) == 3
+    assert len(silences) == 4
+
+def test_async_semaphore(monkeypatch):
+    running = 0
+    max_running = 0
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def counting_exec(*args, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        process = await create_subprocess_exec(*args, **kwargs)
+        original_communicate = process.communicate
+
+        async def communicate(input=None):
+            nonlocal running
+            try:
+                return await original_communicate(input)
+            finally:
+                running -= 1
+        process.communicate = communicate
+        return process
+
+    monkeypatch.setattr(asyncio, 'create_subprocess_exec', counting_exec)
+
+    async def chunk_all():
+        semaphore = asyncio.Semaphore(2)
+        return await asyncio.gather(*[AsyncAudioChunker.create(audio_3_utterances, semaphore=semaphore) for _ in range(6)])
+
+    chunkers = asyncio.run(chunk_all())
+
+    assert len(chunkers) == 6
+    assert max_running == 2
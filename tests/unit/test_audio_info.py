@@ -0,0 +1,74 @@
+import json
+import subprocess
+
+import pytest
+
+from audiochunker import (
+    AudioInfo, FFMPEGTools
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+ffprobe_text = '''[STREAM]
+index=0
+codec_name=mp3
+codec_type=audio
+sample_rate=8000
+channels=1
+bits_per_sample=0
+duration=14.040000
+bit_rate=16000
+DISPOSITION:default=1
+DISPOSITION:dub=0
+TAG:encoder=Lavc
+[/STREAM]
+'''
+
+
+def encode(tmp_path, name, *options):
+    path = str(tmp_path / name)
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-i', audio_3_utterances, *options, path], check=True)
+    return path
+
+def test_wav_header_probe(sink):
+    audio_info = FFMPEGTools.get_audio_information(audio_3_utterances)
+
+    assert sink.names == ['header_probe']
+    assert type(audio_info) == AudioInfo
+    assert audio_info.codec_name == 'pcm_s16le'
+    assert (audio_info.sample_rate, audio_info.channels, audio_info.bits_per_sample) == (16000, 1, 16)
+    assert audio_info.duration_ts == 132928
+    assert audio_info.duration == 8.308
+
+@pytest.mark.parametrize('name, options, codec_name, sample_rate, channels', [
+    ('audio.flac', [], 'flac', 16000, 1),
+    ('audio_24.flac', ['-ar', '44100', '-ac', '2', '-sample_fmt', 's32'], 'flac', 44100, 2),
+    ('audio.ogg', ['-c:a', 'libvorbis'], 'vorbis', 16000, 1),
+    ('audio.opus', ['-c:a', 'libopus'], 'opus', 48000, 1),
+])
+def test_compressed_header_probe(tmp_path, name, options, codec_name, sample_rate, channels):
+    audio_info = FFMPEGTools.get_audio_information(encode(tmp_path, name, *options))
+
+    assert audio_info.codec_name == codec_name
+    assert (audio_info.sample_rate, audio_info.channels) == (sample_rate, channels)
+    assert audio_info.duration == pytest.approx(8.308, abs=0.001)
+    assert audio_info.bit_rate > 0
+
+def test_parse_ffprobe_json():
+    info = json.dumps({
+        'streams': [{'codec_name': 'mp3', 'codec_type': 'audio', 'sample_rate': '8000', 'channels': 1,
+                     'disposition': {'default': 0}, 'tags': {'encoder': 'Lavc'}}],
+        'format': {'duration': '14.040000', 'bit_rate': '16000'},
+    })
+    audio_info = FFMPEGTools.parse_audio_information(info)
+
+    assert (audio_info.codec_name, audio_info.sample_rate, audio_info.channels) == ('mp3', 8000, 1)
+    assert audio_info.duration == 14.04
+    assert audio_info.bit_rate == 16000
+
+def test_parse_ffprobe_text_disposition():
+    audio_info = FFMPEGTools.parse_audio_information(ffprobe_text)
+
+    assert (audio_info.codec_name, audio_info.sample_rate, audio_info.channels) == ('mp3', 8000, 1)
+    assert audio_info.duration == 14.04
@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from audiochunker import (
+    chunk_many, main
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+# Inexistent audio file
+inexistent_audio = 'tests/resources/inexistent.wav'
+
+# Invalid wav file
+invalid_wav = 'tests/resources/error.wav'
+
+empty_file = 'tests/resources/empty_file.txt'
+
+voice_mail = 'tests/resources/voice_mail.mp3'
+
+
+@pytest.mark.parametrize('jobs,max_ffmpeg', [(1, None), (2, 1)])
+def test_chunk_many(tmp_path, jobs, max_ffmpeg):
+    paths = [audio_3_utterances, invalid_wav, inexistent_audio, audio_3_utterances]
+    results = chunk_many(paths, str(tmp_path), jobs=jobs, max_ffmpeg=max_ffmpeg)
+
+    assert [result.input_file_path for result in results] == paths
+    assert [result.ok for result in results] == [True, False, False, True]
+    assert 'FileNotFoundError' in results[2].error
+    assert results[0].chunks_path == str(tmp_path / 'audio_3_utterances')
+    assert results[3].chunks_path == str(tmp_path / 'audio_3_utterances_1')
+    assert len(results[0].chunks) == 3
+    assert len(results[0].silences) == 4
+    assert all(os.path.exists(chunk.chunk_file_path) for chunk in results[3].chunks)
+
+def test_chunk_many_invalid_jobs(tmp_path):
+    with pytest.raises(ValueError):
+        chunk_many([audio_3_utterances], str(tmp_path), jobs=0)
+
+def test_main(tmp_path, capsys):
+    manifest = tmp_path / 'manifest.txt'
+    manifest.write_text(f'{audio_3_utterances}\n')
+
+    exit_code = main(['-o', str(tmp_path / 'out'), '-m', str(manifest), '-j', '1'])
+    lines = capsys.readouterr().out.splitlines()
+
+    assert exit_code == 0
+    assert len(lines) == 1
+    assert json.loads(lines[0])['chunks'] == 3
+
+def test_main_with_failure(tmp_path, capsys):
+    inputs_path = tmp_path / 'inputs'
+    inputs_path.mkdir()
+    for path in (audio_3_utterances, invalid_wav, voice_mail, empty_file):
+        shutil.copy(path, inputs_path)
+
+    exit_code = main(['-o', str(tmp_path / 'out'), '-j', '2', '--single-decode', str(inputs_path), inexistent_audio])
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    # audio_3_utterances.wav, error.wav, voice_mail.mp3 and the inexistent file.
+    assert exit_code == 1
+    assert [result['ok'] for result in results] == [True, False, True, False]
@@ -0,0 +1,45 @@
+import wave
+
+import pytest
+
+from audiochunker import FFMPEGTools
+from tests.benchmarks.bench_stages import STAGES, compare, run_case
+from tests.benchmarks.synthetic import generate_wav
+
+
+def test_generate_wav_layout(tmp_path):
+    path = str(tmp_path / 'synthetic.wav')
+    audio = generate_wav(path, 20, sample_rate=8000, channels=2, seed=1)
+
+    with wave.open(path) as wav:
+        assert (wav.getframerate(), wav.getnchannels(), wav.getnframes()) == (8000, 2, 160000)
+    assert audio['silences'][0]['start'] == 0.0
+    assert audio['silences'][-1]['end'] == 20.0
+
+    silences = FFMPEGTools.get_silences_from_content(FFMPEGTools.create_silence_content(path, -30, 0.5))
+    assert len(silences) == len(audio['silences'])
+    for found, expected in zip(silences, audio['silences']):
+        assert abs(found['start'] - expected['start']) < 0.05
+        assert abs(found['end'] - expected['end']) < 0.05
+
+@pytest.mark.parametrize('isolate', [False, True])
+def test_run_case(isolate):
+    case = run_case(5, 16000, 1, isolate=isolate)
+
+    assert list(case['stages']) == STAGES
+    assert case['found_silences'] == case['expected_silences']
+    assert case['chunks'] == case['expected_silences'] - 1
+    for stage in case['stages'].values():
+        assert stage['error'] is None
+        assert stage['peak_rss_kb'] > 0
+        assert stage['rss_delta_kb'] >= 0
+    assert case['stages']['create_silence_content']['children_peak_rss_kb'] > 0
+
+def test_compare():
+    stage = {'seconds': 1.0, 'peak_rss_kb': 100, 'rss_delta_kb': 10, 'error': None}
+    baseline = {'cases': [{'duration': 5, 'sample_rate': 16000, 'channels': 1, 'stages': {'wav_load': stage}}]}
+    current = {'cases': [{'duration': 5, 'sample_rate': 16000, 'channels': 1, 'stages': {'wav_load': dict(stage, seconds=1.5)}}]}
+
+    assert compare(baseline, baseline) == []
+    assert [regression['metric'] for regression in compare(baseline, current)] == ['seconds']
+    assert [regression['metric'] for regression in compare(baseline, {'cases': [dict(baseline['cases'][0], stages={'wav_load': dict(stage, rss_delta_kb=20)})]})] == ['rss_delta_kb']
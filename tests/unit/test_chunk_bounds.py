@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from audiochunker import (
+    AudioChunker, ChunkTable
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+def test_split_long_at_lowest_energy():
+    envelope = np.zeros(1000)
+    envelope[420] = -80
+    table = ChunkTable.from_bounds(np.array([0.0]), np.array([10.0]))
+    split = table.split_long(6.0, envelope, 0.01)
+
+    assert len(split) == 2
+    assert split[0].start == 0.0
+    assert split[0].end == pytest.approx(4.205)
+    assert split[1].start == split[0].end
+    assert split[1].end == 10.0
+
+def test_split_long_keeps_short_chunks():
+    table = ChunkTable.from_bounds(np.array([0.0, 5.0]), np.array([2.0, 6.0]))
+
+    assert table.split_long(3.0, np.zeros(600), 0.01) is table
+
+def test_merge_short():
+    table = ChunkTable.from_bounds(np.array([0.0, 2.0, 2.5, 6.0]), np.array([1.8, 2.3, 5.5, 9.0]))
+    merged = table.merge_short(min_duration=1.0)
+
+    assert [(row.start, row.end) for row in merged] == [(0.0, 2.3), (2.5, 5.5), (6.0, 9.0)]
+
+def test_merge_short_respects_max():
+    table = ChunkTable.from_bounds(np.array([0.0, 2.0]), np.array([1.8, 2.3]))
+
+    assert len(table.merge_short(min_duration=1.0, max_duration=2.0)) == 2
+
+def test_merge_target():
+    table = ChunkTable.from_bounds(np.array([0.0, 2.0, 4.0, 6.0]), np.array([1.8, 3.8, 5.8, 7.8]))
+    merged = table.merge_short(target_duration=4.0)
+
+    assert [(row.start, row.end) for row in merged] == [(0.0, 3.8), (4.0, 7.8)]
+
+def test_chunker_max_chunk_duration():
+    chunks = list(AudioChunker(audio_3_utterances, max_chunk_duration=1.0).chunking_segment())
+
+    assert len(chunks) > 3
+    assert all(chunk.duration <= 1.0 for chunk in chunks)
+    assert chunks[0].start == pytest.approx(0.66625)
+    assert chunks[-1].end == pytest.approx(7.906188)
+
+def test_chunker_min_chunk_duration(tmp_path):
+    chunker = AudioChunker(audio_3_utterances, min_chunk_duration=3.0, single_decode=True)
+    chunks, _ = chunker.chunking_file(str(tmp_path))
+
+    assert len(chunks) == 1
+    assert chunks[0].duration == pytest.approx(7.906188 - 0.66625)
+
+def test_chunker_invalid_bounds():
+    with pytest.raises(ValueError):
+        AudioChunker(audio_3_utterances, max_chunk_duration=1.0, min_chunk_duration=2.0)
+    with pytest.raises(ValueError):
+        AudioChunker(audio_3_utterances, max_chunk_duration=1.0, target_chunk_duration=2.0)
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pytest
+
+from audiochunker import AudioChunker, AudioFormatException, ChunkManifest, PCMAudio
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+@pytest.mark.parametrize('format', ['jsonl', 'npz'])
+def test_chunking_manifest_round_trip(tmp_path, format):
+    chunker = AudioChunker(audio_3_utterances)
+    manifest_path = str(tmp_path / f'manifest.{format}')
+    manifest = chunker.chunking_manifest(manifest_path)
+    loaded = ChunkManifest.read(manifest_path)
+
+    assert len(manifest) == 3
+    assert np.array_equal(loaded.array, manifest.array)
+    assert loaded.header() == manifest.header()
+    assert loaded.silences.to_list() == chunker.silences
+    assert not any(name.endswith('.wav') for name in os.listdir(tmp_path))
+
+def test_chunking_manifest_offsets():
+    manifest = AudioChunker(audio_3_utterances).chunking_manifest()
+    chunk_table = manifest.to_chunk_table()
+
+    assert np.array_equal(manifest.array['byte_offset'], manifest.data_offset + manifest.array['start_frame'] * manifest.frame_width)
+    assert np.array_equal(chunk_table.content_sizes, manifest.array['byte_length'])
+    assert manifest.array['end_frame'][-1] <= manifest.frame_count
+    assert chunk_table.starts.tolist() == manifest.array['start'].tolist()
+
+def test_read_chunk_matches_chunking_segment(tmp_path):
+    chunker = AudioChunker(audio_3_utterances, memory_map=True)
+    chunker.chunking_manifest(str(tmp_path / 'manifest.jsonl'))
+    manifest = ChunkManifest.read(str(tmp_path / 'manifest.jsonl'))
+
+    with manifest:
+        for index, chunk in enumerate(chunker.chunking_segment()):
+            assert manifest.read_chunk(index).data == bytes(chunk.pcm.data)
+    assert manifest.read_chunk(-1).frame_count == manifest.array['end_frame'][-1] - manifest.array['start_frame'][-1]
+    with pytest.raises(IndexError):
+        manifest.read_chunk(3)
+
+def test_read_chunk_pads_past_the_end(tmp_path):
+    # 132925 frames last 8307.8125 ms, rounded to 8308 ms: slicing pads the last chunk with 3 frames of silence.
+    path = str(tmp_path / 'short.wav')
+    PCMAudio(PCMAudio.from_wav(audio_3_utterances).data[:-6], 16000, 1, 2).write_wav(path)
+    silences = [{'start': 0.0, 'end': 0.5, 'duration': 0.5}, {'start': 8.0, 'end': 8.307812, 'duration': 0.307812}]
+    chunker = AudioChunker(path, silences=silences, memory_map=True)
+    manifest = chunker.chunking_manifest()
+    chunk = list(chunker.chunking_segment())[-1]
+
+    assert manifest.array['end_frame'][-1] == 132928 > manifest.frame_count
+    assert manifest.array['byte_length'][-1] == (132925 - manifest.array['start_frame'][-1]) * 2
+    assert manifest.read_chunk(-1).data == bytes(chunk.pcm.data)
+    assert manifest.to_chunk_table().content_sizes[-1] == chunk.content_size
+
+def test_read_chunk_with_fd():
+    manifest = AudioChunker(audio_3_utterances).chunking_manifest()
+    fd = os.open(audio_3_utterances, os.O_RDONLY)
+    try:
+        assert manifest.read_chunk(1, fd=fd).data == manifest.read_chunk(1).data
+    finally:
+        os.close(fd)
+
+def test_chunking_manifest_invalid(tmp_path):
+    with open(audio_3_utterances, 'rb') as f:
+        chunker = AudioChunker.from_bytes(f.read())
+    with pytest.raises(AudioFormatException):
+        chunker.chunking_manifest()
+
+    with pytest.raises(ValueError):
+        AudioChunker(audio_3_utterances).chunking_manifest(str(tmp_path / 'manifest.csv'))
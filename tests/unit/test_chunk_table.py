@@ -0,0 +1,74 @@
+import pickle
+
+import pytest
+
+from audiochunker import (
+    AudioChunker, BaseChunk, ChunkTable, FileChunk, PCMAudio, SegmentChunk, SilenceTable
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+silences = [
+    {'start': 0.0, 'end': 1.2, 'duration': 1.2},
+    {'start': 2.5, 'end': 3.1, 'duration': 0.6},
+    {'start': 4.75, 'end': 6.0, 'duration': 1.25},
+]
+
+
+def reference_chunk(silence_end, next_silence_start):
+    t1 = silence_end - 0.25
+    t2 = next_silence_start - silence_end + 3 * 0.25
+    return BaseChunk(start=t1, end=t2+t1, duration=t2)
+
+def test_silence_table_round_trip():
+    table = SilenceTable.from_silences(silences)
+
+    assert len(table) == 3
+    assert table.to_list() == silences
+    assert list(table.durations) == [1.2, 0.6, 1.25]
+    assert SilenceTable.from_silences(table) is table
+
+def test_chunk_table_boundaries():
+    table = ChunkTable.from_silences(silences)
+    expected = [reference_chunk(a['end'], b['start']) for a, b in zip(silences, silences[1:])]
+
+    assert len(table) == 2
+    for row, chunk in zip(table, expected):
+        assert (row.start, row.end, row.duration) == (chunk.start, chunk.end, chunk.duration)
+        assert row.start_milliseconds == chunk.start_milliseconds
+        assert row.end_milliseconds == chunk.end_milliseconds
+        assert type(row.start) is float
+
+def test_chunk_table_rows():
+    table = ChunkTable.from_silences(silences)
+    row = table[-1]
+    row.content_size = 1024
+
+    assert table.content_sizes[1] == 1024
+    assert row.to_dict() == {'content_size': 1024, 'start': row.start, 'end': row.end, 'duration': row.duration}
+    assert [chunk.start for chunk in table.to_chunks()] == list(table.starts)
+    with pytest.raises(IndexError):
+        table[2]
+
+def test_chunk_table_empty():
+    assert len(ChunkTable.from_silences([])) == 0
+    assert len(ChunkTable.from_silences(silences[:1])) == 0
+
+def test_chunking_segment_matches_table():
+    chunker = AudioChunker(audio_3_utterances)
+    table = ChunkTable.from_silences(chunker.silences)
+    chunks = list(chunker.chunking_segment())
+
+    assert len(chunks) == len(table) == 3
+    assert [(chunk.start, chunk.end, chunk.duration) for chunk in chunks] == [(row.start, row.end, row.duration) for row in table]
+
+def test_chunks_have_slots():
+    chunk = FileChunk(start=1.0, end=2.0, duration=1.0, chunk_file_path='chunk_0.wav', channel=1)
+    restored = pickle.loads(pickle.dumps(chunk))
+    segment = SegmentChunk(**chunk.to_dict(), pcm=PCMAudio(b'\x00\x00' * 10, 1000, 1, 2))
+
+    assert not hasattr(chunk, '__dict__') and not hasattr(segment, '__dict__')
+    assert (restored.chunk_file_path, restored.channel, restored.start_milliseconds) == ('chunk_0.wav', 1, 1000.0)
+    assert (segment.start, segment.channel, segment.content_size) == (1.0, 1, 20)
+    assert len(segment.audio_segment.raw_data) == 20
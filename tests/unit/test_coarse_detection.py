@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from audiochunker import (
+    AudioChunker, CoarseSilenceDetector, FFMPEGSilenceDetector, FFMPEGTools, PCMAudio, compare_silences
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+reference_silence_file = 'tests/resources/silence_reference'
+
+voice_mail = 'tests/resources/voice_mail.mp3'
+
+
+@pytest.fixture
+def broadcast(tmp_path):
+    # 48 kHz stereo: noise bursts with faded edges between silences of 0.3s to 1.2s.
+    rng = np.random.default_rng(7)
+    parts = []
+    for _ in range(12):
+        speech = int(rng.uniform(0.5, 2.0) * 48000)
+        fade = np.sin(np.linspace(0, np.pi, speech))[:, None]
+        parts.append(rng.standard_normal((speech, 2)) * 0.2 * fade)
+        parts.append(rng.standard_normal((int(rng.uniform(0.3, 1.2) * 48000), 2)) * 0.001)
+    samples = np.clip(np.concatenate(parts), -1, 1)
+    path = str(tmp_path / 'broadcast.wav')
+    PCMAudio((samples * 32767).astype('<i2').tobytes(), 48000, 2, 2).write_wav(path)
+    return path
+
+
+def test_coarse_matches_ffmpeg(broadcast):
+    report = CoarseSilenceDetector().compare(broadcast, -30, 0.5)
+
+    assert report.matched > 0
+    assert report.missed == [] and report.extra == []
+    assert report.max_deviation < 0.01
+    assert report.seconds > 0 and report.reference_seconds > 0
+    assert report.to_dict()['matched'] == report.matched
+
+@pytest.mark.parametrize('audio_path', [audio_3_utterances, voice_mail])
+def test_coarse_files(audio_path):
+    silences = CoarseSilenceDetector().detect(audio_path)
+    report = compare_silences(silences, FFMPEGSilenceDetector().detect(audio_path))
+
+    assert report.matched == len(silences) > 0
+    assert report.max_deviation < 0.01
+
+def test_coarse_chunker():
+    chunker = AudioChunker(audio_3_utterances, detector='coarse')
+    reference = FFMPEGTools.get_silences_from_file(reference_silence_file)
+
+    assert compare_silences(chunker.silences, reference).max_deviation < 0.01
+    assert len(list(chunker.chunking_segment())) == 3
+
+def test_hidden_click_is_reported():
+    # A one sample click between two decimated samples splits the silence for the exact detector only.
+    samples = np.zeros(48000 * 3, dtype='<i2')
+    samples[:48000] = samples[-24000:] = 10000
+    samples[72001] = 10000
+    audio = PCMAudio(samples.tobytes(), 48000, 1, 2)
+
+    silences = CoarseSilenceDetector().detect_pcm(audio, -30, 0.4)
+    reference = FFMPEGSilenceDetector().detect_pcm(audio, -30, 0.4)
+    report = compare_silences(silences, reference)
+
+    assert silences == [{'start': 1.0, 'end': 2.5, 'duration': 1.5}]
+    assert len(reference) == 2
+    assert (report.matched, len(report.missed), len(report.extra)) == (1, 1, 0)
+
+def test_compare_silences():
+    silences = [{'start': 1.0, 'end': 2.01, 'duration': 1.01}, {'start': 5.0, 'end': 6.0, 'duration': 1.0}]
+    reference = [{'start': 0.99, 'end': 2.0, 'duration': 1.01}, {'start': 3.0, 'end': 4.0, 'duration': 1.0}]
+    report = compare_silences(silences, reference)
+
+    assert report.matched == 1
+    assert report.missed == [reference[1]]
+    assert report.extra == [silences[1]]
+    assert report.start_deviations == pytest.approx([0.01])
+    assert report.end_deviations == pytest.approx([0.01])
+    assert report.speedup is None
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        CoarseSilenceDetector(coarse_sample_rate=0)
+    with pytest.raises(ValueError):
+        CoarseSilenceDetector(window=0)
+    with pytest.raises(ValueError):
+        compare_silences(None, [])
@@ -0,0 +1,74 @@
+import subprocess
+import wave
+
+import numpy as np
+import pytest
+
+from audiochunker import (
+    AudioChunker, AudioFormatException, PCMAudio
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+def tone(sample_rate, channels=1, frequency=440, seconds=1.0):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    samples = np.repeat((0.5 * np.sin(2 * np.pi * frequency * t))[:, None], channels, axis=1)
+    return PCMAudio(np.rint(samples * 32767).astype('<i2').tobytes(), sample_rate, channels, 2)
+
+@pytest.fixture
+def stereo_44k(tmp_path):
+    path = str(tmp_path / 'stereo_44k.wav')
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-i', audio_3_utterances, '-ar', '44100', '-ac', '2', path], check=True)
+    return path
+
+@pytest.mark.parametrize('sample_rate', [8000, 22050, 44100, 48000])
+def test_resample_tone(sample_rate):
+    converted = tone(sample_rate).convert(sample_rate=16000)
+    samples = converted.samples()[:, 0]
+    reference = 0.5 * np.sin(2 * np.pi * 440 * np.arange(len(samples)) / 16000)
+
+    assert converted.sample_rate == 16000
+    assert converted.frame_count == 16000
+    assert np.abs(samples[200:-200] - reference[200:-200]).max() < 1e-3
+
+def test_resample_removes_aliases():
+    converted = tone(44100, frequency=12000).convert(sample_rate=16000)
+
+    # 12 kHz is above the 8 kHz Nyquist frequency of the output, it would alias to 4 kHz.
+    assert np.abs(converted.samples()[200:-200]).max() < 1e-3
+
+def test_downmix_and_sample_width():
+    stereo = tone(16000, channels=2)
+    mono = stereo.convert(channels=1, sample_width=1)
+
+    assert (mono.channels, mono.sample_width, mono.frame_count) == (1, 1, 16000)
+    assert np.abs(mono.samples()[:, 0] - stereo.samples()[:, 0]).max() < 1 / 64
+    assert stereo.convert() is stereo
+    assert mono.convert(channels=2).channels == 2
+    with pytest.raises(AudioFormatException):
+        tone(16000, channels=2).convert(channels=3)
+
+def test_chunking_segment_target_format(stereo_44k):
+    chunker = AudioChunker(stereo_44k)
+    chunks = list(chunker.chunking_segment(target_sample_rate=16000, target_channels=1, target_sample_width=2))
+    reference = list(AudioChunker(stereo_44k).chunking_segment())
+
+    assert len(chunks) == len(reference)
+    for chunk, expected in zip(chunks, reference):
+        assert (chunk.pcm.sample_rate, chunk.pcm.channels, chunk.pcm.sample_width) == (16000, 1, 2)
+        assert chunk.audio_segment.frame_rate == 16000
+        assert (chunk.start, chunk.end) == pytest.approx((expected.start, expected.end), abs=1e-6)
+        assert chunk.pcm.frame_count == pytest.approx(chunk.duration * 16000, abs=2)
+
+def test_chunking_file_target_format(stereo_44k, tmp_path):
+    chunks_path = tmp_path / 'chunks'
+    chunks_path.mkdir()
+    chunker = AudioChunker(stereo_44k, single_decode=True)
+    chunks, _ = chunker.chunking_file(str(chunks_path), target_sample_rate=16000, target_channels=1)
+
+    for chunk in chunks:
+        with wave.open(chunk.chunk_file_path) as wav:
+            assert (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) == (16000, 1, 2)
+            assert wav.getnframes() * 2 == chunk.content_size
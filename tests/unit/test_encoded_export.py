@@ -0,0 +1,61 @@
+import os
+import subprocess
+
+import pytest
+
+from audiochunker import (
+    AudioChunker, FFMPEGTools, chunk_many
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+def test_flac_export_matches_wav(tmp_path):
+    chunker = AudioChunker(audio_3_utterances)
+    chunks, _ = chunker.chunking_file(str(tmp_path), format='flac')
+    segments = list(AudioChunker(audio_3_utterances).chunking_segment())
+
+    assert len(chunks) == len(segments) == 3
+    for chunk, segment in zip(chunks, segments):
+        assert chunk.chunk_file_path.endswith('.flac')
+        assert chunk.content_size == os.path.getsize(chunk.chunk_file_path)
+        assert (chunk.start, chunk.end, chunk.duration) == (segment.start, segment.end, segment.duration)
+        audio, _ = FFMPEGTools.decode_audio(chunk.chunk_file_path)
+        assert bytes(audio.data) == segment.audio_segment.raw_data
+
+def test_single_ffmpeg_run_per_batch(tmp_path, sink):
+    chunker = AudioChunker(audio_3_utterances, single_decode=True)
+    sink.clear()
+    os.makedirs(tmp_path / 'one')
+    chunker.chunking_file(str(tmp_path / 'one'), format='mp3')
+    assert sink.names.count('ffmpeg_export') == 1
+
+    sink.clear()
+    os.makedirs(tmp_path / 'batched')
+    chunks, _ = chunker.chunking_file(str(tmp_path / 'batched'), format='mp3', parameters=['-b:a', '32k'], batch_size=2)
+    assert sink.names.count('ffmpeg_export') == 2
+    assert all(chunk.content_size > 0 for chunk in chunks)
+
+@pytest.mark.parametrize('codec', ['pcm_f32le', 'pcm_alaw'])
+def test_encoded_export_non_pcm_wav(tmp_path, codec):
+    path = str(tmp_path / f'{codec}.wav')
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-i', audio_3_utterances, '-acodec', codec, path], check=True)
+    os.makedirs(tmp_path / 'chunks')
+    chunks, _ = AudioChunker(path, fingerprint=True).chunking_file(str(tmp_path / 'chunks'), format='flac')
+
+    assert len(chunks) == 3
+    assert all(chunk.content_size > 0 and chunk.fingerprint is not None for chunk in chunks)
+
+def test_encoded_export_memory_map(tmp_path):
+    chunker = AudioChunker(audio_3_utterances, memory_map=True)
+    chunks, _ = chunker.chunking_file(str(tmp_path), format='flac', workers=2, batch_size=1)
+
+    assert sorted(os.listdir(tmp_path)) == ['chunk_0.flac', 'chunk_1.flac', 'chunk_2.flac']
+    assert [chunk.chunk_file_path for chunk in chunks] == [str(tmp_path / f'chunk_{index}.flac') for index in range(3)]
+
+def test_chunk_many_format(tmp_path):
+    results = chunk_many([audio_3_utterances], str(tmp_path), format='flac')
+
+    assert results[0].ok
+    assert sorted(os.listdir(results[0].chunks_path)) == ['chunk_0.flac', 'chunk_1.flac', 'chunk_2.flac']
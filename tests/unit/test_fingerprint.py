@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from audiochunker import (
+    AudioChunker, MemorySeenStore, PCMAudio, SQLiteSeenStore
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+def test_content_hash_and_fingerprint():
+    chunks = list(AudioChunker(audio_3_utterances, single_decode=True).chunking_segment())
+    pcm = chunks[0].pcm
+    quieter = PCMAudio((pcm.array() // 2).astype('<i2').tobytes(), pcm.sample_rate, pcm.channels, pcm.sample_width)
+
+    assert pcm.content_hash() == PCMAudio(bytes(pcm.data), 16000, 1, 2).content_hash()
+    assert pcm.content_hash() != quieter.content_hash()
+    assert pcm.content_hash() != PCMAudio(bytes(pcm.data), 8000, 1, 2).content_hash()
+    assert len({chunk.pcm.fingerprint() for chunk in chunks}) == 3
+    assert quieter.fingerprint() == pcm.fingerprint()
+    assert pcm.convert(sample_rate=48000, channels=2).fingerprint() == pcm.fingerprint()
+    assert pcm.fingerprint(bands=64).startswith(f'{round(pcm.duration * 10):x}:')
+    assert PCMAudio(b'', 16000, 1, 2).fingerprint() == '0:00000000'
+
+def test_fingerprint_chunks_without_store():
+    chunks = list(AudioChunker(audio_3_utterances, fingerprint=True).chunking_segment())
+
+    pcms = [PCMAudio.from_audio_segment(chunk.audio_segment) for chunk in chunks]
+
+    assert [chunk.content_hash for chunk in chunks] == [pcm.content_hash() for pcm in pcms]
+    assert [chunk.fingerprint for chunk in chunks] == [pcm.fingerprint() for pcm in pcms]
+    assert all(chunk.duplicate_of is None for chunk in chunks)
+    assert list(AudioChunker(audio_3_utterances).chunking_segment())[0].content_hash is None
+
+def test_memory_seen_store_marks_duplicates():
+    store = MemorySeenStore()
+    first = list(AudioChunker(audio_3_utterances, seen_store=store).chunking_segment())
+    second = list(AudioChunker(audio_3_utterances, single_decode=True, seen_store=store).chunking_segment())
+
+    assert [chunk.duplicate_of for chunk in first] == [None, None, None]
+    assert [chunk.duplicate_of for chunk in second] == [f'{audio_3_utterances}@{chunk.start:.3f}' for chunk in first]
+    assert all(chunk.near_duplicate_of is None for chunk in second)
+    assert len(store) == 6
+
+def test_fingerprint_collision_is_not_a_duplicate(tmp_path, sink):
+    # One LSB of noise keeps the envelope, and the fingerprint, of distinct content.
+    audio = PCMAudio.from_wav(audio_3_utterances)
+    noise = np.random.default_rng(3).integers(-1, 2, audio.frame_count * audio.channels)
+    dithered_path = str(tmp_path / 'dithered.wav')
+    PCMAudio((audio.array().ravel() + noise).astype('<i2').tobytes(), audio.sample_rate, audio.channels,
+             audio.sample_width).write_wav(dithered_path)
+    store = MemorySeenStore()
+    first = list(AudioChunker(audio_3_utterances, single_decode=True, seen_store=store).chunking_segment())
+    second = list(AudioChunker(dithered_path, single_decode=True, seen_store=store).chunking_segment())
+
+    assert [chunk.fingerprint for chunk in second] == [chunk.fingerprint for chunk in first]
+    assert all(chunk.content_hash != other.content_hash for chunk, other in zip(second, first))
+    assert [chunk.duplicate_of for chunk in second] == [None, None, None]
+    assert [chunk.near_duplicate_of for chunk in second] == [f'{audio_3_utterances}@{chunk.start:.3f}' for chunk in first]
+    assert sink.counters['near_duplicates'] == 3 and 'duplicates' not in sink.counters
+
+def test_memory_seen_store_lru():
+    store = MemorySeenStore(max_entries=2)
+
+    assert store.check(['a', 'b'], 'first') is None
+    assert store.check(['c', 'b'], 'second') == 'first'
+    assert store.check(['a'], 'third') is None
+    assert store.check(['b'], 'fourth') is None
+    store.clear()
+    assert len(store) == 0
+
+@pytest.mark.parametrize('format', ['wav', 'flac'])
+def test_sqlite_seen_store_chunking_file(tmp_path, format):
+    chunks_path = tmp_path / 'chunks'
+    chunks_path.mkdir()
+    first, _ = AudioChunker(audio_3_utterances, seen_store=SQLiteSeenStore(str(tmp_path))).chunking_file(str(chunks_path), format=format)
+    store = SQLiteSeenStore(str(tmp_path))
+    second, _ = AudioChunker(audio_3_utterances, seen_store=store).chunking_file(str(chunks_path), format=format)
+
+    assert [chunk.duplicate_of for chunk in first] == [None, None, None]
+    assert all(chunk.duplicate_of is not None for chunk in second)
+    assert [chunk.content_hash for chunk in first] == [chunk.content_hash for chunk in second]
+    assert len(store) == 6
+    store.clear()
+    assert len(store) == 0
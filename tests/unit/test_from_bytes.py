@@ -0,0 +1,82 @@
+import io
+import os
+import subprocess
+
+import pytest
+
+from audiochunker import (
+    AudioChunker, FFMPEGTools, PCMAudio
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+def chunk_data(chunker):
+    return [(chunk.start, chunk.end, bytes(chunk.samples().tobytes())) for chunk in chunker.chunking_segment()]
+
+@pytest.fixture
+def flac_path(tmp_path):
+    path = str(tmp_path / 'audio_3_utterances.flac')
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-i', audio_3_utterances, path], check=True)
+    return path
+
+def test_from_bytes_wav():
+    with open(audio_3_utterances, 'rb') as f:
+        data = f.read()
+    chunker = AudioChunker.from_bytes(data)
+
+    assert chunker.input_file_path is None
+    assert chunker.silences == AudioChunker(audio_3_utterances).silences
+    assert chunk_data(chunker) == chunk_data(AudioChunker(audio_3_utterances))
+
+def test_from_bytes_numpy_detector():
+    with open(audio_3_utterances, 'rb') as f:
+        chunker = AudioChunker.from_bytes(f.read(), detector='numpy')
+
+    assert chunk_data(chunker) == chunk_data(AudioChunker(audio_3_utterances, detector='numpy'))
+
+def test_from_bytes_flac(flac_path):
+    with open(flac_path, 'rb') as f:
+        chunker = AudioChunker.from_bytes(f.read())
+
+    assert chunk_data(chunker) == chunk_data(AudioChunker(audio_3_utterances))
+
+def test_from_fileobj(flac_path):
+    with open(flac_path, 'rb') as f:
+        chunker = AudioChunker.from_fileobj(f)
+    with open(audio_3_utterances, 'rb') as f:
+        buffered = AudioChunker.from_fileobj(io.BytesIO(f.read()))
+
+    reference = chunk_data(AudioChunker(audio_3_utterances))
+    assert chunk_data(chunker) == reference
+    assert chunk_data(buffered) == reference
+
+def test_decode_seeked_fileobj(flac_path):
+    with open(flac_path, 'rb') as f:
+        fileobj = io.BytesIO(b'JUNK' + f.read())
+    fileobj.seek(4)
+    audio, _ = FFMPEGTools.decode_fileobj(fileobj)
+
+    assert bytes(audio.data) == bytes(PCMAudio.from_wav(audio_3_utterances).data)
+
+def test_from_bytes_chunking_file(tmp_path):
+    with open(audio_3_utterances, 'rb') as f:
+        chunker = AudioChunker.from_bytes(f.read(), max_chunk_duration=2.0)
+    chunks, _ = chunker.chunking_file(str(tmp_path))
+
+    assert len(chunks) == 4
+    assert all(os.path.getsize(chunk.chunk_file_path) == chunk.content_size + 44 for chunk in chunks)
+
+def test_decode_bytes_is_zero_copy(flac_path):
+    with open(flac_path, 'rb') as f:
+        audio, _ = FFMPEGTools.decode_bytes(f.read())
+
+    assert isinstance(audio.data, memoryview)
+    assert bytes(audio.data) == bytes(PCMAudio.from_wav(audio_3_utterances).data)
+
+def test_from_bytes_invalid():
+    with pytest.raises(ValueError):
+        AudioChunker.from_bytes(None)
+    with pytest.raises(ValueError):
+        AudioChunker(None)
@@ -0,0 +1,108 @@
+import json
+import struct
+
+import pytest
+
+from audiochunker import (
+    AudioChunker, AudioFormatException, IncrementalChunker, PCMAudio
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+def start_recording(path):
+    # Header of a WAV file still being written: placeholder sizes.
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 0xFFFFFFFF, b'WAVE', b'fmt ', 16, 1, 1, 16000, 32000, 2, 16, b'data', 0xFFFFFFFF))
+
+def append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+def reference_chunks():
+    return list(AudioChunker(audio_3_utterances, detector='numpy', single_decode=True).chunking_segment())
+
+@pytest.mark.parametrize('block_frames', [1000, 16000, 40000])
+def test_incremental_matches_whole_file(tmp_path, block_frames):
+    path = str(tmp_path / 'recording.wav')
+    data = PCMAudio.from_wav(audio_3_utterances).data
+    start_recording(path)
+    chunker = IncrementalChunker(path)
+
+    chunks = []
+    for offset in range(0, len(data), block_frames * 2):
+        append(path, data[offset:offset + block_frames * 2])
+        chunks.extend(chunker.update())
+    chunks.extend(chunker.update(final=True))
+    reference = reference_chunks()
+
+    assert len(chunks) == len(reference) == 3
+    for chunk, expected in zip(chunks, reference):
+        assert (chunk.start, chunk.end, chunk.duration) == (expected.start, expected.end, expected.duration)
+        assert chunk.pcm.data == bytes(expected.pcm.data)
+    assert chunker.silences == AudioChunker(audio_3_utterances, detector='numpy').silences
+    assert chunker.update() == []
+
+def test_incremental_patched_data_size(tmp_path):
+    # A writer that patches the data size after every block.
+    path = str(tmp_path / 'recording.wav')
+    data = PCMAudio.from_wav(audio_3_utterances).data
+    start_recording(path)
+    chunker = IncrementalChunker(path)
+
+    chunks = []
+    block_bytes = 32000
+    for offset in range(0, len(data), block_bytes):
+        append(path, data[offset:offset + block_bytes])
+        with open(path, 'r+b') as f:
+            f.seek(40)
+            f.write(struct.pack('<I', min(offset + block_bytes, len(data))))
+        chunks.extend(chunker.update())
+    streamed = len(chunks)
+    chunks.extend(chunker.update(final=True))
+
+    assert streamed == 3
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(chunk.start, chunk.end) for chunk in reference_chunks()]
+
+def test_incremental_resumes_from_state(tmp_path):
+    path = str(tmp_path / 'recording.wav')
+    state_path = str(tmp_path / 'state.json')
+    data = PCMAudio.from_wav(audio_3_utterances).data
+    start_recording(path)
+
+    chunks = []
+    for offset in range(0, len(data), 32000):
+        append(path, data[offset:offset + 32000])
+        chunks.extend(IncrementalChunker(path, state_path=state_path).update())
+        with open(state_path) as f:
+            state = json.load(f)
+        assert state['analysed_frames'] <= (offset + 32000) // 2
+        assert len(state['chunks']) == len(chunks)
+
+    chunks.extend(IncrementalChunker(path, state_path=state_path).update(final=True))
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(chunk.start, chunk.end) for chunk in reference_chunks()]
+    assert len(IncrementalChunker(path, state_path=state_path).chunks) == 3
+
+def test_incremental_empty_and_invalid(tmp_path):
+    path = str(tmp_path / 'recording.wav')
+    state_path = str(tmp_path / 'state.json')
+    open(path, 'wb').close()
+    chunker = IncrementalChunker(path, state_path=state_path)
+
+    assert chunker.update() == []
+    assert chunker.state['format'] is None
+
+    start_recording(path)
+    append(path, b'\x00' * 32000)
+    chunker.update()
+    with pytest.raises(ValueError):
+        IncrementalChunker(path, silence_threshold=-40, state_path=state_path)
+
+    open(path, 'wb').close()
+    start_recording(path)
+    with pytest.raises(AudioFormatException):
+        chunker.update()
+
+    with pytest.raises(FileNotFoundError):
+        IncrementalChunker(str(tmp_path / 'missing.wav'))
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+
+from audiochunker import (
+    AudioChunker, PCMAudio
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_memory_mapped_wav():
+    audio = PCMAudio.from_wav(audio_3_utterances, memory_map=True)
+
+    assert isinstance(audio.data, memoryview)
+    assert bytes(audio.data) == PCMAudio.from_wav(audio_3_utterances).data
+    view = audio.array()
+    assert view.shape == (132928, 1)
+    assert not view.flags.owndata
+    del view
+    audio.close()
+
+@pytest.mark.parametrize('start,end', [(0, 1000), (250.5, 1999.9), (8000, 9000), (0, 8308)])
+def test_slice_matches_audio_segment(start, end):
+    audio = PCMAudio.from_wav(audio_3_utterances, memory_map=True)
+    audio_segment = AudioSegment.from_wav(audio_3_utterances)
+
+    assert bytes(audio.slice(start, end).data) == audio_segment[start:end].raw_data
+
+@pytest.mark.parametrize('sample_width,channels', [(1, 1), (2, 2), (4, 1)])
+def test_write_wav_matches_export(tmp_path, sample_width, channels):
+    audio_segment = AudioSegment.from_wav(audio_3_utterances).set_sample_width(sample_width).set_channels(channels)
+    source_path = str(tmp_path / 'source.wav')
+    audio_segment.export(source_path, format='wav')
+
+    exported_path = str(tmp_path / 'exported.wav')
+    written_path = str(tmp_path / 'written.wav')
+    audio_segment[100:2100].export(exported_path, format='wav')
+    PCMAudio.from_wav(source_path, memory_map=True).slice(100, 2100).write_wav(written_path)
+
+    assert read(written_path) == read(exported_path)
+
+def test_memory_map_chunking_segment():
+    chunker = AudioChunker(audio_3_utterances, memory_map=True)
+    expected = list(AudioChunker(audio_3_utterances).chunking_segment())
+    chunks = list(chunker.chunking_segment())
+
+    assert len(chunks) == len(expected) == 3
+    for chunk, reference in zip(chunks, expected):
+        assert isinstance(chunk.pcm.data, memoryview)
+        assert chunk.content_size == reference.content_size
+        assert np.array_equal(chunk.samples(), reference.samples())
+        assert chunk.audio_segment.raw_data == reference.audio_segment.raw_data
+
+def test_memory_map_chunking_file(tmp_path):
+    default_path = tmp_path / 'default'
+    mapped_path = tmp_path / 'mapped'
+    default_path.mkdir()
+    mapped_path.mkdir()
+
+    expected, _ = AudioChunker(audio_3_utterances).chunking_file(chunks_path=str(default_path))
+    chunks, silences = AudioChunker(audio_3_utterances, memory_map=True).chunking_file(chunks_path=str(mapped_path))
+
+    assert len(silences) == 4
+    assert len(chunks) == len(expected)
+    for chunk, reference in zip(chunks, expected):
+        assert os.path.exists(chunk.chunk_file_path)
+        assert chunk.content_size == reference.content_size
+        assert read(chunk.chunk_file_path) == read(reference.chunk_file_path)
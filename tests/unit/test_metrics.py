@@ -0,0 +1,80 @@
+import logging
+import os
+
+from audiochunker import (
+    AudioChunker, FFMPEGTools, LoggingMetricsSink, PrometheusMetricsSink, get_metrics_sink,
+    measure_stage, set_metrics_sink
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+def test_default_sink():
+    assert isinstance(get_metrics_sink(), LoggingMetricsSink)
+
+def test_ffmpeg_stage_usage(sink):
+    FFMPEGTools.get_silences_from_content(FFMPEGTools.create_silence_content(audio_3_utterances, -30, 0.5))
+    names = [name for name, _, _ in sink.stages]
+
+    assert names == ['ffmpeg_silencedetect', 'parse_silences']
+    _, seconds, usage = sink.stages[0]
+    assert seconds > 0
+    assert usage['cpu_seconds'] > 0
+    assert usage['max_rss_bytes'] > 0
+    assert sink.stages[1][2] is None
+
+def test_ffmpeg_stage_usage_without_wait4(sink, monkeypatch):
+    # Without the os.wait4 reaping the usage is the RUSAGE_CHILDREN delta.
+    monkeypatch.delattr(os, 'wait4')
+    FFMPEGTools.get_silences_from_content(FFMPEGTools.create_silence_content(audio_3_utterances, -30, 0.5))
+
+    _, _, usage = sink.stages[0]
+    assert usage['cpu_seconds'] > 0
+    assert usage['max_rss_bytes'] > 0
+
+def test_chunking_file_counters(sink, tmp_path):
+    chunker = AudioChunker(audio_3_utterances)
+    chunks, silences = chunker.chunking_file(str(tmp_path))
+
+    assert sink.counters['silences_found'] == len(silences) == 4
+    assert sink.counters['chunks'] == 3
+    assert sink.counters['bytes_written'] == sum(chunk.content_size for chunk in chunks)
+    assert {'ffmpeg_silencedetect', 'parse_silences', 'wav_load', 'export'} <= {name for name, _, _ in sink.stages}
+
+def test_chunking_segment_slice_stage(sink):
+    chunker = AudioChunker(audio_3_utterances, single_decode=True)
+    chunks = list(chunker.chunking_segment())
+
+    assert [name for name, _, _ in sink.stages][-1] == 'slice'
+    assert sink.counters['chunks'] == len(chunks)
+    assert 'ffmpeg_silencedetect' in sink.names
+
+def test_prometheus_sink(tmp_path):
+    sink = PrometheusMetricsSink()
+    sink.stage('export', 0.5)
+    sink.stage('export', 0.25)
+    sink.stage('ffmpeg_decode', 1.0, {'cpu_seconds': 0.75, 'max_rss_bytes': 2048})
+    sink.count('chunks', 3)
+    text = sink.render()
+
+    assert 'audiochunker_stage_seconds_sum{stage="export"} 0.75' in text
+    assert 'audiochunker_stage_seconds_count{stage="export"} 2' in text
+    assert 'audiochunker_child_cpu_seconds_total{stage="ffmpeg_decode"} 0.75' in text
+    assert 'audiochunker_child_max_rss_bytes{stage="ffmpeg_decode"} 2048' in text
+    assert 'audiochunker_chunks_total 3' in text
+
+    path = tmp_path / 'audiochunker.prom'
+    sink.write(str(path))
+    assert path.read_text() == text
+
+def test_logging_sink(caplog):
+    previous = set_metrics_sink(LoggingMetricsSink(logging.INFO))
+    try:
+        with caplog.at_level(logging.INFO, logger='audiochunker'):
+            with measure_stage('custom'):
+                pass
+    finally:
+        set_metrics_sink(previous)
+
+    assert 'stage:custom' in caplog.text
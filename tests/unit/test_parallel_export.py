@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pydub import AudioSegment
+
+from audiochunker import (
+    AudioChunker
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_direct_writer_matches_export(tmp_path):
+    chunker = AudioChunker(audio_3_utterances)
+    chunks, _ = chunker.chunking_file(chunks_path=str(tmp_path))
+    audio_segment = AudioSegment.from_wav(audio_3_utterances)
+
+    for chunk in chunks:
+        exported_path = str(tmp_path / 'exported.wav')
+        audio_segment[chunk.start_milliseconds:chunk.end_milliseconds].export(exported_path, format='wav')
+        assert read(chunk.chunk_file_path) == read(exported_path)
+
+@pytest.mark.parametrize('single_decode', [False, True])
+def test_parallel_export_keeps_order(tmp_path, single_decode):
+    serial_path = tmp_path / 'serial'
+    parallel_path = tmp_path / 'parallel'
+    serial_path.mkdir()
+    parallel_path.mkdir()
+
+    expected, _ = AudioChunker(audio_3_utterances).chunking_file(chunks_path=str(serial_path))
+    chunks, silences = AudioChunker(audio_3_utterances, single_decode=single_decode).chunking_file(
+        chunks_path=str(parallel_path), workers=4)
+
+    assert len(silences) == 4
+    assert [chunk.start for chunk in chunks] == [chunk.start for chunk in expected]
+    assert [chunk.chunk_file_path.endswith(f'chunk_{i}.wav') for i, chunk in enumerate(chunks)] == [True] * 3
+    assert [read(chunk.chunk_file_path) for chunk in chunks] == [read(chunk.chunk_file_path) for chunk in expected]
+
+def test_export_with_executor(tmp_path):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        chunks, _ = AudioChunker(audio_3_utterances).chunking_file(chunks_path=str(tmp_path), executor=executor)
+
+    assert len(chunks) == 3
+    assert all(chunk.content_size > 0 for chunk in chunks)
+
+def test_invalid_workers(tmp_path):
+    with pytest.raises(ValueError):
+        AudioChunker(audio_3_utterances).chunking_file(chunks_path=str(tmp_path), workers=0)
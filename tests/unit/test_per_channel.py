@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pytest
+
+from audiochunker import (
+    AudioChunker, FFMPEGTools, NumpySilenceDetector, PCMAudio
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+@pytest.fixture
+def stereo_call(tmp_path):
+    # Channel 1 is channel 0 delayed by 1.5 seconds: the speakers alternate.
+    mono = PCMAudio.from_wav(audio_3_utterances).array()[:, 0]
+    delayed = np.concatenate((np.zeros(24000, dtype=mono.dtype), mono[:-24000]))
+    path = str(tmp_path / 'call.wav')
+    PCMAudio(np.stack((mono, delayed), axis=1).tobytes(), 16000, 2, 2).write_wav(path)
+    return path
+
+@pytest.mark.parametrize('detector', ['ffmpeg', 'numpy'])
+def test_per_channel_silences(stereo_call, detector):
+    chunker = AudioChunker(stereo_call, detector=detector, per_channel=True)
+
+    assert len(chunker.silences) == 2
+    assert chunker.silences[0] == AudioChunker(audio_3_utterances, detector=detector).silences
+    assert [silence['start'] for silence in chunker.silences[1][1:]] == \
+        pytest.approx([silence['start'] + 1.5 for silence in chunker.silences[0][1:-1]], abs=0.011)
+
+def test_per_channel_single_ffmpeg_run(stereo_call, sink):
+    AudioChunker(stereo_call, per_channel=True)
+
+    assert [name for name in sink.names if name.startswith('ffmpeg')] == ['ffmpeg_silencedetect']
+
+def test_per_channel_chunking_segment(stereo_call):
+    chunks = list(AudioChunker(stereo_call, per_channel=True).chunking_segment())
+    reference = list(AudioChunker(audio_3_utterances, single_decode=True).chunking_segment())
+
+    assert [chunk.channel for chunk in chunks] == [0, 1, 0, 1, 0]
+    assert [chunk.start for chunk in chunks] == sorted(chunk.start for chunk in chunks)
+    assert all(chunk.pcm.channels == 1 for chunk in chunks)
+    for chunk, expected in zip([chunk for chunk in chunks if chunk.channel == 0], reference):
+        assert (chunk.start, chunk.end) == (expected.start, expected.end)
+        assert bytes(chunk.pcm.data) == bytes(expected.pcm.data)
+
+@pytest.mark.parametrize('format', ['wav', 'flac'])
+def test_per_channel_chunking_file(stereo_call, tmp_path, format):
+    chunks_path = tmp_path / 'chunks'
+    chunks_path.mkdir()
+    chunks, silences = AudioChunker(stereo_call, per_channel=True).chunking_file(str(chunks_path), format=format)
+
+    assert len(silences) == 2
+    assert [chunk.channel for chunk in chunks] == [0, 1, 0, 1, 0]
+    for index, chunk in enumerate(chunks):
+        assert os.path.basename(chunk.chunk_file_path) == f'chunk_{index}.{format}'
+        assert PCMAudio.from_file(chunk.chunk_file_path).channels == 1
+
+def test_channel_envelope():
+    audio = PCMAudio.from_wav(audio_3_utterances)
+    stereo = PCMAudio((np.repeat(audio.array(), 2, axis=1) // [1, 4]).astype('<i2').tobytes(), 16000, 2, 2)
+    detector = NumpySilenceDetector()
+    envelopes = detector.pcm_envelope(stereo, per_channel=True)
+
+    assert envelopes.shape == (len(detector.pcm_envelope(audio)), 2)
+    assert np.allclose(envelopes.max(axis=1), detector.pcm_envelope(stereo))
+    assert stereo.channel(1).data == (audio.array() // 4).astype('<i2').tobytes()
+
+def test_silences_per_channel_content():
+    content = '\n'.join([
+        '[silencedetect @ 0x1] channel: 0 | silence_start: 0',
+        '[silencedetect @ 0x1] channel: 1 | silence_start: 0.5',
+        '[silencedetect @ 0x1] channel: 0 | silence_end: 1 | silence_duration: 1',
+        '[silencedetect @ 0x1] channel: 1 | silence_end: 2 | silence_duration: 1.5',
+    ])
+
+    assert FFMPEGTools.get_silences_per_channel(content, 3) == [
+        [{'start': 0.0, 'end': 1.0, 'duration': 1.0}], [{'start': 0.5, 'end': 2.0, 'duration': 1.5}], []]
+
+def test_per_channel_invalid(stereo_call):
+    chunker = AudioChunker(stereo_call, per_channel=True)
+
+    with pytest.raises(ValueError):
+        list(chunker.chunking_segment(target_channels=1))
+    with pytest.raises(ValueError):
+        list(chunker.chunking_segment(shared_memory=True))
+    with pytest.raises(ValueError):
+        chunker.chunking_manifest()
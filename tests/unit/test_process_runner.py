@@ -0,0 +1,146 @@
+import asyncio
+import os
+import subprocess
+import threading
+import time
+
+import pytest
+
+from audiochunker import (
+    AsyncFFMPEGTools, AudioChunker, FFMPEGTools, FFPROBEException, ProcessRunner, chunk_many, get_process_runner, set_process_runner
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+@pytest.fixture
+def runner(request):
+    runner = ProcessRunner(**getattr(request, 'param', {}))
+    previous = set_process_runner(runner)
+    yield runner
+    set_process_runner(previous)
+
+def is_running(pid, wait=2.0):
+    # SIGKILL delivery to the orphaned grandchild is asynchronous, give it a moment.
+    deadline = time.perf_counter() + wait
+    while True:
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                running = f.read().split(')')[1].split()[0] != 'Z'
+        except FileNotFoundError:
+            running = False
+        if not running or time.perf_counter() > deadline:
+            return running
+        time.sleep(0.01)
+
+def test_default_runner():
+    runner = get_process_runner()
+
+    assert (runner.max_processes, runner.timeout, runner.threads, runner.nice) == (None, None, None, None)
+    assert runner.command(['ffmpeg', '-i', 'x']) == ['ffmpeg', '-i', 'x']
+    with pytest.raises(ValueError):
+        ProcessRunner(max_processes=0)
+
+@pytest.mark.parametrize('runner', [{'threads': 1, 'nice': 5}], indirect=True)
+def test_threads_and_stats(runner):
+    chunker = AudioChunker(audio_3_utterances, single_decode=True)
+    stats = runner.stats()
+
+    assert runner.command(['ffmpeg', '-y', '-i', 'in.wav', '-map', '[o0]', '-b:a', '32k', 'a.mp3', '-map', '[o1]', 'b.mp3']) == [
+        'ffmpeg', '-filter_threads', '1', '-filter_complex_threads', '1', '-y', '-threads', '1', '-i', 'in.wav',
+        '-map', '[o0]', '-b:a', '32k', '-threads', '1', 'a.mp3', '-map', '[o1]', '-threads', '1', 'b.mp3']
+    assert runner.command(['ffmpeg', '-i', 'x', '-f', 'null', '-'])[-3:] == ['-threads', '1', '-']
+    assert runner.command(['ffprobe', 'x']) == ['ffprobe', 'x']
+    assert len(chunker.silences) == 4
+    assert stats['ffmpeg_silencedetect']['runs'] == 1
+    assert stats['ffmpeg_silencedetect']['run_seconds'] > 0
+    runner.reset_stats()
+    assert runner.stats() == {}
+
+@pytest.mark.parametrize('runner', [{'nice': 5}], indirect=True)
+def test_nice_at_spawn(runner):
+    process = runner.popen(['nice'], stdout=subprocess.PIPE)
+    output, _ = process.communicate()
+
+    assert int(output) == min(os.nice(0) + 5, 19)
+
+def test_wait_reaps_with_usage(runner):
+    process = runner.popen(['sleep', '30'])
+    with pytest.raises(subprocess.TimeoutExpired):
+        process.wait(timeout=0.05)
+    process.kill()
+
+    assert process.wait() == -9
+    assert process.rusage is not None
+    process = runner.popen(['sh', '-c', 'exit 3'])
+    assert process.wait(timeout=5) == 3
+    assert process.rusage.ru_maxrss > 0
+
+@pytest.mark.parametrize('runner', [{'max_processes': 1}], indirect=True)
+def test_max_processes(runner):
+    threads = [threading.Thread(target=FFMPEGTools.create_silence_content, args=(audio_3_utterances,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = runner.stats()['ffmpeg_silencedetect']
+
+    assert stats['runs'] == 4
+    # One process at a time: the later calls waited for the earlier ones.
+    assert stats['queue_seconds'] >= stats['run_seconds'] * 0.9
+
+@pytest.mark.parametrize('runner', [{'timeout': 0.5}], indirect=True)
+def test_timeout_kills_process_group(runner, tmp_path, monkeypatch):
+    pid_path = tmp_path / 'pid'
+    command = ['sh', '-c', f'sleep 30 & echo $! > {pid_path}; wait']
+    monkeypatch.setattr(FFMPEGTools, 'ffprobe_info_command', command)
+
+    started = time.perf_counter()
+    with pytest.raises(FFPROBEException, match='timed out'):
+        FFMPEGTools.get_audio_information(audio_3_utterances, probe=False)
+
+    assert time.perf_counter() - started < 5
+    assert not is_running(int(pid_path.read_text()))
+    assert runner.stats()['ffprobe_info']['timeouts'] == 1
+
+@pytest.mark.parametrize('runner', [{'timeout': 0.5, 'max_processes': 1}], indirect=True)
+def test_async_timeout(runner):
+    async def run():
+        return await AsyncFFMPEGTools.run(['sleep', '30'], stage='sleep')
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(run())
+    assert runner.stats()['sleep']['runs'] == 1
+    assert asyncio.run(AsyncFFMPEGTools.run(['true']))[0] == 0
+
+@pytest.mark.parametrize('runner', [{'max_processes': 1}], indirect=True)
+def test_async_queue(runner):
+    async def run():
+        first = asyncio.ensure_future(AsyncFFMPEGTools.run(['sleep', '0.2'], stage='sleep'))
+        await asyncio.sleep(0.05)
+        # Cancelled while waiting for the slot: the slot goes to the next waiter.
+        cancelled = asyncio.ensure_future(AsyncFFMPEGTools.run(['sleep', '0.2'], stage='sleep'))
+        await asyncio.sleep(0.05)
+        cancelled.cancel()
+        results = await asyncio.gather(first, *(AsyncFFMPEGTools.run(['true'], stage='true') for _ in range(3)))
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return results
+
+    assert [result[0] for result in asyncio.run(run())] == [0, 0, 0, 0]
+    assert runner.stats()['true']['runs'] == 3
+    assert runner.stats()['true']['max_queue_seconds'] > 0.05
+    # The slot is free again for blocking callers.
+    assert len(FFMPEGTools.get_silences_from_content(FFMPEGTools.create_silence_content(audio_3_utterances))) == 4
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_chunk_many_runner(tmp_path, jobs):
+    previous = get_process_runner()
+    results = chunk_many([audio_3_utterances, audio_3_utterances], str(tmp_path), jobs=jobs,
+                         runner=ProcessRunner(timeout=60, threads=1, nice=1))
+
+    assert [result.ok for result in results] == [True, True]
+    assert all(len(result.chunks) == 3 for result in results)
+    assert get_process_runner() is previous
@@ -0,0 +1,64 @@
+import subprocess
+
+import pytest
+
+from audiochunker import (
+    AudioChunker, FFMPEGSilenceDetector, FFMPEGTools, PCMAudio
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+@pytest.fixture
+def long_audio(tmp_path):
+    audio = PCMAudio.from_wav(audio_3_utterances)
+    long_path = str(tmp_path / 'long.wav')
+    PCMAudio(audio.data * 6, audio.sample_rate, audio.channels, audio.sample_width).write_wav(long_path)
+    return long_path
+
+
+def assert_same_silences(silences, reference):
+    assert len(silences) == len(reference)
+    for silence, expected in zip(silences, reference):
+        assert silence['start'] == pytest.approx(expected['start'], abs=1e-4)
+        assert silence['end'] == pytest.approx(expected['end'], abs=1e-4)
+        assert silence['duration'] == pytest.approx(expected['duration'], abs=1e-4)
+
+
+def test_audio_duration():
+    assert FFMPEGTools.get_audio_duration(audio_3_utterances) == 132928 / 16000
+
+@pytest.mark.parametrize('shards', [2, 3, 5, 11])
+def test_sharded_matches_single_pass(long_audio, shards):
+    reference = FFMPEGTools.get_silences_from_content(FFMPEGTools.create_silence_content(long_audio))
+    silences = FFMPEGTools.create_silences_sharded(long_audio, shards=shards)
+
+    assert_same_silences(silences, reference)
+
+def test_sharded_compressed_file_single_pass(long_audio, tmp_path, sink):
+    # Input seeking in mp3 is not sample exact, the file is analysed in one ffmpeg pass.
+    long_mp3 = str(tmp_path / 'long.mp3')
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-i', long_audio, long_mp3], check=True)
+    reference = FFMPEGTools.get_silences_from_content(FFMPEGTools.create_silence_content(long_mp3))
+    sink.clear()
+    silences = FFMPEGTools.create_silences_sharded(long_mp3, shards=4)
+
+    assert sink.names.count('ffmpeg_silencedetect') == 1
+    assert_same_silences(silences, reference)
+
+def test_chunker_with_shards(long_audio):
+    reference = AudioChunker(long_audio)
+    chunker = AudioChunker(long_audio, shards=4)
+
+    assert isinstance(chunker.detector, FFMPEGSilenceDetector)
+    assert chunker.detector.shards == 4
+    assert_same_silences(chunker.silences, reference.silences)
+
+def test_shards_with_numpy_detector():
+    with pytest.raises(ValueError):
+        AudioChunker(audio_3_utterances, detector='numpy', shards=2)
+
+def test_invalid_shards():
+    with pytest.raises(ValueError):
+        FFMPEGTools.create_silences_sharded(audio_3_utterances, shards=0)
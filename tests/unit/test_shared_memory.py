@@ -0,0 +1,105 @@
+import os
+import pickle
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from audiochunker import (
+    AudioChunker, PCMAudio, SegmentChunk, SharedPCM, SharedPCMBlock
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+# Workers keep their chunk views alive until exit without calling SharedPCM.detach_all.
+kept_views_script = f'''
+from concurrent.futures import ProcessPoolExecutor
+from audiochunker import AudioChunker
+
+kept = []
+
+def keep(chunk):
+    kept.append(chunk.pcm)
+    return len(chunk.pcm.data)
+
+if __name__ == '__main__':
+    chunker = AudioChunker('{audio_3_utterances}', single_decode=True)
+    chunks = list(chunker.chunking_segment(shared_memory=True))
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        print(sum(pool.map(keep, chunks)))
+    chunker.release_shared_memory()
+'''
+
+
+def chunk_bytes(chunk: SegmentChunk) -> bytes:
+    return bytes(chunk.pcm.data)
+
+def test_shared_chunks_pickle_handle_only():
+    chunker = AudioChunker(audio_3_utterances, single_decode=True)
+    try:
+        chunks = list(chunker.chunking_segment(shared_memory=True))
+        reference = list(AudioChunker(audio_3_utterances, single_decode=True).chunking_segment())
+
+        assert chunker.shared_block.size == len(chunker.audio.data)
+        for chunk, expected in zip(chunks, reference):
+            assert isinstance(chunk.shared, SharedPCM)
+            assert chunk.shared.name == chunker.shared_block.name
+            payload = pickle.dumps(chunk)
+            assert len(payload) < 2048 < chunk.content_size
+            restored = pickle.loads(payload)
+            assert bytes(restored.pcm.data) == bytes(expected.pcm.data)
+            assert (restored.start, restored.end) == (expected.start, expected.end)
+    finally:
+        chunker.release_shared_memory()
+        SharedPCM.detach_all()
+
+    assert chunker.shared_block is None
+
+def test_shared_chunks_in_worker_processes():
+    chunker = AudioChunker(audio_3_utterances)
+    try:
+        chunks = list(chunker.chunking_segment(shared_memory=True))
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            assert list(pool.map(chunk_bytes, chunks)) == [bytes(chunk.pcm.data) for chunk in chunks]
+    finally:
+        chunker.release_shared_memory()
+
+def test_shared_block_reused_and_replaced():
+    chunker = AudioChunker(audio_3_utterances, single_decode=True)
+    list(chunker.chunking_segment(shared_memory=True))
+    name = chunker.shared_block.name
+    list(chunker.chunking_segment(shared_memory=True))
+    assert chunker.shared_block.name == name
+
+    chunks = list(chunker.chunking_segment(target_sample_rate=8000, shared_memory=True))
+    assert chunker.shared_block.name != name
+    assert not os.path.exists(f'/dev/shm/{name.lstrip("/")}')
+    assert chunks[0].shared.sample_rate == 8000
+    chunker.release_shared_memory()
+
+def test_shared_block_padding_and_lifecycle():
+    audio = PCMAudio(b'\x01\x00' * 1000, 1000, 1, 2)
+    with SharedPCMBlock(audio) as block:
+        pcm, handle = block.slice(250, 1200)
+        attached = pickle.loads(pickle.dumps(handle)).attach()
+
+        assert (handle.offset, handle.length, handle.pad_frames) == (500, 1500, 0)
+        assert bytes(attached.data) == bytes(audio.slice(250, 1200).data) == bytes(pcm.data)
+        assert SharedPCM(block.name, 0, 4, 1000, 1, 2, pad_frames=2).attach().data == b'\x01\x00\x01\x00' + b'\x00' * 4
+        del attached
+        SharedPCM.detach_all()
+        name = block.name
+
+    with pytest.raises(FileNotFoundError):
+        SharedPCM(name, 0, 2, 1000, 1, 2).attach()
+
+def test_shared_views_kept_until_exit(tmp_path):
+    script = tmp_path / 'kept_views.py'
+    script.write_text(kept_views_script)
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    result = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, env=env, check=True)
+
+    assert int(result.stdout) > 0
+    assert 'BufferError' not in result.stderr
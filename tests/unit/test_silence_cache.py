@@ -0,0 +1,90 @@
+import shutil
+
+import pytest
+
+from audiochunker import (
+    AudioChunker, FFMPEGSilenceDetector, NumpySilenceDetector, SilenceCache
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+class CountingDetector(FFMPEGSilenceDetector):
+    def __init__(self):
+        self.calls = 0
+
+    def detect(self, audio_path, silence_threshold=-30, silence_duration=0.5):
+        self.calls += 1
+        return super().detect(audio_path, silence_threshold, silence_duration)
+
+
+def test_cache_hit_and_miss(tmp_path):
+    cache = SilenceCache(str(tmp_path))
+    key = cache.make_key(audio_3_utterances, FFMPEGSilenceDetector(), -30, 0.5)
+
+    assert cache.get(key) is None
+    cache.put(key, [{'start': 0.0, 'end': 1.0, 'duration': 1.0}])
+    assert cache.get(key) == [{'start': 0.0, 'end': 1.0, 'duration': 1.0}]
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1, 'bytes': 45}
+
+def test_cache_key_parameters(tmp_path):
+    cache = SilenceCache(str(tmp_path))
+    key = cache.make_key(audio_3_utterances, FFMPEGSilenceDetector(), -30, 0.5)
+
+    assert key == cache.make_key(audio_3_utterances, FFMPEGSilenceDetector(), -30.0, 0.5)
+    assert key != cache.make_key(audio_3_utterances, FFMPEGSilenceDetector(), -35, 0.5)
+    assert key != cache.make_key(audio_3_utterances, FFMPEGSilenceDetector(), -30, 0.7)
+    assert key != cache.make_key(audio_3_utterances, NumpySilenceDetector(), -30, 0.5)
+    assert cache.make_key(audio_3_utterances, NumpySilenceDetector(), -30, 0.5) != cache.make_key(
+        audio_3_utterances, NumpySilenceDetector(measure='rms'), -30, 0.5)
+
+def test_cache_content_key(tmp_path):
+    copy_path = str(tmp_path / 'copy.wav')
+    shutil.copy(audio_3_utterances, copy_path)
+
+    stat_cache = SilenceCache(str(tmp_path))
+    content_cache = SilenceCache(str(tmp_path), key_mode='content')
+    detector = FFMPEGSilenceDetector()
+
+    assert stat_cache.make_key(audio_3_utterances, detector, -30, 0.5) != stat_cache.make_key(copy_path, detector, -30, 0.5)
+    assert content_cache.make_key(audio_3_utterances, detector, -30, 0.5) == content_cache.make_key(copy_path, detector, -30, 0.5)
+
+def test_cache_eviction(tmp_path):
+    cache = SilenceCache(str(tmp_path), max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, [])
+        if key == 'b':
+            cache.get('a')
+
+    assert cache.get('a') == []
+    assert cache.get('b') is None
+    assert cache.get('c') == []
+
+def test_cache_size_eviction(tmp_path):
+    cache = SilenceCache(str(tmp_path), max_bytes=100)
+    silences = [{'start': 0.0, 'end': 1.0, 'duration': 1.0}]
+    for key in ('a', 'b', 'c'):
+        cache.put(key, silences)
+
+    assert cache.stats()['entries'] == 2
+    assert cache.get('a') is None
+
+def test_chunker_with_cache(tmp_path):
+    cache = SilenceCache(str(tmp_path))
+    detector = CountingDetector()
+
+    first = AudioChunker(audio_3_utterances, detector=detector, cache=cache)
+    second = AudioChunker(audio_3_utterances, detector=detector, cache=cache)
+    decoded = AudioChunker(audio_3_utterances, detector=detector, cache=cache, single_decode=True)
+
+    assert detector.calls == 1
+    assert second.silences == first.silences
+    assert decoded.audio is not None
+    assert len(list(decoded.chunking_segment())) == 3
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+def test_invalid_key_mode(tmp_path):
+    with pytest.raises(ValueError):
+        SilenceCache(str(tmp_path), key_mode='inode')
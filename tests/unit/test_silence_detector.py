@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from audiochunker import (
+    AudioChunker, AudioFormatException, FFMPEGSilenceDetector, FFMPEGTools, NumpySilenceDetector
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+reference_silence_file = 'tests/resources/silence_reference'
+
+# Inexistent audio file
+inexistent_audio = 'tests/resources/inexistent.wav'
+
+voice_mail = 'tests/resources/voice_mail.mp3'
+
+
+def synthetic_samples(sample_rate=16000):
+    # 1s tone, 1s silence, 0.3s tone, 0.2s silence, 1s tone, 0.8s silence
+    layout = [(1.0, 0.5), (1.0, 0.0), (0.3, 0.5), (0.2, 0.0), (1.0, 0.5), (0.8, 0.0)]
+    parts = []
+    for seconds, amplitude in layout:
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        parts.append(amplitude * np.sin(2 * np.pi * 440 * t))
+    return np.concatenate(parts).astype(np.float32).reshape(-1, 1)
+
+
+def test_numpy_detector_synthetic():
+    silences = NumpySilenceDetector().detect_samples(synthetic_samples(), 16000, -30, 0.5)
+
+    assert silences == [
+        {'start': 1.0, 'end': 2.0, 'duration': 1.0},
+        {'start': 3.5, 'end': 4.3, 'duration': 0.8},
+    ]
+
+def test_numpy_detector_matches_reference():
+    silences = NumpySilenceDetector().detect(audio_3_utterances)
+    reference = FFMPEGTools.get_silences_from_file(reference_silence_file)
+
+    assert len(silences) == len(reference)
+    for silence, expected in zip(silences, reference):
+        assert silence['start'] == pytest.approx(expected['start'], abs=0.02)
+        assert silence['end'] == pytest.approx(expected['end'], abs=0.02)
+
+def test_numpy_detector_rms():
+    silences = NumpySilenceDetector(measure='rms').detect_samples(synthetic_samples(), 16000, -30, 0.5)
+
+    assert [s['start'] for s in silences] == [1.0, 3.5]
+
+def test_numpy_detector_not_wav():
+    with pytest.raises(AudioFormatException):
+        NumpySilenceDetector().detect(voice_mail)
+
+def test_numpy_detector_inexistent_file():
+    with pytest.raises(FileNotFoundError):
+        NumpySilenceDetector().detect(inexistent_audio)
+
+def test_unknown_detector():
+    with pytest.raises(ValueError):
+        AudioChunker(audio_3_utterances, detector='unknown')
+
+def test_chunker_with_numpy_detector():
+    chunker = AudioChunker(audio_3_utterances, detector='numpy')
+
+    assert isinstance(chunker.detector, NumpySilenceDetector)
+    assert len(chunker.silences) == 4
+    assert len(list(chunker.chunking_segment())) == 3
+
+def test_chunker_default_detector():
+    chunker = AudioChunker(audio_3_utterances)
+
+    assert isinstance(chunker.detector, FFMPEGSilenceDetector)
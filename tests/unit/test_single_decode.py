@@ -0,0 +1,86 @@
+import subprocess
+
+import pytest
+
+from audiochunker import (
+    AudioChunker, AudioFormatException, FFMPEGTools, PCMAudio
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+# Inexistent audio file
+inexistent_audio = 'tests/resources/inexistent.wav'
+
+# Invalid wav file
+invalid_wav = 'tests/resources/error.wav'
+
+voice_mail = 'tests/resources/voice_mail.mp3'
+
+
+def test_pcm_from_wav():
+    audio = PCMAudio.from_wav(audio_3_utterances)
+
+    assert audio.sample_rate == 16000
+    assert audio.channels == 1
+    assert audio.sample_width == 2
+    assert audio.frame_count == 132928
+    assert audio.samples().shape == (132928, 1)
+
+def test_pcm_from_invalid_wav():
+    with pytest.raises(AudioFormatException):
+        PCMAudio.from_wav(invalid_wav)
+
+    with pytest.raises(AudioFormatException):
+        PCMAudio.from_wav(voice_mail)
+
+def test_pcm_from_inexistent_file():
+    with pytest.raises(FileNotFoundError):
+        PCMAudio.from_file(inexistent_audio)
+
+def test_decode_audio_with_silences():
+    audio, silence_content = FFMPEGTools.decode_audio(audio_3_utterances, -30, 0.5)
+
+    assert audio.data == PCMAudio.from_wav(audio_3_utterances).data
+    assert FFMPEGTools.get_silences_from_content(silence_content) == FFMPEGTools.get_silences_from_content(
+        FFMPEGTools.create_silence_content(audio_3_utterances))
+
+def test_silence_content_from_pcm():
+    audio = PCMAudio.from_wav(audio_3_utterances)
+    silence_content = FFMPEGTools.create_silence_content_from_pcm(audio)
+
+    assert len(FFMPEGTools.get_silences_from_content(silence_content)) == 4
+
+@pytest.mark.parametrize('detector', ['ffmpeg', 'numpy'])
+def test_single_decode_matches_default(detector):
+    default = AudioChunker(audio_3_utterances, detector=detector)
+    chunker = AudioChunker(audio_3_utterances, detector=detector, single_decode=True)
+
+    assert chunker.audio is not None
+    assert chunker.silences == default.silences
+    chunks = list(chunker.chunking_segment())
+    expected = list(default.chunking_segment())
+    assert [c.audio_segment.raw_data for c in chunks] == [c.audio_segment.raw_data for c in expected]
+    # Repeated chunking reuses the decoded buffer.
+    assert [c.audio_segment.raw_data for c in chunker.chunking_segment()] == [c.audio_segment.raw_data for c in chunks]
+
+def test_single_decode_compressed_input():
+    chunker = AudioChunker(voice_mail, detector='numpy', single_decode=True)
+
+    assert chunker.audio.sample_rate == 22050
+    assert len(chunker.silences) == 2
+    assert len(list(chunker.chunking_segment())) == 1
+
+def test_single_decode_keeps_24_bit_wav(tmp_path):
+    path = str(tmp_path / 'audio_24.wav')
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-i', audio_3_utterances, '-acodec', 'pcm_s24le', path], check=True)
+    chunker = AudioChunker(path, single_decode=True)
+    expected = list(AudioChunker(path, memory_map=True).chunking_segment())
+    chunks = list(chunker.chunking_segment())
+
+    assert chunker.audio.sample_width == 3
+    assert chunker.silences == AudioChunker(path).silences
+    assert len(chunks) == len(expected) == 3
+    for chunk, reference in zip(chunks, expected):
+        assert chunk.pcm.sample_width == 3
+        assert bytes(chunk.pcm.data) == bytes(reference.pcm.data)
@@ -0,0 +1,84 @@
+import io
+import threading
+import wave
+
+import pytest
+
+from audiochunker import (
+    AudioChunker, FFMPEGException, PCMAudio, SegmentChunk
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+# Inexistent audio file
+inexistent_audio = 'tests/resources/inexistent.wav'
+
+empty_file = 'tests/resources/empty_file.txt'
+
+
+def raw_chunks(chunks):
+    return [(chunk.start, chunk.end, chunk.audio_segment.raw_data) for chunk in chunks]
+
+
+def next_within(chunks, timeout=10):
+    chunk = []
+    thread = threading.Thread(target=lambda: chunk.append(next(chunks)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert chunk, 'no chunk streamed in time'
+    return chunk[0]
+
+
+def test_stream_matches_chunking_segment():
+    expected = raw_chunks(AudioChunker(audio_3_utterances).chunking_segment())
+    chunks = list(AudioChunker.stream(audio_3_utterances))
+
+    assert len(chunks) == 3
+    assert type(chunks[0]) == SegmentChunk
+    assert raw_chunks(chunks) == expected
+    assert all(chunk.content_size == len(chunk.audio_segment.raw_data) for chunk in chunks)
+
+def test_stream_from_file_objects():
+    expected = raw_chunks(AudioChunker(audio_3_utterances).chunking_segment())
+
+    with open(audio_3_utterances, 'rb') as f:
+        assert raw_chunks(AudioChunker.stream(f)) == expected
+
+    with open(audio_3_utterances, 'rb') as f:
+        assert raw_chunks(AudioChunker.stream(io.BytesIO(f.read()))) == expected
+
+def test_stream_close_early():
+    chunks = AudioChunker.stream(audio_3_utterances)
+    assert next(chunks).content_size > 0
+    chunks.close()
+
+def test_stream_inexistent_file():
+    with pytest.raises(FileNotFoundError):
+        next(AudioChunker.stream(inexistent_audio))
+
+def test_stream_invalid_input():
+    with pytest.raises(FFMPEGException):
+        list(AudioChunker.stream(empty_file))
+
+
+def test_stream_follow_growing_file(tmp_path):
+    # wave writes the actual data size in the header after every write, not a placeholder.
+    audio = PCMAudio.from_wav(audio_3_utterances)
+    expected = raw_chunks(AudioChunker(audio_3_utterances).chunking_segment())
+    split = int(3.5 * audio.sample_rate) * audio.frame_width
+    path = tmp_path / 'growing.wav'
+    with open(path, 'wb') as f, wave.open(f, 'wb') as writer:
+        writer.setnchannels(audio.channels)
+        writer.setsampwidth(audio.sample_width)
+        writer.setframerate(audio.sample_rate)
+        writer.writeframes(audio.data[:split])
+        f.flush()
+        chunks = AudioChunker.stream(str(path), follow=True)
+        first = next_within(chunks)
+        writer.writeframes(audio.data[split:])
+        f.flush()
+        streamed = [first, next_within(chunks), next_within(chunks)]
+        chunks.close()
+
+    assert raw_chunks(streamed) == expected
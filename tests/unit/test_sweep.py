@@ -0,0 +1,50 @@
+import pytest
+
+from audiochunker import (
+    AudioChunker, NumpySilenceDetector, SweepResult
+)
+
+# This audio file is supposed to have 3 utterances and 4 silence periodes.
+audio_3_utterances = 'tests/resources/audio_3_utterances.wav'
+
+
+def test_sweep_matches_detection():
+    chunker = AudioChunker(audio_3_utterances, detector='numpy')
+    thresholds = [-40, -30, -20]
+    durations = [0.3, 0.5, 1.0]
+    results = chunker.sweep(thresholds, durations)
+
+    assert len(results) == 9
+    assert [(r.silence_threshold, r.silence_duration) for r in results] == [(t, d) for t in thresholds for d in durations]
+    for result in results:
+        assert isinstance(result, SweepResult)
+        expected = NumpySilenceDetector().detect(audio_3_utterances, result.silence_threshold, result.silence_duration)
+        assert result.silences == expected
+        assert result.chunk_count == max(len(expected) - 1, 0)
+
+def test_sweep_stats():
+    chunker = AudioChunker(audio_3_utterances, single_decode=True)
+    result = chunker.sweep([-30], [0.5])[0]
+    durations = [chunk.duration for chunk in result.chunks]
+
+    assert result.chunk_count == 3
+    assert result.max_chunk_duration == max(durations)
+    assert result.mean_chunk_duration == pytest.approx(sum(durations) / 3)
+    assert result.speech_duration == pytest.approx(chunker.audio.duration - sum(s['duration'] for s in result.silences))
+    assert result.to_dict()['chunk_count'] == 3
+
+def test_sweep_without_parameters():
+    chunker = AudioChunker(audio_3_utterances, detector='numpy')
+
+    with pytest.raises(ValueError):
+        chunker.sweep([], [0.5])
+
+def test_sweep_analyses_audio_once(sink):
+    chunker = AudioChunker(audio_3_utterances, detector='numpy', max_chunk_duration=1.0)
+    sink.clear()
+    results = chunker.sweep([-40, -30, -20], [0.3, 0.5])
+
+    assert len(results) == 6
+    assert sink.names.count('wav_load') == 1
+    assert sink.names.count('split_envelope') == 1
+    assert all(result.max_chunk_duration <= 1.0 for result in results)